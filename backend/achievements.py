@@ -0,0 +1,227 @@
+"""
+Event-driven achievements.
+
+Learning events (quiz answers, streaks, focus sessions, flashcard answers)
+update a handful of per-user counters, one indexed row each. Badges are rules
+over a single counter, so an event only checks the badges on the counters it
+touched, and only those whose threshold the update just crossed. Unlocks are
+stored as (user, badge, time) rows and per-user badge/point totals are kept
+alongside, so reading a user's achievements never depends on how much history
+they have.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Set
+
+from config import ACHIEVEMENTS_DB, USER_DATA_DIR
+
+RECENT_BADGES = 5
+
+# badge id -> rule; each rule unlocks once, when its counter reaches the threshold
+BADGES: Dict[str, Dict] = {
+    "quiz_master": {"title": "Quiz Master", "description": "Answered 10 questions correctly!",
+                    "counter": "quiz_correct", "threshold": 10, "points": 50, "card": "Quiz Master Unlocked!"},
+    "quiz_legend": {"title": "Quiz Legend", "description": "Answered 100 questions correctly!",
+                    "counter": "quiz_correct", "threshold": 100, "points": 150, "card": "Quiz Legend Unlocked!"},
+    "week_warrior": {"title": "Week Warrior", "description": "Maintained a 7-day learning streak!",
+                     "counter": "best_streak", "threshold": 7, "points": 100, "card": "Week Warrior!"},
+    "deep_diver": {"title": "Deep Diver", "description": "Stayed focused for 30 minutes in one session!",
+                   "counter": "deep_focus_sessions", "threshold": 1, "points": 30, "card": "Deep Diver!"},
+    "focus_regular": {"title": "Focus Regular", "description": "Completed 10 focus sessions!",
+                      "counter": "focus_sessions", "threshold": 10, "points": 50, "card": "Focus Regular!"},
+    "flashcard_fan": {"title": "Flashcard Fan", "description": "Reviewed 50 flashcards!",
+                      "counter": "flashcards_reviewed", "threshold": 50, "points": 50, "card": "Flashcard Fan!"},
+}
+
+# event -> [(counter, "add" | "max", value taken from the event data)]
+EVENT_COUNTERS = {
+    "quiz_answer": [("quiz_correct", "add", lambda d: int(bool(d.get("correct"))))],
+    "streak": [("best_streak", "max", lambda d: int(d.get("streak_days", 0)))],
+    "focus_session": [("focus_sessions", "add", lambda d: 1),
+                      ("deep_focus_sessions", "add", lambda d: int(d.get("focus_time", 0) > 1800))],
+    "flashcard_answer": [("flashcards_reviewed", "add", lambda d: 1),
+                         ("flashcards_correct", "add", lambda d: int(bool(d.get("correct"))))],
+}
+
+BADGES_BY_COUNTER: Dict[str, List[str]] = {}
+for _badge_id, _rule in BADGES.items():
+    BADGES_BY_COUNTER.setdefault(_rule["counter"], []).append(_badge_id)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (
+    user_id TEXT NOT NULL,
+    counter TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (user_id, counter)
+);
+CREATE TABLE IF NOT EXISTS unlocks (
+    user_id TEXT NOT NULL,
+    badge_id TEXT NOT NULL,
+    unlocked_at REAL NOT NULL,
+    PRIMARY KEY (user_id, badge_id)
+);
+CREATE INDEX IF NOT EXISTS idx_unlocks_recent ON unlocks(user_id, unlocked_at);
+CREATE TABLE IF NOT EXISTS user_totals (
+    user_id TEXT PRIMARY KEY,
+    badges INTEGER NOT NULL DEFAULT 0,
+    points INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def badge_payload(badge_id: str, unlocked_at: Optional[float] = None) -> Dict:
+    rule = BADGES[badge_id]
+    badge = {"badge_id": badge_id, "title": rule["title"], "description": rule["description"],
+             "points": rule["points"]}
+    if unlocked_at is not None:
+        badge["unlocked_at"] = unlocked_at
+    return badge
+
+
+class AchievementEngine:
+    """Per-user counters and badge unlocks in SQLite, updated one event at a time"""
+
+    def __init__(self, db_path: str, legacy_dir: Optional[str] = USER_DATA_DIR):
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self.legacy_dir = legacy_dir
+        self._checked_legacy: Set[str] = set()
+        self._legacy_lock = threading.Lock()
+
+    def _counter(self, user_id: str, counter: str) -> int:
+        row = self._conn.execute(
+            "SELECT value FROM counters WHERE user_id = ? AND counter = ?", (user_id, counter)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _set_counter(self, user_id: str, counter: str, old: int, new: int, now: float) -> List[Dict]:
+        """Write a counter and unlock the badges whose threshold lies in (old, new]"""
+        self._conn.execute(
+            "INSERT INTO counters(user_id, counter, value) VALUES (?, ?, ?) "
+            "ON CONFLICT(user_id, counter) DO UPDATE SET value = excluded.value",
+            (user_id, counter, new),
+        )
+        unlocked = []
+        for badge_id in BADGES_BY_COUNTER.get(counter, []):
+            rule = BADGES[badge_id]
+            if not old < rule["threshold"] <= new:
+                continue
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO unlocks(user_id, badge_id, unlocked_at) VALUES (?, ?, ?)",
+                (user_id, badge_id, now),
+            )
+            if cursor.rowcount:
+                self._conn.execute(
+                    "INSERT INTO user_totals(user_id, badges, points) VALUES (?, 1, ?) "
+                    "ON CONFLICT(user_id) DO UPDATE SET badges = badges + 1, points = points + excluded.points",
+                    (user_id, rule["points"]),
+                )
+                unlocked.append(badge_payload(badge_id, now))
+        return unlocked
+
+    def record(self, user_id: str, event: str, data: Optional[Dict] = None, now: Optional[float] = None) -> List[Dict]:
+        """Apply one learning event; returns the badges it unlocked"""
+        specs = EVENT_COUNTERS.get(event)
+        if not specs:
+            raise ValueError(f"Unknown achievement event '{event}'")
+        data = data or {}
+        if now is None:
+            now = time.time()
+        self._import_legacy(user_id)
+
+        unlocked: List[Dict] = []
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for counter, mode, value_of in specs:
+                    value = value_of(data)
+                    if value <= 0:
+                        continue
+                    old = self._counter(user_id, counter)
+                    new = old + value if mode == "add" else max(old, value)
+                    if new != old:
+                        unlocked.extend(self._set_counter(user_id, counter, old, new, now))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return unlocked
+
+    def counters(self, user_id: str) -> Dict[str, int]:
+        self._import_legacy(user_id)
+        with self._lock:
+            rows = self._conn.execute("SELECT counter, value FROM counters WHERE user_id = ?", (user_id,)).fetchall()
+        return dict(rows)
+
+    def summary(self, user_id: str, recent: int = RECENT_BADGES) -> Dict:
+        """Badge/point totals and the most recent unlocks, newest first"""
+        self._import_legacy(user_id)
+        with self._lock:
+            totals = self._conn.execute(
+                "SELECT badges, points FROM user_totals WHERE user_id = ?", (user_id,)
+            ).fetchone()
+            rows = self._conn.execute(
+                "SELECT badge_id, unlocked_at FROM unlocks WHERE user_id = ? ORDER BY unlocked_at DESC LIMIT ?",
+                (user_id, recent),
+            ).fetchall()
+        badges, points = totals or (0, 0)
+        return {
+            "total_badges": badges,
+            "total_points": points,
+            "recent_badges": [badge_payload(badge_id, ts) for badge_id, ts in rows if badge_id in BADGES],
+        }
+
+    def _import_legacy(self, user_id: str) -> bool:
+        """Fold an old {user}_badges.json counter file in once, then move it aside"""
+        if not self.legacy_dir or user_id in self._checked_legacy:
+            return False
+        with self._legacy_lock:
+            if user_id in self._checked_legacy:
+                return False
+            try:
+                return self._import_legacy_file(user_id, os.path.join(self.legacy_dir, f"{user_id}_badges.json"))
+            finally:
+                self._checked_legacy.add(user_id)
+
+    def _import_legacy_file(self, user_id: str, path: str) -> bool:
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, "r") as f:
+                legacy = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        unlocked_at = os.path.getmtime(path)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            for counter, value in legacy.items():
+                if counter in BADGES_BY_COUNTER and isinstance(value, int) and value > 0:
+                    old = self._counter(user_id, counter)
+                    if value > old:
+                        self._set_counter(user_id, counter, old, value, unlocked_at)
+            self._conn.execute("COMMIT")
+        os.replace(path, path + ".migrated")
+        return True
+
+
+_shared_engine: Optional[AchievementEngine] = None
+_shared_engine_lock = threading.Lock()
+
+
+def get_achievements() -> AchievementEngine:
+    """Process-wide engine stored at config.ACHIEVEMENTS_DB"""
+    global _shared_engine
+    with _shared_engine_lock:
+        if _shared_engine is None:
+            _shared_engine = AchievementEngine(ACHIEVEMENTS_DB)
+        return _shared_engine
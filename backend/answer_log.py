@@ -0,0 +1,287 @@
+"""
+Append-only logs for flashcard and quiz answers.
+
+AnswerLog is a binary file of fixed-width records behind a small header that
+holds running totals and a ring of the most recent answers. Recording an
+answer appends one record and rewrites the header in place, so the cost no
+longer grows with history, and recent accuracy/latency come from the header
+alone. Once the file holds more than max_records it is compacted down to the
+newest half. Every read-modify-write of the header (and every compaction)
+happens under an exclusive lock on a sidecar .lock file, re-reading the
+header from disk first, so several server processes can share one log
+without overwriting each other's totals.
+
+Quiz results (one JSON object per quiz) go to JSONL files that are read from
+the tail.
+"""
+
+import os
+import json
+import time
+import struct
+import hashlib
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+MAGIC = b"ANSL"
+FORMAT_VERSION = 1
+RECENT_WINDOW = 10
+DEFAULT_MAX_RECORDS = 100_000
+
+# magic, version, window, total answers, total correct, total response time, ring position,
+# then the ring: RECENT_WINDOW correct flags and RECENT_WINDOW response times
+HEADER = struct.Struct(f"<4sHHQQdI{RECENT_WINDOW}B{RECENT_WINDOW}f")
+# timestamp, question digest, correct, difficulty code, response time
+RECORD = struct.Struct("<d8sBBf")
+
+DIFFICULTY_CODES = {"": 0, "Easy": 1, "Medium": 2, "Hard": 3}
+DIFFICULTY_NAMES = {code: name for name, code in DIFFICULTY_CODES.items()}
+
+
+def question_digest(question: str) -> bytes:
+    return hashlib.sha1(question.encode("utf-8")).digest()[:8]
+
+
+def _lock_file(f):
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def _unlock_file(f):
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class AnswerLog:
+    """Fixed-width append-only answer records with a rolling-aggregate header"""
+
+    def __init__(self, path: str, max_records: int = DEFAULT_MAX_RECORDS):
+        self.path = path
+        self.max_records = max_records
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(f"{path}.lock", "a+b")
+        with self._locked():
+            if os.path.exists(path):
+                self._read_header()  # fail early on a file in another format
+            else:
+                self._write_new(path, [], self._empty_header())
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive access across threads (self._lock) and processes (the .lock file)"""
+        with self._lock:
+            _lock_file(self._lock_file)
+            try:
+                yield
+            finally:
+                _unlock_file(self._lock_file)
+
+    @staticmethod
+    def _empty_header() -> Dict:
+        return {"total": 0, "total_correct": 0, "total_time": 0.0, "ring_pos": 0,
+                "ring_correct": [0] * RECENT_WINDOW, "ring_time": [0.0] * RECENT_WINDOW}
+
+    def _pack_header(self, header: Dict) -> bytes:
+        return HEADER.pack(MAGIC, FORMAT_VERSION, RECENT_WINDOW, header["total"], header["total_correct"],
+                           header["total_time"], header["ring_pos"], *header["ring_correct"], *header["ring_time"])
+
+    def _read_header(self) -> Dict:
+        with open(self.path, "rb") as f:
+            return self._unpack_header(f.read(HEADER.size))
+
+    def _unpack_header(self, raw: bytes) -> Dict:
+        if len(raw) < HEADER.size:
+            raise ValueError(f"truncated answer log header in {self.path}")
+        fields = HEADER.unpack(raw)
+        magic, version, window = fields[:3]
+        if magic != MAGIC or version != FORMAT_VERSION or window != RECENT_WINDOW:
+            raise ValueError(f"unsupported answer log format in {self.path}")
+        total, total_correct, total_time, ring_pos = fields[3:7]
+        return {"total": total, "total_correct": total_correct, "total_time": total_time, "ring_pos": ring_pos,
+                "ring_correct": list(fields[7:7 + RECENT_WINDOW]),
+                "ring_time": list(fields[7 + RECENT_WINDOW:])}
+
+    def _write_new(self, path: str, records: List[bytes], header: Dict):
+        tmp_path = f"{path}.part"
+        with open(tmp_path, "wb") as f:
+            f.write(self._pack_header(header))
+            f.writelines(records)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _advance(header: Dict, correct: bool, response_time: float):
+        header["total"] += 1
+        header["total_correct"] += int(correct)
+        header["total_time"] += response_time
+        pos = header["ring_pos"]
+        header["ring_correct"][pos] = int(correct)
+        header["ring_time"][pos] = response_time
+        header["ring_pos"] = (pos + 1) % RECENT_WINDOW
+
+    def append(self, question: str, correct: bool, response_time: float,
+               difficulty: str = "", timestamp: Optional[float] = None):
+        """Record one answer: one record appended, header re-read and rewritten in place"""
+        if timestamp is None:
+            timestamp = time.time()
+        record = RECORD.pack(timestamp, question_digest(question), int(bool(correct)),
+                             DIFFICULTY_CODES.get(difficulty, 0), float(response_time))
+        with self._locked():
+            with open(self.path, "r+b") as f:
+                # Another process may have advanced the totals since we last looked
+                header = self._unpack_header(f.read(HEADER.size))
+                self._advance(header, correct, float(response_time))
+                f.seek(0, os.SEEK_END)
+                f.write(record)
+                size = f.tell()
+                f.seek(0)
+                f.write(self._pack_header(header))
+            if (size - HEADER.size) // RECORD.size > self.max_records:
+                self._compact(self.max_records // 2)
+
+    def _compact(self, keep: int):
+        """Drop all but the newest keep records; the header totals still cover everything"""
+        with open(self.path, "rb") as f:
+            header = self._unpack_header(f.read(HEADER.size))
+            f.seek(0, os.SEEK_END)
+            count = (f.tell() - HEADER.size) // RECORD.size
+            start = HEADER.size + max(count - keep, 0) * RECORD.size
+            f.seek(start)
+            tail = f.read()
+        self._write_new(self.path, [tail], header)
+
+    def compact(self, keep: Optional[int] = None):
+        with self._locked():
+            self._compact(self.max_records // 2 if keep is None else keep)
+
+    def recent_stats(self) -> Dict:
+        """Accuracy and mean response time over the last RECENT_WINDOW answers"""
+        with self._locked():
+            header = self._read_header()
+        n = min(header["total"], RECENT_WINDOW)
+        if n == 0:
+            return {"total": 0, "count": 0, "accuracy": 0.0, "avg_response_time": 0.0}
+        if header["total"] < RECENT_WINDOW:
+            correct, times = header["ring_correct"][:n], header["ring_time"][:n]
+        else:
+            correct, times = header["ring_correct"], header["ring_time"]
+        return {"total": header["total"], "count": n,
+                "accuracy": sum(correct) / n, "avg_response_time": sum(times) / n}
+
+    def tail(self, n: int) -> List[Dict]:
+        """The newest n records, oldest first"""
+        with self._locked(), open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            count = (f.tell() - HEADER.size) // RECORD.size
+            n = min(n, count)
+            f.seek(HEADER.size + (count - n) * RECORD.size)
+            raw = f.read(n * RECORD.size)
+        records = []
+        for ts, digest, correct, difficulty, response_time in RECORD.iter_unpack(raw):
+            records.append({"timestamp": ts, "question_digest": digest.hex(), "correct": bool(correct),
+                            "difficulty": DIFFICULTY_NAMES.get(difficulty, ""), "response_time": response_time})
+        return records
+
+    def import_legacy_json(self, legacy_path: str) -> int:
+        """Fold an old JSON answer list into an empty log and move the JSON aside"""
+        if not os.path.exists(legacy_path):
+            return 0
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return 0
+
+        with self._locked():
+            # Another process may have imported it (or logged answers) already
+            if not os.path.exists(legacy_path) or self._read_header()["total"]:
+                return 0
+            header = self._empty_header()
+            records = []
+            for entry in entries:
+                try:
+                    ts = datetime.fromisoformat(entry["timestamp"]).timestamp()
+                except (KeyError, ValueError, TypeError):
+                    ts = 0.0
+                correct = bool(entry.get("correct"))
+                response_time = float(entry.get("response_time", 0.0))
+                records.append(RECORD.pack(ts, question_digest(entry.get("question", "")), int(correct),
+                                           DIFFICULTY_CODES.get(entry.get("difficulty", ""), 0), response_time))
+                self._advance(header, correct, response_time)
+            self._write_new(self.path, records, header)
+            os.replace(legacy_path, legacy_path + ".migrated")
+        return len(entries)
+
+
+_logs: Dict[str, AnswerLog] = {}
+_logs_lock = threading.Lock()
+
+
+def get_answer_log(path: str, legacy_json_path: Optional[str] = None) -> AnswerLog:
+    """Shared AnswerLog per path, importing a legacy JSON history on first open"""
+    with _logs_lock:
+        log = _logs.get(path)
+        if log is None:
+            log = _logs[path] = AnswerLog(path)
+            if legacy_json_path:
+                log.import_legacy_json(legacy_json_path)
+        return log
+
+
+# -------------------------
+# JSONL history
+# -------------------------
+def append_jsonl(path: str, entry: Dict):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def tail_jsonl(path: str, limit: int, block_size: int = 8192) -> List[Dict]:
+    """Last limit entries of a JSONL file, read backwards from the end"""
+    if limit <= 0 or not os.path.exists(path):
+        return []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        while position > 0 and data.count(b"\n") <= limit:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = [line for line in data.splitlines() if line.strip()][-limit:]
+    return [json.loads(line) for line in lines]
+
+
+def migrate_json_list_to_jsonl(json_path: str, jsonl_path: str) -> int:
+    """Convert a legacy JSON array file into JSONL once, moving the original aside"""
+    if not os.path.exists(json_path) or os.path.exists(jsonl_path):
+        return 0
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    tmp_path = f"{jsonl_path}.part"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+    os.replace(tmp_path, jsonl_path)
+    os.replace(json_path, json_path + ".migrated")
+    return len(entries)
@@ -0,0 +1,306 @@
+"""
+Managed store for generated files (synthesized audio, uploads).
+
+Every artifact is registered in a small SQLite index with its size, last
+access time and refcount. Per-namespace totals are kept up to date by
+triggers, so enforcing quotas never lists a directory: the sweeper walks the
+(namespace, refcount, last_access) index from the oldest end and stops as
+soon as the namespace is back under quota. Run this module directly for a
+one-off sweep (it replaces the old delete_old_audio.py script).
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Optional, List, Tuple
+
+from config import ARTIFACT_DB, ARTIFACT_QUOTAS, ARTIFACT_SWEEP_INTERVAL
+
+EVICTION_BATCH = 64
+# Precompressed siblings written by media_delivery.precompress; they belong to the file they compress
+SIDECAR_SUFFIXES = (".br", ".gz")
+TEMP_PART = "part"  # in-progress writes: <key>.<id>.part.<ext> (AudioCache) or <name>.gz.part (precompress)
+
+
+def _is_temp(name: str) -> bool:
+    return TEMP_PART in name.split(".")[1:]
+
+
+def _is_sidecar(path: str) -> bool:
+    return path.endswith(SIDECAR_SUFFIXES) and os.path.exists(os.path.splitext(path)[0])
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    path TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    key TEXT,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL,
+    refcount INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_artifacts_eviction ON artifacts(namespace, refcount, last_access);
+CREATE INDEX IF NOT EXISTS idx_artifacts_key ON artifacts(namespace, key);
+
+CREATE TABLE IF NOT EXISTS totals (
+    namespace TEXT PRIMARY KEY,
+    bytes INTEGER NOT NULL DEFAULT 0,
+    files INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS artifacts_insert AFTER INSERT ON artifacts BEGIN
+    INSERT OR IGNORE INTO totals(namespace) VALUES (NEW.namespace);
+    UPDATE totals SET bytes = bytes + NEW.size, files = files + 1 WHERE namespace = NEW.namespace;
+END;
+CREATE TRIGGER IF NOT EXISTS artifacts_delete AFTER DELETE ON artifacts BEGIN
+    UPDATE totals SET bytes = bytes - OLD.size, files = files - 1 WHERE namespace = OLD.namespace;
+END;
+CREATE TRIGGER IF NOT EXISTS artifacts_resize AFTER UPDATE OF size ON artifacts BEGIN
+    UPDATE totals SET bytes = bytes - OLD.size + NEW.size WHERE namespace = NEW.namespace;
+END;
+"""
+
+
+class ArtifactStore:
+    """SQLite-indexed registry of generated files with quota-driven eviction"""
+
+    def __init__(self, db_path: str, quotas: Dict[str, Dict]):
+        self.db_path = db_path
+        self.quotas = quotas
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+
+    # -------------------------
+    # Registration and access
+    # -------------------------
+    def register(self, path: str, namespace: str, key: Optional[str] = None) -> int:
+        """Record (or refresh) a file; returns its size"""
+        size = os.path.getsize(path)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO artifacts(path, namespace, key, size, created, last_access)
+                   VALUES (?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(path) DO UPDATE SET
+                       key = excluded.key, size = excluded.size, last_access = excluded.last_access""",
+                (path, namespace, key, size, now, now),
+            )
+        return size
+
+    def lookup(self, namespace: str, key: str) -> Optional[str]:
+        """Path of the artifact stored under key, marking it as used"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path FROM artifacts WHERE namespace = ? AND key = ? LIMIT 1", (namespace, key)
+            ).fetchone()
+            if row is None:
+                return None
+            path = row[0]
+            if not os.path.exists(path):
+                # Removed behind our back - forget it
+                self._conn.execute("DELETE FROM artifacts WHERE path = ?", (path,))
+                return None
+            self._conn.execute("UPDATE artifacts SET last_access = ? WHERE path = ?", (time.time(), path))
+            return path
+
+    def touch(self, path: str):
+        with self._lock:
+            self._conn.execute("UPDATE artifacts SET last_access = ? WHERE path = ?", (time.time(), path))
+
+    def acquire(self, path: str):
+        """Pin a file so the sweeper leaves it alone until release()"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE artifacts SET refcount = refcount + 1, last_access = ? WHERE path = ?", (time.time(), path)
+            )
+
+    def release(self, path: str):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE artifacts SET refcount = MAX(refcount - 1, 0) WHERE path = ?", (path,)
+            )
+
+    def forget(self, path: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM artifacts WHERE path = ?", (path,))
+
+    def adopt_directory(self, namespace: str, directory: str) -> int:
+        """Register files that were written outside the store (e.g. before it existed).
+
+        In-progress temp files and precompressed sidecars are not artifacts of
+        their own: temp files belong to their writer, sidecars are evicted with
+        the file they compress.
+        """
+        if not os.path.isdir(directory):
+            return 0
+        rows, skipped = [], []
+        for entry in os.scandir(directory):
+            if not entry.is_file():
+                continue
+            if _is_temp(entry.name) or _is_sidecar(entry.path):
+                skipped.append((entry.path,))
+                continue
+            stat = entry.stat()
+            rows.append((entry.path, namespace, stat.st_size, stat.st_mtime, stat.st_mtime))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            # Earlier adoptions registered these too
+            self._conn.executemany("DELETE FROM artifacts WHERE path = ? AND key IS NULL", skipped)
+            cursor = self._conn.executemany(
+                """INSERT OR IGNORE INTO artifacts(path, namespace, size, created, last_access)
+                   VALUES (?, ?, ?, ?, ?)""",
+                rows,
+            )
+            self._conn.execute("COMMIT")
+            return max(cursor.rowcount, 0)
+
+    # -------------------------
+    # Eviction
+    # -------------------------
+    def stats(self, namespace: str) -> Dict:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT bytes, files FROM totals WHERE namespace = ?", (namespace,)
+            ).fetchone()
+        bytes_used, files = row if row else (0, 0)
+        return {"files": files, "bytes": bytes_used, "max_bytes": self.quotas.get(namespace, {}).get("max_bytes")}
+
+    def _evict_batch(self, namespace: str, older_than: Optional[float]) -> List[Tuple[str, int]]:
+        """Oldest unpinned artifacts, optionally only those not used since older_than"""
+        if older_than is None:
+            query = """SELECT path, size FROM artifacts
+                       WHERE namespace = ? AND refcount = 0
+                       ORDER BY last_access LIMIT ?"""
+            params = (namespace, EVICTION_BATCH)
+        else:
+            query = """SELECT path, size FROM artifacts
+                       WHERE namespace = ? AND refcount = 0 AND last_access < ?
+                       ORDER BY last_access LIMIT ?"""
+            params = (namespace, older_than, EVICTION_BATCH)
+        return self._conn.execute(query, params).fetchall()
+
+    def _remove(self, path: str) -> bool:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"❌ Error deleting {path}: {e}")
+            return False
+        self._conn.execute("DELETE FROM artifacts WHERE path = ?", (path,))
+        for suffix in SIDECAR_SUFFIXES:
+            try:
+                os.remove(path + suffix)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"❌ Error deleting {path + suffix}: {e}")
+        return True
+
+    def enforce_quota(self, namespace: str) -> int:
+        """Evict least recently used files until the namespace fits its size quota"""
+        max_bytes = self.quotas.get(namespace, {}).get("max_bytes")
+        if max_bytes is None:
+            return 0
+
+        evicted = 0
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT bytes, files FROM totals WHERE namespace = ?", (namespace,)
+            ).fetchone()
+            used, files = row if row else (0, 0)
+            # The newest file always survives, even if it alone exceeds the quota
+            while used > max_bytes and files > 1:
+                progress = False
+                for path, size in self._evict_batch(namespace, None):
+                    if used <= max_bytes or files <= 1:
+                        break
+                    if self._remove(path):
+                        used -= size
+                        files -= 1
+                        evicted += 1
+                        progress = True
+                if not progress:
+                    break
+        return evicted
+
+    def expire(self, namespace: str, now: Optional[float] = None) -> int:
+        """Evict files not accessed within the namespace's max age"""
+        max_age = self.quotas.get(namespace, {}).get("max_age_seconds")
+        if max_age is None:
+            return 0
+        cutoff = (time.time() if now is None else now) - max_age
+
+        evicted = 0
+        with self._lock:
+            while True:
+                removed = [path for path, _ in self._evict_batch(namespace, cutoff) if self._remove(path)]
+                if not removed:
+                    break
+                evicted += len(removed)
+        return evicted
+
+    def sweep(self) -> int:
+        """Apply age and size quotas to every namespace; returns files evicted"""
+        evicted = 0
+        for namespace in self.quotas:
+            evicted += self.expire(namespace)
+            evicted += self.enforce_quota(namespace)
+        return evicted
+
+    # -------------------------
+    # Background sweeper
+    # -------------------------
+    def start_sweeper(self, interval: float = ARTIFACT_SWEEP_INTERVAL):
+        """Adopt existing files once, then sweep every interval seconds in the background"""
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        self._stop.clear()
+        self._sweeper = threading.Thread(target=self._sweep_loop, args=(interval,), daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        self._stop.set()
+
+    def _sweep_loop(self, interval: float):
+        for namespace, quota in self.quotas.items():
+            if quota.get("directory"):
+                self.adopt_directory(namespace, quota["directory"])
+        while True:
+            try:
+                evicted = self.sweep()
+                if evicted:
+                    print(f"🧹 Artifact sweep complete. Files deleted: {evicted}")
+            except Exception as e:
+                print(f"Artifact sweep error: {e}")
+            if self._stop.wait(interval):
+                break
+
+
+_shared_store: Optional[ArtifactStore] = None
+_shared_store_lock = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Process-wide store configured from config.ARTIFACT_QUOTAS"""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = ArtifactStore(ARTIFACT_DB, ARTIFACT_QUOTAS)
+        return _shared_store
+
+
+if __name__ == "__main__":
+    store = get_artifact_store()
+    for name, quota in store.quotas.items():
+        if quota.get("directory"):
+            store.adopt_directory(name, quota["directory"])
+    print(f"🧹 Cleanup complete. Files deleted: {store.sweep()}")
@@ -0,0 +1,48 @@
+import os
+import uuid
+from typing import Optional
+
+from artifact_store import ArtifactStore, get_artifact_store
+from utils_fold.hash_utils import content_hash
+
+
+class AudioCache:
+    """Content-addressed audio files, indexed and evicted by the artifact store"""
+
+    def __init__(self, cache_dir: str, store: Optional[ArtifactStore] = None, namespace: str = "audio"):
+        self.cache_dir = cache_dir
+        self.namespace = namespace
+        self.store = store or get_artifact_store()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(text: str, voice: str, rate, engine: str) -> str:
+        """Cache key for one synthesis request"""
+        return content_hash(text, voice, rate, engine)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached file for key, or None on a miss"""
+        return self.store.lookup(self.namespace, key)
+
+    def temp_path(self, key: str, ext: str) -> str:
+        """Unique scratch path to synthesize into before calling put()"""
+        return os.path.join(self.cache_dir, f"{key}.{uuid.uuid4().hex}.part{ext}")
+
+    def put(self, key: str, tmp_path: str, ext: str) -> str:
+        """Atomically move a finished file into the cache and return its final path"""
+        final_path = os.path.join(self.cache_dir, f"{key}{ext}")
+        os.replace(tmp_path, final_path)
+        self.store.register(final_path, self.namespace, key=key)
+        # Newest entry has the latest last_access, so this only drops older files
+        self.store.enforce_quota(self.namespace)
+        return final_path
+
+    def pin(self, path: str):
+        """Keep a file from being evicted while it is being read"""
+        self.store.acquire(path)
+
+    def unpin(self, path: str):
+        self.store.release(path)
+
+    def stats(self) -> dict:
+        return self.store.stats(self.namespace)
@@ -2,14 +2,33 @@ import unittest
 import sys
 import os
 import json
+import tempfile
+import time
+from datetime import datetime, timedelta
 from file_processor import FileProcessor
 from neuro_summarizer import NeuroSummarizer
 from tts_engine import NeuroTTSEngine
+from tts_worker_pool import TTSWorkerPool
 from flashcard_generator import FlashcardGenerator
 from focus_tracker import FocusTracker
 from ai_coach import EnhancedAICoach
 from quiz_system import EnhancedGamifiedQuizSystem
 from session_manager import SessionManager
+from audio_cache import AudioCache
+from artifact_store import ArtifactStore
+from idf_model import CorpusIDFModel
+from deck_cache import DeckCache
+from quiz_bank import QuizBank, QuizBankBuilder, iter_json_lines, repair_question
+from spaced_repetition import SpacedRepetitionScheduler
+from image_store import ImageStore
+from achievements import AchievementEngine
+from view_cache import ViewCache
+from focus_store import FocusStore
+from learning_stats import LearningStats
+from answer_log import AnswerLog
+from media_delivery import media_response, precompress
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
 from config import DEFAULT_USER_ID
 
 
@@ -93,6 +112,438 @@ class EduVoiceBackendTests(unittest.TestCase):
             print(f"❌ TTS engine test failed: {str(e)}")
             self.fail(str(e))
 
+    def test_tts_worker_pool(self):
+        """Test that a timed-out TTS job fails fast and its worker is replaced"""
+        print("\n--- Testing TTS Worker Pool ---")
+        pool = TTSWorkerPool(1, 150, job_timeout=30)
+        try:
+            if not pool.available:
+                self.skipTest("pyttsx3 workers could not start")
+            old_worker = pool._workers[0]
+            with tempfile.TemporaryDirectory() as out_dir:
+                start = time.monotonic()
+                self.assertFalse(pool.synthesize(" ".join(["word"] * 2000), os.path.join(out_dir, "a.wav"), 0.01))
+                self.assertLess(time.monotonic() - start, 0.5)
+                print("✅ Timed-out job returns without waiting for the restart")
+
+                # The next job waits for the replacement worker
+                self.assertTrue(pool.synthesize("Hello there.", os.path.join(out_dir, "b.wav"), 30))
+                self.assertEqual(pool.size, 1)
+                self.assertIsNot(pool._workers[0], old_worker)
+                print("✅ Hung worker replaced in the background")
+        finally:
+            pool.shutdown()
+
+    def test_audio_cache(self):
+        """Test content-addressed audio cache"""
+        print("\n--- Testing Audio Cache ---")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            store = ArtifactStore(os.path.join(cache_dir, "artifacts.db"), {"audio": {"max_bytes": 10}})
+            cache = AudioCache(cache_dir, store=store)
+            key = AudioCache.make_key("hello", "default", 120, "gtts")
+            self.assertIsNone(cache.get(key))
+
+            tmp = cache.temp_path(key, ".mp3")
+            with open(tmp, "wb") as f:
+                f.write(b"12345678")
+            path = cache.put(key, tmp, ".mp3")
+            self.assertEqual(cache.get(key), path)
+            self.assertEqual(os.path.basename(path), f"{key}.mp3")
+            print("✅ Cache hit after put")
+
+            # A second entry pushes the cache over max_bytes and evicts the first
+            other = AudioCache.make_key("world", "default", 120, "gtts")
+            tmp = cache.temp_path(other, ".mp3")
+            with open(tmp, "wb") as f:
+                f.write(b"12345678")
+            cache.put(other, tmp, ".mp3")
+            self.assertIsNone(cache.get(key))
+            self.assertFalse(os.path.exists(path))
+            print("✅ Least recently used entry evicted")
+
+    def test_idf_model(self):
+        """Test incremental corpus IDF and its persistence"""
+        print("\n--- Testing Corpus IDF Model ---")
+        with tempfile.TemporaryDirectory() as data_dir:
+            path = os.path.join(data_dir, "idf_model.db")
+            model = CorpusIDFModel(path, min_documents=2)
+            self.assertFalse(model.ready)
+            model.partial_fit(["Photosynthesis happens in plants.", "Respiration happens in cells."])
+            self.assertTrue(model.ready)
+
+            # "happens" is in every document, so the rarer term ranks first
+            self.assertEqual(model.top_keywords("Photosynthesis happens", top_n=1), ["photosynthesis"])
+            reloaded = CorpusIDFModel(path, min_documents=2)
+            self.assertEqual(reloaded.n_documents, 2)
+            self.assertEqual(reloaded.doc_freq, model.doc_freq)
+            print("✅ IDF statistics persisted and reloaded")
+
+            # Routine saves keep the version that deck cache keys depend on
+            version = model.version
+            self.assertGreater(version, 0)
+            model.partial_fit(["Osmosis happens in cells."])
+            self.assertEqual(model.version, version)
+            self.assertEqual(CorpusIDFModel(path, min_documents=2).version, version)
+            print("✅ IDF version stable across saves")
+
+            # Over the cap, pruning drops to prune_terms and leaves room for new terms
+            capped = CorpusIDFModel(os.path.join(data_dir, "capped.db"), max_terms=4, prune_terms=2)
+            capped.partial_fit(["alpha beta", "alpha gamma", "delta"])
+            pruned_version = capped.version
+            self.assertEqual(len(capped.doc_freq), 2)
+            self.assertIn("alpha", capped.doc_freq)
+            capped.partial_fit(["epsilon"])
+            self.assertIn("epsilon", capped.doc_freq)
+            self.assertEqual(capped.version, pruned_version)  # under the cap again, nothing pruned
+            self.assertEqual(CorpusIDFModel(os.path.join(data_dir, "capped.db")).doc_freq, capped.doc_freq)
+            print("✅ Pruning keeps room for new terms")
+
+    def test_deck_cache(self):
+        """Test deck reuse, version invalidation and eviction"""
+        print("\n--- Testing Deck Cache ---")
+        with tempfile.TemporaryDirectory() as data_dir:
+            path = os.path.join(data_dir, "decks.db")
+            cache = DeckCache(path, "1", max_decks=2)
+            for key in ("a", "b", "c"):
+                cache.put(key, "Medium", [{"question": key}])
+            self.assertIsNone(cache.get("a", "Medium"))
+            self.assertEqual(cache.get("c", "Medium"), [{"question": "c"}])
+            print("✅ Oldest deck evicted past max_decks")
+
+            self.assertIsNone(DeckCache(path, "2").get("c", "Medium"))
+            print("✅ Decks from another generator version dropped")
+
+    def test_spaced_repetition(self):
+        """Test SM-2 scheduling and due-card ordering"""
+        print("\n--- Testing Spaced Repetition ---")
+        with tempfile.TemporaryDirectory() as data_dir:
+            scheduler = SpacedRepetitionScheduler(os.path.join(data_dir, "srs.db"))
+            cards = [{"question": f"Q{i}", "answer": f"A{i}"} for i in range(3)]
+            self.assertEqual(scheduler.add_cards(self.user_id, cards, now=100), 3)
+            self.assertEqual(len(scheduler.due_cards(self.user_id, now=100)), 3)
+
+            state = scheduler.review(self.user_id, cards[0], quality=5, now=100)
+            self.assertEqual(state["interval_days"], 1)
+            state = scheduler.review(self.user_id, cards[0], quality=5, now=200)
+            self.assertEqual(state["interval_days"], 6)
+            due = scheduler.due_cards(self.user_id, now=200)
+            self.assertEqual([c["question"] for c in due], ["Q1", "Q2"])
+            print("✅ Reviewed card rescheduled, remaining cards due in order")
+
+            state = scheduler.review(self.user_id, cards[0], quality=1, now=300)
+            self.assertEqual((state["interval_days"], state["repetitions"], state["lapses"]), (1, 0, 1))
+            print("✅ Lapse resets the interval")
+
+            # now=0 is an explicit time, not "current time"; reviewing an unknown card enrolls it
+            scheduler.review(self.user_id, {"question": "Q9", "answer": "A9"}, quality=5, now=0)
+            stats = scheduler.stats(self.user_id, now=0)
+            self.assertEqual((stats["total_cards"], stats["due_now"]), (4, 0))
+            self.assertEqual(scheduler.stats(self.user_id, now=200)["due_now"], 2)
+            print("✅ Card totals kept by counter")
+
+    def test_quiz_bank(self):
+        """Test quiz bank claims, undersized responses and retries"""
+        print("\n--- Testing Quiz Bank ---")
+        with tempfile.TemporaryDirectory() as data_dir:
+            bank = QuizBank(os.path.join(data_dir, "quiz_bank.db"))
+            self.assertTrue(bank.claim("doc", "Easy", 3, now=1000))
+            self.assertFalse(bank.claim("doc", "Easy", 3, now=1010))
+            # A build that never finished (e.g. the process died) is reclaimed once stale
+            self.assertTrue(bank.claim("doc", "Easy", 3, now=1000 + 3600))
+            print("✅ Abandoned builds are reclaimed")
+
+            question = {"question": "Q?", "options": ["A", "B"], "correct_answer": 0}
+            builder = QuizBankBuilder(bank, max_workers=1, min_questions=3)
+            builder._summarizer = type("Summarizer", (), {
+                "_call_openai": lambda self, *args, **kwargs: json.dumps([question] * 2)
+            })()
+            builder._build("doc", "content", "Easy")
+            self.assertEqual(bank.status("doc", "Easy"), "failed")
+            self.assertIsNone(bank.sample("doc", "Easy", 3))
+            self.assertFalse(bank.claim("doc", "Easy", 3))
+            self.assertTrue(bank.claim("doc", "Easy", 3, now=time.time() + 3600))
+            print("✅ Undersized banks fail and are retried after a backoff")
+
+    def test_quiz_streaming(self):
+        """Test NDJSON reassembly and repair of streamed quiz questions"""
+        print("\n--- Testing Quiz Streaming ---")
+        stream = (
+            '{"question": "What does the term “osmosis” describe?", "options": ["A", "B"], '
+            '"correct_answer": 0}\n'
+            '{"question": "Broken", "options": ["A", "B"], "correct_answer": \n'
+            '{"question": "Trailing comma?", "options": ["A", "B",], "correct_answer": 1,}\n'
+            '{“question”: “Curly keys?”, “options”: [“A”, “B”], '
+            '“correct_answer”: 1}'
+        )
+        deltas = [stream[i:i + 7] for i in range(0, len(stream), 7)]
+        lines = list(iter_json_lines(deltas))
+        self.assertEqual(len(lines), 4)
+        print("✅ Chunked deltas reassembled into lines")
+
+        questions = [repair_question(line) for line in lines]
+        self.assertEqual(questions[0]["question"], "What does the term “osmosis” describe?")
+        self.assertIsNone(questions[1])
+        self.assertEqual(questions[2]["correct_answer"], 1)
+        self.assertEqual(questions[3]["question"], "Curly keys?")
+        print("✅ Valid lines kept as-is, slips repaired, malformed item dropped")
+
+    def test_image_store(self):
+        """Test content addressing in the rendered image store"""
+        print("\n--- Testing Image Store ---")
+        with tempfile.TemporaryDirectory() as data_dir:
+            store = ImageStore(os.path.join(data_dir, "images.db"))
+            digest = store.put(b"\x89PNG fake")
+            self.assertEqual(store.put(b"\x89PNG fake"), digest)
+            self.assertEqual(store.get(digest), (b"\x89PNG fake", "image/png"))
+            self.assertEqual(store.put_url(b"\x89PNG fake"), f"/api/images/{digest}")
+            self.assertIsNone(store.put_url(b""))
+            self.assertIsNone(store.get("../" + digest))
+            print("✅ Identical images share one digest and URL")
+
+            capped = ImageStore(os.path.join(data_dir, "capped.db"), max_bytes=10)
+            first = capped.put(b"123456")
+            capped.remember("render-input", first)
+            second = capped.put(b"abcdef")
+            self.assertIsNone(capped.get(first))
+            self.assertIsNone(capped.lookup("render-input"))
+            self.assertEqual(capped.get(second)[0], b"abcdef")
+            self.assertEqual(capped.total_bytes(), 6)
+            print("✅ Least recently used image evicted past max_bytes")
+
+    def test_achievements(self):
+        """Test counter-driven badge unlocks and legacy badge import"""
+        print("\n--- Testing Achievements ---")
+        with tempfile.TemporaryDirectory() as data_dir:
+            with open(os.path.join(data_dir, f"{self.user_id}_badges.json"), "w") as f:
+                json.dump({"quiz_correct": 9}, f)
+            engine = AchievementEngine(os.path.join(data_dir, "achievements.db"), legacy_dir=data_dir)
+
+            self.assertEqual(engine.record(self.user_id, "quiz_answer", {"correct": False}), [])
+            unlocked = engine.record(self.user_id, "quiz_answer", {"correct": True})
+            self.assertEqual([b["badge_id"] for b in unlocked], ["quiz_master"])
+            self.assertEqual(engine.record(self.user_id, "quiz_answer", {"correct": True}), [])
+            print("✅ Legacy count imported, badge unlocked exactly once")
+
+            engine.record(self.user_id, "streak", {"streak_days": 7})
+            summary = engine.summary(self.user_id)
+            self.assertEqual((summary["total_badges"], summary["total_points"]), (2, 150))
+            self.assertEqual(summary["recent_badges"][0]["title"], "Week Warrior")
+            print("✅ Totals and recent badges read back")
+
+    def test_view_cache(self):
+        """Test view reuse, ETags and invalidation"""
+        print("\n--- Testing View Cache ---")
+        with tempfile.TemporaryDirectory() as data_dir:
+            views = ViewCache(os.path.join(data_dir, "views.db"))
+            builds = []
+            build = lambda: builds.append(1) or {"builds": len(builds)}
+
+            payload, etag = views.get_or_build(self.user_id, "streak", build)
+            self.assertEqual(views.get_or_build(self.user_id, "streak", build), (payload, etag))
+            self.assertEqual(views.etag(self.user_id, "streak"), etag)
+            self.assertEqual(len(builds), 1)
+            print("✅ View built once and reused")
+
+            views.invalidate(self.user_id)
+            self.assertIsNone(views.etag(self.user_id, "streak"))
+            self.assertEqual(views.get_or_build(self.user_id, "streak", build)[0], {"builds": 2})
+            print("✅ Invalidation forces a rebuild")
+
+    def test_focus_event_ingestion(self):
+        """Test batched focus events and their running totals"""
+        print("\n--- Testing Focus Event Ingestion ---")
+        with tempfile.TemporaryDirectory() as data_dir:
+            store = FocusStore(os.path.join(data_dir, "focus.db"))
+            interactions = [
+                {"session_id": "s1", "timestamp": "2024-01-01T10:00:00", "type": "quiz_answer",
+                 "response_time": 12.0, "correct": True},
+                {"session_id": "s1", "timestamp": "2024-01-01T10:05:00", "type": "quiz_answer",
+                 "response_time": 4.0, "correct": False},
+            ]
+            breaks = [{"session_id": "s1", "timestamp": "2024-01-01T10:02:00", "type": "tab_switch", "duration": 18.0}]
+            totals = store.append_events(self.user_id, interactions, breaks)["s1"]
+            self.assertEqual(totals["interactions"], 2)
+            self.assertEqual(totals["breaks"], 2)  # the 12s answer also counts as a slow_response break
+            self.assertEqual(totals["total_focus_time"], 300 - 30)
+            print("✅ Batch appended with running totals")
+
+            later = [{"session_id": "s1", "timestamp": "2024-01-01T10:10:00", "type": "reading"}]
+            totals = store.append_events(self.user_id, later, [])["s1"]
+            self.assertEqual(totals["interactions"], 3)
+            self.assertEqual(totals["accuracy"], 0.5)
+            self.assertEqual(totals["total_focus_time"], 600 - 30)
+            print("✅ Later batch extends the same session")
+
+            last = [{"session_id": "s1", "timestamp": "2024-01-01T10:20:00", "type": "reading"}]
+            totals = store.append_events(self.user_id, last, [], close=True)["s1"]
+            self.assertFalse(totals["open"])
+            self.assertEqual(totals["total_focus_time"], 1200 - 30)
+            session = store.sessions_since(self.user_id, datetime(2024, 1, 1))[0]
+            self.assertTrue(session["completed"])
+            self.assertEqual(session["end_time"], "2024-01-01T10:20:00")
+            print("✅ Closing batch ends the session")
+
+            again = [{"session_id": "s1", "timestamp": "2024-01-02T09:00:00", "type": "reading"}]
+            totals = store.append_events(self.user_id, again, [])["s1"]
+            self.assertTrue(totals["open"])
+            self.assertEqual(totals["interactions"], 1)
+            self.assertEqual(len(store.sessions_since(self.user_id, datetime(2024, 1, 1))), 2)
+            print("✅ Events for a closed session start a new one")
+
+    def test_focus_store(self):
+        """Test the focus store's time window and legacy JSON import"""
+        print("\n--- Testing Focus Store ---")
+        with tempfile.TemporaryDirectory() as data_dir:
+            store = FocusStore(os.path.join(data_dir, "focus.db"))
+            since = datetime.now() - timedelta(days=7)
+            legacy = [
+                {"session_id": name, "start_time": (since + timedelta(seconds=offset)).isoformat(),
+                 "end_time": None, "interactions": [], "focus_breaks": [], "total_focus_time": 60,
+                 "completed": True}
+                for name, offset in (("outside", -1), ("boundary", 0), ("inside", 1))
+            ]
+            legacy[2]["interactions"] = [{"timestamp": legacy[2]["start_time"], "type": "reading"}]
+            path = os.path.join(data_dir, f"{self.user_id}_focus_sessions.json")
+            with open(path, "w") as f:
+                json.dump(legacy, f)
+
+            self.assertEqual(store.import_legacy_json(self.user_id, path), 3)
+            self.assertFalse(os.path.exists(path))
+            self.assertTrue(os.path.exists(path + ".migrated"))
+            self.assertEqual(store.import_legacy_json(self.user_id, path), 0)
+            print("✅ Legacy JSON imported once and moved aside")
+
+            sessions = store.sessions_since(self.user_id, since)
+            self.assertEqual([s["session_id"] for s in sessions], ["inside"])
+            self.assertEqual(len(sessions[0]["interactions"]), 1)
+            self.assertEqual(len(store.session_arrays(self.user_id, since)["focus_time"]), 1)
+            print("✅ Window keeps only sessions that started after the cutoff")
+
+    def test_media_delivery(self):
+        """Test byte ranges, conditional requests and precompressed variants"""
+        print("\n--- Testing Media Delivery ---")
+        with tempfile.TemporaryDirectory() as media_dir:
+            body = b"0123456789" * 100
+            filename = "ab" * 16 + ".txt"
+            with open(os.path.join(media_dir, filename), "wb") as f:
+                f.write(body)
+            self.assertIsNotNone(precompress(os.path.join(media_dir, filename)))
+
+            app = FastAPI()
+
+            @app.get("/media/{filename}")
+            def serve(request: Request, filename: str):
+                return media_response(request, media_dir, filename)
+
+            client = TestClient(app)
+            url = f"/media/{filename}"
+            plain = {"Accept-Encoding": "identity"}
+
+            response = client.get(url, headers={**plain, "Range": "bytes=-10"})
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(response.headers["content-range"], "bytes 990-999/1000")
+            self.assertEqual(response.content, body[-10:])
+            response = client.get(url, headers={**plain, "Range": "bytes=995-"})
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(response.content, body[995:])
+            print("✅ Suffix and open-ended ranges served as 206")
+
+            response = client.get(url, headers={**plain, "Range": "bytes=1000-"})
+            self.assertEqual(response.status_code, 416)
+            self.assertEqual(response.headers["content-range"], "bytes */1000")
+            print("✅ Unsatisfiable range answered with 416")
+
+            etag = client.get(url, headers=plain).headers["etag"]
+            response = client.get(url, headers={**plain, "If-None-Match": etag})
+            self.assertEqual(response.status_code, 304)
+            print("✅ Matching If-None-Match answered with 304")
+
+            response = client.get(url, headers={"Accept-Encoding": "gzip"})
+            self.assertEqual(response.headers["content-encoding"], "gzip")
+            self.assertNotEqual(response.headers["etag"], etag)
+            self.assertEqual(response.content, body)
+            response = client.get(url, headers={"Accept-Encoding": "gzip", "Range": "bytes=0-9"})
+            self.assertNotIn("content-encoding", response.headers)
+            self.assertEqual(response.content, body[:10])
+            print("✅ .gz sibling served when accepted and no range was asked for")
+
+    def test_answer_log(self):
+        """Test answer log totals shared by several writers"""
+        print("\n--- Testing Answer Log ---")
+        with tempfile.TemporaryDirectory() as data_dir:
+            path = os.path.join(data_dir, "answers.log")
+            # Two handles on one file stand in for two server processes
+            first, second = AnswerLog(path), AnswerLog(path)
+            for i in range(6):
+                (first if i % 2 else second).append(f"Q{i}", i < 3, 2.0, "Easy")
+            for log in (first, second, AnswerLog(path)):
+                stats = log.recent_stats()
+                self.assertEqual(stats["total"], 6)
+                self.assertEqual(stats["accuracy"], 0.5)
+            print("✅ Totals from both writers are kept")
+
+            first.append("Q6", True, 1.0, timestamp=0)
+            self.assertEqual(second.tail(1)[0]["timestamp"], 0)
+            print("✅ Explicit timestamp 0 is kept")
+
+    def test_learning_stats(self):
+        """Test daily learning aggregates, the recent ring and legacy import"""
+        print("\n--- Testing Learning Stats ---")
+        with tempfile.TemporaryDirectory() as data_dir:
+            stats = LearningStats(os.path.join(data_dir, "learning_stats.db"))
+            now = datetime.now()
+            old_session = {"start_time": (now - timedelta(days=2)).isoformat(), "completed": True,
+                           "total_time": 600, "understanding_level": 4, "activities": [{"type": "quiz"}]}
+            session_file = os.path.join(data_dir, "sessions.json")
+            with open(session_file, "w") as f:
+                json.dump([old_session], f)
+            self.assertTrue(stats.import_legacy(self.user_id, session_file, os.path.join(data_dir, "moods.json")))
+            self.assertFalse(stats.import_legacy(self.user_id, session_file, os.path.join(data_dir, "moods.json")))
+
+            for level in (2, None):
+                stats.record_session(self.user_id, {"start_time": now.isoformat(), "completed": True,
+                                                    "total_time": 300, "understanding_level": level,
+                                                    "activities": [{"type": "quiz"}, {"type": "flashcard"}]})
+            stats.record_mood(self.user_id, {"timestamp": now.isoformat(), "mood_name": "Happy"})
+
+            window = stats.window(self.user_id, 30)
+            self.assertEqual(window["total_sessions"], 3)
+            self.assertEqual(window["total_time"], 1200)
+            self.assertEqual(window["avg_understanding"], 3)
+            self.assertEqual(window["activity_breakdown"], {"quiz": 3, "flashcard": 2})
+            self.assertEqual(window["mood_trends"], {"Happy": 1})
+            self.assertEqual(stats.window(self.user_id, 1)["total_sessions"], 2)
+            self.assertEqual(len(stats.recent_sessions(self.user_id)), 3)
+            print("✅ Windows summed from daily buckets")
+
+    def test_artifact_store_sweep(self):
+        """Test age-based eviction and pinning in the artifact store"""
+        print("\n--- Testing Artifact Store ---")
+        with tempfile.TemporaryDirectory() as data_dir:
+            store = ArtifactStore(os.path.join(data_dir, "artifacts.db"),
+                                  {"uploads": {"max_age_seconds": 60}})
+            uploads_dir = os.path.join(data_dir, "uploads")
+            os.makedirs(uploads_dir)
+            old_file = os.path.join(uploads_dir, "old.txt")
+            pinned_file = os.path.join(uploads_dir, "pinned.txt")
+            sidecar = old_file + ".gz"
+            temp_file = os.path.join(uploads_dir, "new.txt.gz.part")
+            for path in (old_file, pinned_file, sidecar, temp_file):
+                with open(path, "w") as f:
+                    f.write("content")
+                os.utime(path, (0, 0))
+            # The sidecar and the in-progress temp file are not adopted
+            self.assertEqual(store.adopt_directory("uploads", uploads_dir), 2)
+
+            store.acquire(pinned_file)
+            self.assertEqual(store.sweep(), 1)
+            self.assertFalse(os.path.exists(old_file))
+            self.assertFalse(os.path.exists(sidecar))
+            self.assertTrue(os.path.exists(pinned_file))
+            self.assertTrue(os.path.exists(temp_file))
+            self.assertEqual(store.stats("uploads")["files"], 1)
+            print("✅ Expired file evicted with its sidecar, pinned and temp files kept")
+
     def test_flashcard_generator(self):
         """Test flashcard generator"""
         print("\n--- Testing Flashcard Generator ---")
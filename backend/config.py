@@ -22,17 +22,50 @@ DATA_DIR = "chapters"
 UPLOADS_DIR = "uploads"
 AUDIO_DIR = "audio"
 USER_DATA_DIR = "user_data"
+FEEDBACK_ASSET_DIR = "feedback_assets"  # pre-rendered feedback cards
+FEEDBACK_RENDERER = "pillow"  # "pillow" (PIL.ImageDraw) or "matplotlib"
+RENDER_WORKER_COUNT = 2  # chart/card rendering processes
+RENDER_JOB_TIMEOUT = 15  # seconds a worker gets for one render, counted from when it picks the job up
+RENDER_QUEUE_TIMEOUT = 10  # seconds a request waits for an idle render worker
 
 # === User Settings ===
 DEFAULT_USER_ID = "demo_user"
 TTS_RATE = 120  # Slower for neuro-friendly learning
 TTS_PAUSE_DURATION = 0.5
+AUDIO_CACHE_MAX_BYTES = 500 * 1024 * 1024  # LRU bound for synthesized audio
+TTS_WORKER_COUNT = os.cpu_count() or 1  # Local pyttsx3 worker processes
+TTS_JOB_TIMEOUT = 60  # seconds per synthesis job
 
 # === Learning Settings ===
 FLASHCARD_DIFFICULTY_LEVELS = ["Easy", "Medium", "Hard"]
 QUIZ_QUESTION_COUNT = 3
+QUIZ_BANK_SIZE = 12  # questions generated per difficulty when content is saved
+QUIZ_BANK_WORKERS = 2
+QUIZ_BANK_BUILD_TIMEOUT = 300  # seconds before an unfinished bank build is treated as abandoned
+QUIZ_BANK_RETRY_SECONDS = 600  # wait before retrying a failed bank build
 FOCUS_TIME_THRESHOLD = 10  # seconds
 STREAK_GOALS = [3, 7, 14, 30]
+SPACY_MODEL = "en_core_web_sm"
+SPACY_CHUNK_CHARS = 100_000  # flashcard text is analyzed in paragraph-aligned chunks of this size
+SPACY_BATCH_SIZE = 4  # chunks per nlp.pipe batch
+SPACY_N_PROCESS = 1  # >1 runs nlp.pipe in worker processes for very long documents
+FLASHCARD_BATCH_WORKERS = 4  # threads building decks in /api/flashcards/generate/batch
+IDF_MODEL_DB = os.path.join(USER_DATA_DIR, "idf_model.db")
+IDF_LEGACY_PATH = os.path.join(USER_DATA_DIR, "idf_model.json")  # imported once into IDF_MODEL_DB
+IDF_MIN_DOCUMENTS = 5  # below this, keywords fall back to a per-request TF-IDF fit
+IDF_MAX_TERMS = 200_000
+IDF_PRUNE_TERMS = 150_000  # terms kept when IDF_MAX_TERMS is exceeded
+DECK_CACHE_DB = os.path.join(USER_DATA_DIR, "decks.db")
+DECK_CACHE_MAX_DECKS = 5000  # oldest decks are evicted past this
+SRS_DB = os.path.join(USER_DATA_DIR, "spaced_repetition.db")
+QUIZ_BANK_DB = os.path.join(USER_DATA_DIR, "quiz_bank.db")
+ACHIEVEMENTS_DB = os.path.join(USER_DATA_DIR, "achievements.db")
+IMAGE_CACHE_DB = os.path.join(USER_DATA_DIR, "images.db")  # content-addressed rendered images served from /api/images
+IMAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024  # least recently used images are evicted past this
+VIEW_CACHE_DB = os.path.join(USER_DATA_DIR, "views.db")  # cached streak/performance payloads
+FOCUS_DB = os.path.join(USER_DATA_DIR, "focus.db")
+LEARNING_STATS_DB = os.path.join(USER_DATA_DIR, "learning_stats.db")  # daily learning-session aggregates
+FOCUS_EVENT_BATCH_MAX = 1000  # events per POST /api/focus/events
 
 # === Supported Languages ===
 SUPPORTED_LANGUAGES = {
@@ -52,6 +85,15 @@ MOOD_OPTIONS = {
    "😴": "Tired"
 }
 
+# === Generated Artifacts (audio, uploads) ===
+ARTIFACT_DB = os.path.join(USER_DATA_DIR, "artifacts.db")
+ARTIFACT_SWEEP_INTERVAL = 300  # seconds between background sweeps
+ARTIFACT_QUOTAS = {
+   "audio": {"directory": AUDIO_DIR, "max_bytes": AUDIO_CACHE_MAX_BYTES, "max_age_seconds": 24 * 3600},
+   "audio_cache": {"directory": "audio_cache", "max_bytes": AUDIO_CACHE_MAX_BYTES, "max_age_seconds": 24 * 3600},
+   "uploads": {"directory": UPLOADS_DIR, "max_bytes": 1024 * 1024 * 1024, "max_age_seconds": 90 * 24 * 3600}
+}
+
 # === Create directories if they don't exist ===
 for dir_name in [DATA_DIR, UPLOADS_DIR, AUDIO_DIR, USER_DATA_DIR]:
    os.makedirs(dir_name, exist_ok=True)
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""
+Persistent cache of generated flashcard decks.
+
+Decks are keyed by (deck key, difficulty, generator version); the deck key
+hashes the content together with the keyword statistics it was built with.
+Entries written by another generator version are dropped when the cache
+opens, so bumping flashcard_generator.GENERATOR_VERSION invalidates every
+stale deck. Past max_decks the oldest decks are evicted.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config import DECK_CACHE_DB, DECK_CACHE_MAX_DECKS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS decks (
+    content_hash TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    version TEXT NOT NULL,
+    flashcards TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (content_hash, difficulty, version)
+);
+CREATE INDEX IF NOT EXISTS idx_decks_created ON decks(created);
+"""
+
+
+class DeckCache:
+    """SQLite-backed store of decks for one generator version"""
+
+    def __init__(self, db_path: str, version: str, max_decks: int = DECK_CACHE_MAX_DECKS):
+        self.version = str(version)
+        self.max_decks = max_decks
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self.invalidate_stale()
+
+    def invalidate_stale(self) -> int:
+        """Drop decks produced by any other generator version"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM decks WHERE version != ?", (self.version,))
+            return max(cursor.rowcount, 0)
+
+    def get(self, content_hash: str, difficulty: str) -> Optional[List[Dict]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT flashcards FROM decks WHERE content_hash = ? AND difficulty = ? AND version = ?",
+                (content_hash, difficulty, self.version),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, content_hash: str, difficulty: str, flashcards: List[Dict]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO decks(content_hash, difficulty, version, flashcards, created) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (content_hash, difficulty, self.version, json.dumps(flashcards), time.time()),
+            )
+            self._conn.execute(
+                "DELETE FROM decks WHERE rowid IN "
+                "(SELECT rowid FROM decks ORDER BY created DESC, rowid DESC LIMIT -1 OFFSET ?)",
+                (self.max_decks,),
+            )
+
+
+_shared_caches: Dict[str, DeckCache] = {}
+_shared_caches_lock = threading.Lock()
+
+
+def get_deck_cache(version: str) -> DeckCache:
+    """Process-wide cache at config.DECK_CACHE_DB for a generator version"""
+    with _shared_caches_lock:
+        cache = _shared_caches.get(str(version))
+        if cache is None:
+            cache = _shared_caches[str(version)] = DeckCache(DECK_CACHE_DB, version)
+        return cache
@@ -11,15 +11,16 @@ from datetime import datetime
 from typing import Optional, Dict, List
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException, WebSocket,Request,Cookie,Depends,Response,APIRouter
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse,RedirectResponse
+from fastapi.responses import JSONResponse, FileResponse,RedirectResponse,StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import uvicorn
 from dotenv import load_dotenv
 from urllib.parse import urlencode
 from pathlib import Path
 import shutil
 import requests
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
 from jwt_utils.auth import create_access_token, decode_token
 from flashcard_generator import  FlashcardGenerator
@@ -27,6 +28,17 @@ import config_fold.db as db
 from model.user_model import RegisterModel , LoginModel , SessionModel
 
 from routes.user_routes import router as user_router
+from config import TTS_JOB_TIMEOUT, FOCUS_EVENT_BATCH_MAX
+from artifact_store import get_artifact_store
+from idf_model import get_idf_model
+from spaced_repetition import get_scheduler
+from quiz_bank import get_quiz_bank_builder
+from media_delivery import media_response, blob_response, view_response
+from feedback_catalog import get_feedback_catalog
+from image_store import get_image_store
+from render_service import get_render_service
+from view_cache import get_view_cache
+from focus_store import get_focus_store
 
 # Import our custom modules
 import sys
@@ -53,12 +65,16 @@ try:
         class NeuroTTSEngine:
             def create_summary_audio(self, summaries, mode): return None
             def create_audio_file(self, text): return None
+            def start_progressive_audio(self, text): return None
+            def get_progressive_job(self, job_id): return None
 
     try:
         from flashcard_generator import FlashcardGenerator
     except ImportError:
         class FlashcardGenerator:
             def generate_flashcards(self, content, difficulty): return []
+            def generate_deck(self, content, difficulty, seed=None): return []
+            def generate_flashcard_batch(self, documents, difficulty, seed=None): return iter([])
             def save_flashcard_performance(self, user_id, card, correct, response_time): return None
 
     try:
@@ -67,6 +83,7 @@ try:
         class FocusTracker:
             def __init__(self, user_id): pass
             def get_focus_analytics(self, days): return {"total_sessions": 0, "avg_focus_time": 0, "completion_rate": 0, "avg_response_time": 0, "accuracy": 0, "break_frequency": {}}
+            def focus_chart_url(self, analytics): return None
 
     try:
         from quiz_system import EnhancedGamifiedQuizSystem
@@ -150,8 +167,28 @@ os.makedirs("audio_cache", exist_ok=True)
 os.makedirs("uploads", exist_ok=True)
 BASE_DIR = Path(__file__).resolve().parent
 AUDIO_DIR = BASE_DIR / "audio"
-app.mount("/audio", StaticFiles(directory=AUDIO_DIR), name="audio")
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+os.makedirs(AUDIO_DIR, exist_ok=True)
+
+# Generated media: immutable caching for content-hashed names, ETags and byte ranges
+@app.api_route("/audio/{filename}", methods=["GET", "HEAD"])
+def serve_audio(filename: str, request: Request):
+    return media_response(request, str(AUDIO_DIR), filename)
+
+@app.api_route("/uploads/{filename}", methods=["GET", "HEAD"])
+def serve_upload(filename: str, request: Request):
+    return media_response(request, "uploads", filename)
+
+@app.api_route("/feedback/{filename}", methods=["GET", "HEAD"])
+def serve_feedback_image(filename: str, request: Request):
+    return media_response(request, get_feedback_catalog().directory, filename)
+
+@app.api_route("/api/images/{digest}", methods=["GET", "HEAD"])
+def serve_image(digest: str, request: Request):
+    image = get_image_store().get(digest)
+    if image is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    data, media_type = image
+    return blob_response(request, data, media_type, digest)
 
 
 # include the router
@@ -169,6 +206,8 @@ except:
     class DummyTTSEngine:
         def create_summary_audio(self, summaries, mode): return None
         def create_audio_file(self, text): return None
+        def start_progressive_audio(self, text): return None
+        def get_progressive_job(self, job_id): return None
     tts_engine = DummyTTSEngine()
 
 try:
@@ -176,6 +215,8 @@ try:
 except:
     class DummyFlashcardGen:
         def generate_flashcards(self, content, difficulty): return []
+        def generate_deck(self, content, difficulty, seed=None): return []
+        def generate_flashcard_batch(self, documents, difficulty, seed=None): return iter([])
         def save_flashcard_performance(self, user_id, card, correct, response_time): return None
     flashcard_gen = DummyFlashcardGen()
 
@@ -227,6 +268,20 @@ class FlashcardRequest(BaseModel):
     content: str
     difficulty: str
     user_id: str
+    seed: Optional[int] = None  # shuffle the (otherwise fixed) deck order reproducibly
+
+class FlashcardReviewRequest(BaseModel):
+    user_id: str
+    question: str
+    answer: str
+    quality: int  # SM-2 recall quality, 0 (blackout) to 5 (perfect)
+    card_id: Optional[str] = None
+
+class FlashcardBatchRequest(BaseModel):
+    documents: List[str]
+    difficulty: str
+    user_id: str
+    seed: Optional[int] = None
 
 class QuizRequest(BaseModel):
     content: str
@@ -239,6 +294,28 @@ class QuizAnswer(BaseModel):
     selected_answer: int
     response_time: float
 
+class FocusInteractionEvent(BaseModel):
+    session_id: str
+    timestamp: datetime
+    type: str
+    response_time: Optional[float] = Field(None, ge=0)
+    correct: Optional[bool] = None
+    focus_duration_before: Optional[float] = Field(None, ge=0)
+
+class FocusBreakEvent(BaseModel):
+    session_id: str
+    timestamp: datetime
+    type: str
+    duration: float = Field(..., ge=0)
+
+class FocusEventBatch(BaseModel):
+    user_id: str
+    interactions: List[FocusInteractionEvent] = []
+    breaks: List[FocusBreakEvent] = []
+    content_type: Optional[str] = None  # used when the batch opens a new session
+    content_title: Optional[str] = None
+    close: bool = False  # end the batch's sessions after appending its events
+
 class VoiceSessionRequest(BaseModel):
     user_id: str
 
@@ -491,6 +568,11 @@ def save_content(
     try:
         path = file_processor.save_content(content, filename, content_type)
 
+        # Feed the corpus IDF used for flashcard keyword extraction
+        get_idf_model().partial_fit([content])
+        # Pre-generate quiz questions so opening a quiz later is a local lookup
+        get_quiz_bank_builder().schedule(content)
+
         # Add to AI coach knowledge base
         if user_id:
             components = get_user_components(user_id)
@@ -508,11 +590,27 @@ flashcard_generator = FlashcardGenerator()
 def generate_flashcards(request: FlashcardRequest):
     """Generate flashcards from content"""
     try:
-        flashcards = flashcard_generator.generate_flashcards(request.content, request.difficulty)
+        flashcards = flashcard_generator.generate_deck(request.content, request.difficulty, request.seed)
+        if request.user_id and flashcards:
+            # Enroll the deck for spaced repetition; known cards keep their schedule
+            get_scheduler().add_cards(request.user_id, flashcards)
         return {"flashcards": flashcards}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/flashcards/generate/batch")
+def generate_flashcard_batch(request: FlashcardBatchRequest):
+    """Generate one deck per document, streamed as NDJSON lines as each deck finishes"""
+    if not request.documents:
+        raise HTTPException(status_code=400, detail="No documents provided")
+
+    def _deck_lines():
+        for result in flashcard_generator.generate_flashcard_batch(request.documents, request.difficulty,
+                                                                   request.seed):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(_deck_lines(), media_type="application/x-ndjson")
+
 @app.post("/api/flashcards/performance")
 def save_flashcard_performance(
     user_id: str = Form(...),
@@ -529,6 +627,26 @@ def save_flashcard_performance(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/flashcards/due")
+def get_due_flashcards(user_id: str, limit: int = 20):
+    """Next flashcards due for spaced-repetition review, most overdue first"""
+    try:
+        scheduler = get_scheduler()
+        return {"cards": scheduler.due_cards(user_id, limit), "stats": scheduler.stats(user_id)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/flashcards/review")
+def review_flashcard(request: FlashcardReviewRequest):
+    """Record a spaced-repetition review and return the card's next due time"""
+    if not 0 <= request.quality <= 5:
+        raise HTTPException(status_code=400, detail="quality must be between 0 and 5")
+    try:
+        card = {"question": request.question, "answer": request.answer, "card_id": request.card_id}
+        return get_scheduler().review(request.user_id, card, request.quality)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # ============= QUIZ ENDPOINTS =============
 @app.post("/api/quiz/generate")
 def generate_quiz(request: QuizRequest):
@@ -551,6 +669,28 @@ def generate_quiz(request: QuizRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/quiz/generate/stream")
+def generate_quiz_stream(request: QuizRequest):
+    """Stream quiz questions as NDJSON: a session line, then each question as soon as it is ready"""
+    components = get_user_components(request.user_id)
+    quiz_system = components['quiz_system']
+    session_id = quiz_system.create_quiz_session([], "Generated Quiz", generating=True)
+
+    def _question_lines():
+        yield json.dumps({"type": "session", "session_id": session_id}) + "\n"
+        try:
+            for question in quiz_system.stream_quiz_questions(request.content, request.difficulty):
+                index = quiz_system.add_streamed_question(session_id, question)
+                yield json.dumps({"type": "question", "index": index, "question": question}) + "\n"
+        except Exception as e:
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+        finally:
+            quiz_system.finish_streamed_session(session_id)
+        total = len(quiz_system.get_quiz_session(session_id).get("questions", []))
+        yield json.dumps({"type": "done", "total_questions": total}) + "\n"
+
+    return StreamingResponse(_question_lines(), media_type="application/x-ndjson")
+
 @app.post("/api/quiz/answer")
 def submit_quiz_answer(answer: QuizAnswer):
     """Submit quiz answer"""
@@ -578,13 +718,13 @@ def get_quiz_session(session_id: str, user_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/quiz/streak/{user_id}")
-def get_streak_info(user_id: str):
-    """Get user streak information"""
+def get_streak_info(user_id: str, request: Request):
+    """Get user streak information (cached until the next quiz completes)"""
     try:
-        components = get_user_components(user_id)
-        quiz_system = components['quiz_system']
-        streak_info = quiz_system.get_streak_info()
-        return streak_info
+        views = get_view_cache()
+        return view_response(request, lambda: views.get_or_build(
+            user_id, "streak", lambda: get_user_components(user_id)['quiz_system'].get_streak_info()
+        ), views.etag(user_id, "streak"))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -646,6 +786,28 @@ def get_voice_conversation_history(session_id: str, limit: int = 10):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# ============= FOCUS EVENTS =============
+@app.post("/api/focus/events")
+def ingest_focus_events(batch: FocusEventBatch):
+    """Append a batch of client focus events in one write; returns the running totals of the sessions touched"""
+    event_count = len(batch.interactions) + len(batch.breaks)
+    if not event_count:
+        raise HTTPException(status_code=400, detail="No events provided")
+    if event_count > FOCUS_EVENT_BATCH_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {FOCUS_EVENT_BATCH_MAX} events per batch")
+    try:
+        sessions = get_focus_store().append_events(
+            batch.user_id,
+            [event.dict() for event in batch.interactions],
+            [event.dict() for event in batch.breaks],
+            batch.content_type,
+            batch.content_title,
+            batch.close,
+        )
+        return {"accepted": event_count, "sessions": sessions}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # ============= ANALYTICS ENDPOINTS =============
 @app.get("/api/analytics/focus/{user_id}")
 def get_focus_analytics(user_id: str, days: int = 7):
@@ -654,6 +816,7 @@ def get_focus_analytics(user_id: str, days: int = 7):
         components = get_user_components(user_id)
         focus_tracker = components['focus_tracker']
         analytics = focus_tracker.get_focus_analytics(days)
+        analytics["focus_chart"] = focus_tracker.focus_chart_url(analytics)
         return analytics
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -670,13 +833,13 @@ def get_learning_analytics(user_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/analytics/performance/{user_id}")
-def get_performance_analytics(user_id: str):
-    """Get quiz performance analytics"""
+def get_performance_analytics(user_id: str, request: Request):
+    """Get quiz performance analytics (cached until the next quiz completes)"""
     try:
-        components = get_user_components(user_id)
-        quiz_system = components['quiz_system']
-        analytics = quiz_system.get_performance_analytics()
-        return analytics
+        views = get_view_cache()
+        return view_response(request, lambda: views.get_or_build(
+            user_id, "performance", lambda: get_user_components(user_id)['quiz_system'].get_performance_analytics()
+        ), views.etag(user_id, "performance"))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -736,6 +899,55 @@ def create_audio(text: str = Form(...), voice_type: str = Form("summary")):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/tts/progressive")
+def create_progressive_audio(text: str = Form(...)):
+    """Start sentence-parallel synthesis and return the segment list right away"""
+    try:
+        job = tts_engine.start_progressive_audio(text)
+        if not job:
+            raise HTTPException(status_code=400, detail="Nothing to synthesize")
+        return job
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _get_progressive_job(job_id: str):
+    job = tts_engine.get_progressive_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown audio job")
+    return job
+
+@app.get("/api/tts/progressive/{job_id}")
+def get_progressive_audio(job_id: str):
+    """Segment readiness and the assembled file once every segment is done"""
+    job = _get_progressive_job(job_id)
+    return tts_engine.progressive.describe(job)
+
+@app.get("/api/tts/segments/{job_id}/{index}")
+def get_audio_segment(job_id: str, index: int):
+    """Audio for one segment; waits until that segment has been synthesized"""
+    job = _get_progressive_job(job_id)
+    if index < 0 or index >= len(job.segments):
+        raise HTTPException(status_code=404, detail="Unknown segment")
+    try:
+        path = job.segment_path(index, timeout=TTS_JOB_TIMEOUT)
+    except FutureTimeoutError:
+        raise HTTPException(status_code=504, detail="Segment is still being synthesized")
+    if not path:
+        raise HTTPException(status_code=500, detail="Failed to create audio")
+    return FileResponse(path)
+
+@app.get("/api/tts/stream/{job_id}")
+def stream_progressive_audio(job_id: str):
+    """One chunked audio stream that grows as segments finish"""
+    job = _get_progressive_job(job_id)
+    try:
+        media_type = job.media_type(timeout=TTS_JOB_TIMEOUT)
+    except FutureTimeoutError:
+        raise HTTPException(status_code=504, detail="Segment is still being synthesized")
+    return StreamingResponse(job.iter_stream(timeout=TTS_JOB_TIMEOUT), media_type=media_type)
+
 # ============= WEBSOCKET FOR REAL-TIME COMMUNICATION =============
 @app.websocket("/api/ws/{user_id}")
 async def websocket_endpoint(websocket: WebSocket, user_id: str):
@@ -808,9 +1020,16 @@ def get_config():
 @app.on_event("startup")
 async def startup_event():
     await db.connect_db()
+    # Keep audio/ and uploads/ within their quotas (replaces delete_old_audio.py)
+    get_artifact_store().start_sweeper()
+    # Render feedback cards once so answering a quiz never draws an image
+    get_feedback_catalog().start_prerender()
+    # Chart rendering runs in worker processes, away from request handling
+    get_render_service()
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    get_artifact_store().stop_sweeper()
     await db.close_db()
 
 
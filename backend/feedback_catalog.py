@@ -0,0 +1,120 @@
+"""
+Catalog of pre-rendered feedback images.
+
+Feedback cards come from a small, fixed set of (category, message, mood)
+combinations, so each one is rendered once to a PNG named after its content
+hash and then referenced by ID/URL. The known set is rendered at startup;
+anything else is rendered the first time it is asked for and reused after.
+"""
+
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import FEEDBACK_ASSET_DIR, FEEDBACK_RENDERER
+from achievements import BADGES
+from utils_fold.hash_utils import content_hash
+
+FEEDBACK_URL_PREFIX = "/feedback"
+
+# Every message VisualFeedbackManager can show on a fixed card
+CATALOG_ENTRIES: List[Tuple[str, str, str]] = [
+    ("quiz_feedback", "⚡ Lightning fast! You really know this!", "excellent"),
+    ("quiz_feedback", "✅ Correct! Well done!", "good"),
+    ("quiz_feedback", "✅ Correct! Take your time, accuracy matters!", "thoughtful"),
+    ("quiz_feedback", "💡 Learning opportunity! Review and try again.", "encouraging"),
+    ("streak", "🏆 LEGENDARY STREAK! You're unstoppable!", "legendary"),
+    ("streak", "🔥 Week-long streak! Amazing dedication!", "fire"),
+    ("streak", "⭐ Building momentum! Keep it up!", "building"),
+    ("streak", "🌟 Great start! Every day counts!", "starting"),
+    ("focus_session", "🎯 Deep focus achieved! Excellent concentration!", "focused"),
+    ("focus_session", "💪 Good focus session! Building your attention!", "good"),
+    ("focus_session", "🌱 Great start! Focus grows with practice!", "growing"),
+    ("daily_motivation", "🌟 Every expert was once a beginner!", "motivation"),
+    ("daily_motivation", "🚀 Progress, not perfection!", "motivation"),
+    ("daily_motivation", "💪 Your brain grows with every challenge!", "motivation"),
+    ("daily_motivation", "🎯 Focus on the journey, not just the destination!", "motivation"),
+    ("daily_motivation", "🌱 Small steps lead to big achievements!", "motivation"),
+    ("daily_motivation", "⭐ You're building something amazing!", "motivation"),
+    ("daily_motivation", "🔥 Consistency beats intensity!", "motivation"),
+    ("daily_motivation", "💡 Every question makes you smarter!", "motivation"),
+] + [("badge", rule["card"], "achievement") for rule in BADGES.values()]
+
+
+def asset_id(category: str, text: str, mood: str, variant: str = "") -> str:
+    """variant names the renderer, so switching renderers doesn't serve stale files"""
+    return content_hash("feedback", category, text, mood, variant)
+
+
+class FeedbackCatalog:
+    """Feedback PNGs on disk, addressed by the hash of what they show"""
+
+    def __init__(self, directory: str, render: Callable[[str, str, str], bytes], variant: str = ""):
+        self.directory = directory
+        self.render = render
+        self.variant = variant
+        # Keeps two requests from rendering the same missing card at once
+        self._render_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, image_id: str) -> str:
+        return os.path.join(self.directory, f"{image_id}.png")
+
+    @staticmethod
+    def url(image_id: str) -> str:
+        return f"{FEEDBACK_URL_PREFIX}/{image_id}.png"
+
+    def _ensure(self, category: str, text: str, mood: str) -> Optional[str]:
+        image_id = asset_id(category, text, mood, self.variant)
+        path = self.path(image_id)
+        if os.path.exists(path):
+            return image_id
+        with self._render_lock:
+            if os.path.exists(path):
+                return image_id
+            png = self.render(category, text, mood)
+            if not png:
+                return None
+            tmp_path = f"{path}.part"
+            with open(tmp_path, "wb") as f:
+                f.write(png)
+            os.replace(tmp_path, path)
+        return image_id
+
+    def get(self, category: str, text: str, mood: str) -> Dict:
+        """{"image_id", "image"} for a card; "image" is its URL (None if rendering failed)"""
+        image_id = self._ensure(category, text, mood)
+        return {"image_id": image_id, "image": self.url(image_id) if image_id else None}
+
+    def prerender(self, entries: List[Tuple[str, str, str]] = CATALOG_ENTRIES) -> int:
+        """Render every catalog entry that is not on disk yet; returns how many were rendered"""
+        rendered = 0
+        for category, text, mood in entries:
+            if not os.path.exists(self.path(asset_id(category, text, mood, self.variant))):
+                if self._ensure(category, text, mood):
+                    rendered += 1
+        return rendered
+
+    def start_prerender(self) -> threading.Thread:
+        thread = threading.Thread(target=self.prerender, daemon=True, name="feedback-prerender")
+        thread.start()
+        return thread
+
+
+_shared_catalog: Optional[FeedbackCatalog] = None
+_shared_catalog_lock = threading.Lock()
+
+
+def get_feedback_catalog() -> FeedbackCatalog:
+    """Process-wide catalog in config.FEEDBACK_ASSET_DIR"""
+    global _shared_catalog
+    with _shared_catalog_lock:
+        if _shared_catalog is None:
+            from visual_feedback_manager import render_feedback_png
+            _shared_catalog = FeedbackCatalog(FEEDBACK_ASSET_DIR, render_feedback_png, FEEDBACK_RENDERER)
+        return _shared_catalog
+
+
+if __name__ == "__main__":
+    # Build step: python feedback_catalog.py
+    print(f"🎨 Feedback catalog ready. Images rendered: {get_feedback_catalog().prerender()}")
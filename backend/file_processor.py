@@ -9,6 +9,8 @@ from typing import Tuple
 import pytesseract
 from PIL import Image
 from pdf2image import convert_from_bytes
+from artifact_store import get_artifact_store
+from media_delivery import precompress
 
 
 # Load environment variables
@@ -166,6 +168,9 @@ class FileProcessor:
             filepath = os.path.join("uploads", f"{filename}_{content_type}.txt")
             with open(filepath, 'w', encoding='utf-8') as f:
                 f.write(content)
+            get_artifact_store().register(filepath, "uploads")
+            # Text compresses well; /uploads serves the .gz sibling to clients that accept it
+            precompress(filepath)
             return filepath
         except Exception as e:
             print(f"Error saving content: {str(e)}")
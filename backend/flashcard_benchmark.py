@@ -0,0 +1,189 @@
+"""
+Flashcard Generator Benchmarks
+Run with: python flashcard_benchmark.py
+"""
+
+import re
+import time
+import random
+from typing import List, Optional
+
+import spacy
+
+from config import SPACY_MODEL
+from flashcard_generator import FlashcardGenerator, SentenceIndex, find_definitions
+
+WORDS_PER_PAGE = 500
+
+TOPIC_SENTENCES = [
+    "Photosynthesis is the process by which plants convert light energy into chemical energy.",
+    "Chlorophyll absorbs light, primarily in the blue and red wavelengths.",
+    "The light-dependent reactions occur in the thylakoid membranes and generate ATP and NADPH.",
+    "The Calvin cycle uses ATP and NADPH to fix carbon dioxide into glucose.",
+    "Cellular respiration releases the energy stored in glucose molecules.",
+    "Mitochondria are often described as the powerhouse of the cell.",
+    "Enzymes lower the activation energy required for chemical reactions.",
+    "The Krebs cycle produces electron carriers used by the electron transport chain.",
+]
+
+
+def make_document(pages: int, seed: int = 7) -> str:
+    """Synthetic course text of roughly the given number of pages"""
+    rng = random.Random(seed)
+    sentences: List[str] = []
+    words = 0
+    while words < pages * WORDS_PER_PAGE:
+        sentence = rng.choice(TOPIC_SENTENCES)
+        # Vary the vocabulary so the index has realistic posting lists
+        sentence = sentence.replace("energy", f"energy{rng.randint(0, 50)}", 1)
+        sentences.append(sentence)
+        words += len(sentence.split())
+    return "\n".join(" ".join(sentences[i:i + 6]) for i in range(0, len(sentences), 6))
+
+
+CONTEXT_TERMS = ["Calvin cycle", "thylakoid membranes", "Mitochondria", "electron transport chain",
+                 "activation energy", "glucose molecules", "Chlorophyll", "Krebs cycle", "missing term"] * 25
+
+
+def scan_context(sentences: List[str], term: str, max_len: int = 220) -> Optional[str]:
+    """Reference lookup: test every sentence in order with the index's whole-word rule"""
+    pattern = SentenceIndex.whole_word_pattern(term.lower())
+    for sent in sentences:
+        if pattern.search(sent.lower()):
+            return sent[:max_len].strip()
+    return None
+
+
+def legacy_get_context(text: str, term: str, max_len: int = 220) -> str:
+    """The pre-index lookup: re-split the whole text and scan every sentence per term"""
+    sentences = [s.strip() for s in re.split(r"[.\n]", text) if s.strip()]
+    ctx = scan_context(sentences, term, max_len)
+    if ctx:
+        return ctx
+    return text[:max_len].strip() if text else ""
+
+
+def bench_context_lookup(gen: FlashcardGenerator, pages: int = 50):
+    print(f"\n📚 Context lookup on a {pages}-page document (regex sentences)")
+    text = make_document(pages)
+
+    start = time.perf_counter()
+    legacy = [legacy_get_context(text, t) for t in CONTEXT_TERMS]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = SentenceIndex(gen._split_sentences(text))
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    indexed = [gen._get_context(text, t, index=index) for t in CONTEXT_TERMS]
+    lookup_time = time.perf_counter() - start
+
+    assert legacy == indexed, "indexed lookup must return the same sentences"
+    print(f"   legacy re-split per term: {legacy_time * 1000:9.1f} ms for {len(CONTEXT_TERMS)} terms")
+    print(f"   index build (once):       {build_time * 1000:9.1f} ms")
+    print(f"   indexed lookups:          {lookup_time * 1000:9.1f} ms "
+          f"({lookup_time / len(CONTEXT_TERMS) * 1e6:.1f} µs/term)")
+
+
+def bench_context_lookup_spacy(gen: FlashcardGenerator, pages: int = 50):
+    """The production path: the index is built from spaCy's sentences in DocumentAnalysis"""
+    print(f"\n📚 Context lookup on a {pages}-page document (spaCy sentences)")
+    analysis = gen.analyze(make_document(pages))
+    sentences = analysis.index.sentences
+
+    start = time.perf_counter()
+    scanned = [scan_context(sentences, t) for t in CONTEXT_TERMS]
+    scan_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = SentenceIndex(sentences)
+    build_time = time.perf_counter() - start
+    start = time.perf_counter()
+    indexed = [index.context(t) for t in CONTEXT_TERMS]
+    lookup_time = time.perf_counter() - start
+
+    assert scanned == indexed, "indexed lookup must return the same spaCy sentences"
+    print(f"   linear scan per term:     {scan_time * 1000:9.1f} ms over {len(sentences)} sentences")
+    print(f"   index build (once):       {build_time * 1000:9.1f} ms")
+    print(f"   indexed lookups:          {lookup_time * 1000:9.1f} ms "
+          f"({lookup_time / len(CONTEXT_TERMS) * 1e6:.1f} µs/term)")
+
+
+def bench_analysis(gen: FlashcardGenerator, pages: int = 50):
+    print(f"\n🧠 spaCy analysis on a {pages}-page document")
+    text = make_document(pages)
+    full_nlp = spacy.load(SPACY_MODEL)
+    full_nlp.max_length = max(full_nlp.max_length, len(text) + 1)
+
+    start = time.perf_counter()
+    doc = full_nlp(text)
+    legacy_counts = (len(doc.ents), len(list(doc.noun_chunks)))
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    analysis = gen.analyze(text)
+    tuned_time = time.perf_counter() - start
+
+    print(f"   full pipeline, one call:  {legacy_time:7.2f} s "
+          f"({legacy_counts[0]} ents, {legacy_counts[1]} noun chunks)")
+    print(f"   tuned pipeline, pipe():   {tuned_time:7.2f} s "
+          f"({len(analysis.ents)} ents, {len(analysis.noun_chunks)} noun chunks)")
+
+
+LEGACY_DEFINITION_PATTERNS = [
+    r"(.+?)\s+is\s+(.+?)[\.\n]",
+    r"(.+?)\s+means\s+(.+?)[\.\n]",
+    r"(.+?)\s+refers to\s+(.+?)[\.\n]",
+    r"Define\s+(.+?)\s*:\s*(.+?)[\.\n]",
+]
+
+
+def legacy_find_definitions(text: str) -> int:
+    """The old whole-text finditer scan; returns the number of matches"""
+    return sum(1 for p in LEGACY_DEFINITION_PATTERNS for _ in re.finditer(p, text, re.IGNORECASE))
+
+
+def bench_definitions(sizes=(1_000, 2_000, 4_000, 64_000, 1_000_000), legacy_max_chars: int = 4_000):
+    print("\n🧨 Definition matching on adversarial input (no sentence terminators)")
+    print(f"   {'chars':>8} {'legacy':>10} {'sentence-scoped':>16}")
+    for size in sizes:
+        # Many " is " candidates and no '.' or newline for the definition to end on
+        text = ("this is what " * (size // 13 + 1))[:size]
+
+        legacy = "skipped"
+        if size <= legacy_max_chars:  # the old scan is roughly cubic here
+            start = time.perf_counter()
+            legacy_find_definitions(text)
+            legacy = f"{(time.perf_counter() - start) * 1000:8.1f}ms"
+
+        # Worst case for the new matcher: the whole text arrives as a single sentence
+        start = time.perf_counter()
+        list(find_definitions([text]))
+        scoped_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        list(find_definitions([text[i:i + 200] for i in range(0, len(text), 200)]))
+        segmented_time = time.perf_counter() - start
+
+        print(f"   {size:8d} {legacy:>10} {scoped_time * 1000:8.2f}ms "
+              f"(segmented: {segmented_time * 1000:.2f}ms)")
+
+
+def bench_generate(gen: FlashcardGenerator, pages_list=(1, 10, 50)):
+    print("\n🃏 End-to-end generate_flashcards")
+    for pages in pages_list:
+        text = make_document(pages)
+        start = time.perf_counter()
+        cards = gen.generate_flashcards(text, "Medium")
+        elapsed = time.perf_counter() - start
+        print(f"   {pages:3d} pages: {elapsed:7.2f} s, {len(cards)} cards")
+
+
+if __name__ == "__main__":
+    print("=== Flashcard Generator Benchmarks ===")
+    generator = FlashcardGenerator()
+    bench_context_lookup(generator)
+    bench_context_lookup_spacy(generator)
+    bench_analysis(generator)
+    bench_definitions()
+    bench_generate(generator)
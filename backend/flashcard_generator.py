@@ -3,15 +3,158 @@ from __future__ import annotations
 
 import re
 import os
-import json
 import random
-from datetime import datetime
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Iterator, Sequence
 
+import numpy as np
 import spacy
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
 
+from idf_model import get_idf_model
+from deck_cache import get_deck_cache
+from spaced_repetition import get_scheduler
+from achievements import get_achievements
+from answer_log import AnswerLog, get_answer_log
+from utils_fold.hash_utils import content_hash
+from config import SPACY_MODEL, SPACY_CHUNK_CHARS, SPACY_BATCH_SIZE, SPACY_N_PROCESS, FLASHCARD_BATCH_WORKERS
+
+
+# Bump whenever deck output changes; cached decks from other versions are dropped
+GENERATOR_VERSION = "3"
+DECK_SIZE = 10
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+PARAGRAPH_RE = re.compile(r"\n\s*\n")
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Concept extraction only reads entities, noun chunks and sentences; lemmas are never used
+SPACY_EXCLUDE = ["lemmatizer"]
+
+
+class SentenceIndex:
+    """
+    Inverted token index over the sentences of one document.
+
+    Built once per request. A term matches a sentence where it occurs as whole
+    words (no letter or digit directly before or after it), so every match
+    holds each of the term's tokens: find() only checks the sentences in the
+    shortest posting list and never scans the rest of the document.
+    """
+
+    def __init__(self, sentences: List[str]) -> None:
+        self.sentences = sentences
+        self._lowered = [s.lower() for s in sentences]
+        self._postings: Dict[str, List[int]] = {}
+        self._found: Dict[str, Optional[int]] = {}
+        for i, sent in enumerate(self._lowered):
+            for token in set(TOKEN_RE.findall(sent)):
+                self._postings.setdefault(token, []).append(i)
+
+    @classmethod
+    def from_docs(cls, docs) -> "SentenceIndex":
+        """Index the sentences spaCy already segmented, across one or more docs"""
+        return cls([s.text.strip() for doc in docs for s in doc.sents if s.text.strip()])
+
+    @staticmethod
+    def whole_word_pattern(needle: str) -> re.Pattern:
+        """needle (lowercased) not directly preceded or followed by a token character"""
+        before = r"(?<![a-z0-9])" if TOKEN_RE.match(needle[0]) else ""
+        after = r"(?![a-z0-9])" if TOKEN_RE.match(needle[-1]) else ""
+        return re.compile(before + re.escape(needle) + after)
+
+    def find(self, term: str) -> Optional[int]:
+        """Position of the first sentence containing term as whole words (case-insensitive), or None"""
+        needle = term.lower()
+        if needle in self._found:
+            return self._found[needle]
+
+        result = None
+        tokens = set(TOKEN_RE.findall(needle))
+        if tokens:
+            candidates = min((self._postings.get(t, []) for t in tokens), key=len)
+            pattern = self.whole_word_pattern(needle)
+            for i in candidates:
+                if pattern.search(self._lowered[i]):
+                    result = i
+                    break
+
+        self._found[needle] = result
+        return result
+
+    def context(self, term: str, max_len: int = 220) -> Optional[str]:
+        i = self.find(term)
+        return self.sentences[i][:max_len].strip() if i is not None else None
+
+
+class DocumentAnalysis:
+    """Entities, noun chunks and sentences of a text, merged across spaCy chunks"""
+
+    def __init__(self, docs) -> None:
+        docs = list(docs)
+        self.ents = [ent.text for doc in docs for ent in doc.ents]
+        self.noun_chunks = [chunk.text for doc in docs for chunk in doc.noun_chunks]
+        self.index = SentenceIndex.from_docs(docs)
+
+
+# Definition patterns run per sentence with bounded term/definition windows, so
+# the work per sentence is capped and long inputs without periods can't backtrack
+# quadratically. "X is Y" forms are anchored at the sentence start.
+TERM_WINDOW = r"(.{2,60}?)"
+DEFINITION_WINDOW = r"(.{10,300}?)(?:[.\n]|$)"
+DEFINITION_PATTERNS = [
+    (re.compile(rf"{TERM_WINDOW}\s+is\s+{DEFINITION_WINDOW}", re.IGNORECASE), True),
+    (re.compile(rf"{TERM_WINDOW}\s+means\s+{DEFINITION_WINDOW}", re.IGNORECASE), True),
+    (re.compile(rf"{TERM_WINDOW}\s+refers to\s+{DEFINITION_WINDOW}", re.IGNORECASE), True),
+    (re.compile(rf"Define\s+{TERM_WINDOW}\s*:\s*{DEFINITION_WINDOW}", re.IGNORECASE), False),
+]
+
+
+def find_definitions(sentences: Sequence[str]) -> Iterator[tuple]:
+    """Yield (term, definition) pairs, pattern by pattern, from already segmented sentences"""
+    for pattern, anchored in DEFINITION_PATTERNS:
+        matcher = pattern.match if anchored else pattern.search
+        for sentence in sentences:
+            m = matcher(sentence)
+            if not m:
+                continue
+            term = m.group(1).strip()
+            definition = m.group(2).strip()
+            if 2 <= len(term) <= 60 and 10 <= len(definition) <= 300:
+                yield term, definition
+
+
+def chunk_text(text: str, max_chars: int) -> List[str]:
+    """
+    Split text into pieces of at most max_chars, breaking at paragraph
+    boundaries where possible, then at sentence ends, then anywhere.
+    """
+    if len(text) <= max_chars:
+        return [text]
+
+    pieces: List[str] = []
+    for paragraph in PARAGRAPH_RE.split(text):
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        for sentence in SENTENCE_END_RE.split(paragraph):
+            pieces.extend(sentence[i:i + max_chars] for i in range(0, len(sentence), max_chars))
+
+    chunks: List[str] = []
+    current = ""
+    for piece in pieces:
+        if not piece.strip():
+            continue
+        if current and len(current) + len(piece) + 2 > max_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
 
 class FlashcardGenerator:
  
@@ -19,7 +162,7 @@ class FlashcardGenerator:
     def __init__(self) -> None:
         
         try:
-            self.nlp = spacy.load("en_core_web_sm")
+            self.nlp = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
         except OSError as e:
             raise RuntimeError(
                 "spaCy model 'en_core_web_sm' is not installed.\n"
@@ -27,6 +170,9 @@ class FlashcardGenerator:
                 "  pip install spacy\n"
                 "  python -m spacy download en_core_web_sm"
             ) from e
+        self.idf_model = get_idf_model()
+        self.deck_cache = get_deck_cache(GENERATOR_VERSION)
+        self.scheduler = get_scheduler()
 
     # -------------------------
     # Keyword extraction helpers
@@ -37,10 +183,14 @@ class FlashcardGenerator:
 
     def _get_top_keywords(self, text: str, top_n: int = 15) -> List[str]:
         """
-        Extract top keywords using TF-IDF. Works even for short texts by:
+        Extract top keywords using TF-IDF. Scores against the persisted corpus
+        IDF once it has seen enough content; otherwise fits on this text:
           - Falling back to word-level TF-IDF if only 1 sentence detected
           - Using 1-2 grams
         """
+        if self.idf_model.ready:
+            return self.idf_model.top_keywords(text, top_n)
+
         sentences = self._split_sentences(text)
         if not sentences:
             return []
@@ -60,23 +210,60 @@ class FlashcardGenerator:
             # Happens if text has no valid tokens after stopword filtering
             return []
 
-    def _get_context(self, text: str, term: str, max_len: int = 220) -> str:
+    def _corpus_keywords(self, documents: Sequence[str], top_n: int = 15) -> List[List[str]]:
+        """
+        Top keywords per document, weighted by IDF across the whole batch so
+        terms shared by every chapter rank below the ones specific to each.
+        """
+        vectorizer = TfidfVectorizer(stop_words="english", ngram_range=(1, 2), sublinear_tf=True)
+        try:
+            matrix = vectorizer.fit_transform(documents)
+        except ValueError:
+            return [[] for _ in documents]
+
+        vocabulary = vectorizer.get_feature_names_out()
+        keywords: List[List[str]] = []
+        for row in matrix:
+            top = row.indices[np.argsort(-row.data, kind="stable")[:top_n]]
+            keywords.append([vocabulary[i] for i in top])
+        return keywords
+
+    def _get_context(self, text: str, term: str, max_len: int = 220,
+                     index: Optional[SentenceIndex] = None) -> str:
         """
         Return a nearby sentence (simple heuristic) that contains the term.
+        Pass a SentenceIndex built once per document to avoid rescanning text.
         """
-        for sent in self._split_sentences(text):
-            if term.lower() in sent.lower():
-                return sent[:max_len].strip()
+        if index is None:
+            index = SentenceIndex(self._split_sentences(text))
+        ctx = index.context(term, max_len)
+        if ctx:
+            return ctx
         # fallback: return start of text
         return text[:max_len].strip() if text else ""
 
     # -------------------------
     # Concept extraction
     # -------------------------
-    def extract_key_concepts(self, text: str, limit: int = 20) -> List[Dict]:
+    def analyze(self, text: str) -> DocumentAnalysis:
+        """
+        Run spaCy over text in paragraph-aligned chunks via nlp.pipe, so long
+        documents stay under nlp.max_length and can use several processes.
+        """
+        chunks = chunk_text(text, self._max_chunk_chars())
+        n_process = SPACY_N_PROCESS if len(chunks) > SPACY_BATCH_SIZE else 1
+        return DocumentAnalysis(self.nlp.pipe(chunks, batch_size=SPACY_BATCH_SIZE, n_process=n_process))
+
+    def _max_chunk_chars(self) -> int:
+        return min(SPACY_CHUNK_CHARS, self.nlp.max_length)
+
+    def extract_key_concepts(self, text: str, limit: int = 20,
+                             analysis: Optional[DocumentAnalysis] = None,
+                             top_keywords: Optional[List[str]] = None) -> List[Dict]:
         """
         Returns a list of concept dicts:
           - {"term", "type": "entity"/"concept"/"definition", "context"?, "definition"?}
+        analysis and top_keywords can be passed in when they were computed for a batch.
         """
         concepts: List[Dict] = []
         seen: set[str] = set()
@@ -84,24 +271,28 @@ class FlashcardGenerator:
         if not text or not text.strip():
             return concepts
 
-        doc = self.nlp(text)
-        top_keywords = set(self._get_top_keywords(text))
+        if analysis is None:
+            analysis = self.analyze(text)
+        index = analysis.index
+        if top_keywords is None:
+            top_keywords = self._get_top_keywords(text)
+        top_keywords = set(top_keywords)
 
         # Entities (keep it broad; entity type filtering can miss useful items in academic text)
-        for ent in doc.ents:
-            term = ent.text.strip()
+        for ent in analysis.ents:
+            term = ent.strip()
             key = term.lower()
             if term and key not in seen:
                 concepts.append({
                     "term": term,
                     "type": "entity",
-                    "context": self._get_context(text, term)
+                    "context": self._get_context(text, term, index=index)
                 })
                 seen.add(key)
 
         # Noun chunks (relaxed + overlap with TF-IDF OR 2+ content words)
-        for chunk in doc.noun_chunks:
-            term = chunk.text.strip()
+        for chunk in analysis.noun_chunks:
+            term = chunk.strip()
             key = term.lower()
             if key in seen or len(key) < 3:
                 continue
@@ -120,34 +311,20 @@ class FlashcardGenerator:
                 concepts.append({
                     "term": term,
                     "type": "concept",
-                    "context": self._get_context(text, term)
+                    "context": self._get_context(text, term, index=index)
                 })
                 seen.add(key)
 
-        # Definitions (regex patterns)
-        definition_patterns = [
-            r"(.+?)\s+is\s+(.+?)[\.\n]",
-            r"(.+?)\s+means\s+(.+?)[\.\n]",
-            r"(.+?)\s+refers to\s+(.+?)[\.\n]",
-            r"Define\s+(.+?)\s*:\s*(.+?)[\.\n]",
-        ]
-        for pattern in definition_patterns:
-            for m in re.finditer(pattern, text, re.IGNORECASE):
-                term = m.group(1).strip()
-                definition = m.group(2).strip()
-                key = term.lower()
-
-                if (
-                    2 <= len(term) <= 60
-                    and 10 <= len(definition) <= 300
-                    and key not in seen
-                ):
-                    concepts.append({
-                        "term": term,
-                        "definition": definition,
-                        "type": "definition"
-                    })
-                    seen.add(key)
+        # Definitions (sentence-scoped patterns)
+        for term, definition in find_definitions(index.sentences):
+            key = term.lower()
+            if key not in seen:
+                concepts.append({
+                    "term": term,
+                    "definition": definition,
+                    "type": "definition"
+                })
+                seen.add(key)
 
         # Deduplicate while preserving order (already handled via 'seen', but limit anyway)
         return concepts[:limit]
@@ -171,14 +348,34 @@ class FlashcardGenerator:
             },
         ]
 
-    def generate_flashcards(self, text: str, difficulty: str = "Medium") -> List[Dict]:
+    @staticmethod
+    def _select_cards(flashcards: List[Dict], k: int) -> List[Dict]:
+        """Deterministically pick k cards, taking card types in turn so the deck stays mixed"""
+        by_type: Dict[str, List[Dict]] = {}
+        for card in flashcards:
+            by_type.setdefault(card["type"], []).append(card)
+        queues = list(by_type.values())
+        selected: List[Dict] = []
+        depth = 0
+        while len(selected) < k:
+            for queue in queues:
+                if depth < len(queue) and len(selected) < k:
+                    selected.append(queue[depth])
+            depth += 1
+        return selected
+
+    def generate_flashcards(self, text: str, difficulty: str = "Medium",
+                            analysis: Optional[DocumentAnalysis] = None,
+                            top_keywords: Optional[List[str]] = None,
+                            seed: Optional[int] = None) -> List[Dict]:
         """
         Return up to 10 flashcards. If nothing is extracted, fall back to keyword cards.
+        The same input always yields the same deck; pass seed to shuffle it reproducibly.
         """
         if not text or not text.strip():
             return []
 
-        concepts = self.extract_key_concepts(text)
+        concepts = self.extract_key_concepts(text, analysis=analysis, top_keywords=top_keywords)
         flashcards: List[Dict] = []
 
         for concept in concepts:
@@ -217,10 +414,11 @@ class FlashcardGenerator:
         # Fallback so the API never returns [] when text exists
         if not flashcards:
             kws = self._get_top_keywords(text, top_n=6)
+            index = SentenceIndex(self._split_sentences(text))
             for kw in kws:
                 if not kw.strip():
                     continue
-                ctx = self._get_context(text, kw) or text[:220]
+                ctx = self._get_context(text, kw, index=index) or text[:220]
                 flashcards.append({
                     "question": f"Define: {kw}",
                     "answer": ctx,
@@ -228,15 +426,100 @@ class FlashcardGenerator:
                     "difficulty": difficulty,
                 })
 
-        # Sample at most 10 (but keep deterministic size if fewer)
-        k = min(10, len(flashcards))
-        if k <= 0:
+        deck = self._select_cards(flashcards, min(DECK_SIZE, len(flashcards)))
+        return self._shuffled(deck, seed)
+
+    @staticmethod
+    def _shuffled(deck: List[Dict], seed: Optional[int]) -> List[Dict]:
+        if seed is None:
+            return deck
+        deck = list(deck)
+        random.Random(seed).shuffle(deck)
+        return deck
+
+    def _deck_key(self, text: str, corpus_keywords: Optional[List[str]] = None) -> str:
+        """
+        Deck cache key: the text plus every keyword source that shapes its deck,
+        i.e. the IDF model's version (which only moves when its statistics are
+        rebuilt, not on every save) and, for batch decks, the batch's keywords.
+        """
+        return content_hash(text, self.idf_model.version, "\n".join(corpus_keywords or []))
+
+    def generate_deck(self, text: str, difficulty: str = "Medium", seed: Optional[int] = None) -> List[Dict]:
+        """generate_flashcards() backed by the persistent deck cache"""
+        if not text or not text.strip():
             return []
-        return random.sample(flashcards, k)
+        key = self._deck_key(text)
+        deck = self.deck_cache.get(key, difficulty)
+        if deck is None:
+            deck = self.generate_flashcards(text, difficulty)
+            self.deck_cache.put(key, difficulty, deck)
+        return self._shuffled(deck, seed)
+
+    def generate_flashcard_batch(self, documents: Sequence[str], difficulty: str = "Medium",
+                                 seed: Optional[int] = None,
+                                 max_workers: int = FLASHCARD_BATCH_WORKERS) -> Iterator[Dict]:
+        """
+        Generate one deck per document, yielding {"index", "flashcards"} (or
+        {"index", "error"}) as soon as each deck is ready, in completion order.
+
+        Cached decks are yielded first. The remaining documents go through a
+        single nlp.pipe run; finished analyses are turned into decks on a
+        thread pool while spaCy keeps parsing the rest.
+        """
+        max_chars = self._max_chunk_chars()
+        # Keyword statistics span the whole batch, so they are part of each deck's cache key
+        keywords = self._corpus_keywords(documents) if len(documents) > 1 else [None] * len(documents)
+        keys = [self._deck_key(text, keywords[i]) if text and text.strip() else None
+                for i, text in enumerate(documents)]
+
+        chunk_counts: Dict[int, int] = {}
+        pieces: List[tuple] = []
+        for i, text in enumerate(documents):
+            if keys[i] is None:
+                yield {"index": i, "flashcards": []}
+                continue
+            cached = self.deck_cache.get(keys[i], difficulty)
+            if cached is not None:
+                yield {"index": i, "flashcards": self._shuffled(cached, seed)}
+                continue
+            chunks = chunk_text(text, max_chars)
+            chunk_counts[i] = len(chunks)
+            pieces.extend((chunk, i) for chunk in chunks)
+
+        if not chunk_counts:
+            return
+
+        def _build(i: int, docs: list) -> Dict:
+            try:
+                cards = self.generate_flashcards(documents[i], difficulty,
+                                                 analysis=DocumentAnalysis(docs), top_keywords=keywords[i])
+                self.deck_cache.put(keys[i], difficulty, cards)
+                return {"index": i, "flashcards": self._shuffled(cards, seed)}
+            except Exception as e:
+                return {"index": i, "error": str(e)}
+
+        parsed: Dict[int, list] = {i: [] for i in chunk_counts}
+        n_process = SPACY_N_PROCESS if len(pieces) > SPACY_BATCH_SIZE else 1
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="flashcards") as pool:
+            futures = set()
+            for doc, i in self.nlp.pipe(pieces, as_tuples=True, batch_size=SPACY_BATCH_SIZE, n_process=n_process):
+                parsed[i].append(doc)
+                if len(parsed[i]) == chunk_counts[i]:
+                    futures.add(pool.submit(_build, i, parsed.pop(i)))
+                for future in [f for f in futures if f.done()]:
+                    futures.discard(future)
+                    yield future.result()
+            for future in as_completed(futures):
+                yield future.result()
 
     # -------------------------
     # Performance tracking (optional)
     # -------------------------
+    def _answer_log(self, user_id: str) -> AnswerLog:
+        legacy = os.path.join("user_data", f"{user_id}_flashcard_performance.json")
+        return get_answer_log(os.path.join("user_data", f"{user_id}_flashcard_answers.log"), legacy)
+
     def save_flashcard_performance(
         self,
         user_id: str,
@@ -247,51 +530,29 @@ class FlashcardGenerator:
     
         if not user_id:
             return
-        os.makedirs("user_data", exist_ok=True)
-        path = os.path.join("user_data", f"{user_id}_flashcard_performance.json")
+        self._answer_log(user_id).append(
+            flashcard.get("question", ""),
+            bool(correct),
+            float(response_time),
+            difficulty=flashcard.get("difficulty", ""),
+        )
 
-        data: List[Dict] = []
-        if os.path.exists(path):
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-            except Exception:
-                data = []
-
-        data.append({
-            "timestamp": datetime.now().isoformat(),
-            "question": flashcard.get("question", ""),
-            "type": flashcard.get("type", ""),
-            "difficulty": flashcard.get("difficulty", ""),
-            "correct": bool(correct),
-            "response_time": float(response_time),
-        })
-
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        # Reschedule the card's next review
+        self.scheduler.record_answer(user_id, flashcard, correct, response_time)
+        get_achievements().record(user_id, "flashcard_answer", {"correct": bool(correct)})
 
     def get_adaptive_difficulty(self, user_id: str) -> str:
 
         if not user_id:
             return "Medium"
 
-        path = os.path.join("user_data", f"{user_id}_flashcard_performance.json")
-        if not os.path.exists(path):
+        # Only the log header is read: it keeps accuracy and latency of the last 10 answers
+        stats = self._answer_log(user_id).recent_stats()
+        if stats["total"] < 5:
             return "Medium"
 
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception:
-            return "Medium"
-
-        if len(data) < 5:
-            return "Medium"
-
-        recent = data[-10:]
-        acc = sum(1 for p in recent if p.get("correct")) / len(recent)
-        times = [float(p.get("response_time", 0.0)) for p in recent]
-        avg_time = sum(times) / len(times) if times else 0.0
+        acc = stats["accuracy"]
+        avg_time = stats["avg_response_time"]
 
         if acc > 0.8 and avg_time < 5:
             return "Hard"
@@ -299,7 +560,6 @@ class FlashcardGenerator:
             return "Easy"
         return "Medium"
 
-
 if __name__ == "__main__":
     sample_text = (
         "Photosynthesis is the process by which plants convert light energy into chemical energy. "
@@ -0,0 +1,74 @@
+"""
+Vectorized focus analytics.
+
+FocusStore.session_arrays hands over the analytics window as typed NumPy
+columns (one array per field, no per-session dicts), and
+compute_focus_analytics derives every metric from them with reductions and
+bincount. Results match the original per-session Python loops exactly:
+sums are accumulated in the same order (cumsum/bincount add sequentially),
+and ties in hour and break-type rankings are broken by first appearance.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+
+HOURS = 24
+
+
+def _sequential_sum(values: np.ndarray) -> float:
+    """Left-to-right float sum, as Python's sum() does (np.sum is pairwise)"""
+    return float(np.cumsum(values)[-1]) if len(values) else 0.0
+
+
+def _focus_patterns(hours: np.ndarray, focus_time: np.ndarray) -> List[Dict]:
+    """Average focus time per start hour, best first; equal averages keep first-seen hour order"""
+    counts = np.bincount(hours, minlength=HOURS)
+    totals = np.bincount(hours, weights=focus_time, minlength=HOURS)
+    present = np.flatnonzero(counts)
+    first_seen = np.full(HOURS, len(hours))
+    seen_hours, first_index = np.unique(hours, return_index=True)
+    first_seen[seen_hours] = first_index
+
+    averages = totals[present] / counts[present]
+    order = np.lexsort((first_seen[present], -averages))
+    return [
+        {"hour": int(present[i]), "avg_focus_time": float(averages[i]), "session_count": int(counts[present[i]])}
+        for i in order
+    ]
+
+
+def _break_frequency(break_types: np.ndarray, session_count: int) -> Dict:
+    if not len(break_types):
+        return {"avg_breaks_per_session": 0, "most_common_break_type": "none"}
+
+    names, first_index, inverse = np.unique(break_types, return_index=True, return_inverse=True)
+    counts = np.bincount(inverse.ravel(), minlength=len(names))
+    order = np.argsort(first_index, kind="stable")  # first-seen order, like the dict it replaces
+    ranked_counts = counts[order]
+    return {
+        "avg_breaks_per_session": len(break_types) / session_count,
+        "most_common_break_type": str(names[order[int(np.argmax(ranked_counts))]]),
+        "break_types": {str(names[i]): int(counts[i]) for i in order},
+    }
+
+
+def compute_focus_analytics(arrays: Dict[str, np.ndarray]) -> Dict:
+    """Focus analytics from FocusStore.session_arrays columns (at least one session)"""
+    focus_time = arrays["focus_time"]
+    total_sessions = len(focus_time)
+
+    response_times = arrays["response_time"]
+    response_times = response_times[~np.isnan(response_times) & (response_times != 0)]
+    correct = arrays["correct"]
+    correct = correct[~np.isnan(correct)]
+
+    return {
+        "total_sessions": total_sessions,
+        "avg_focus_time": _sequential_sum(focus_time) / total_sessions,
+        "completion_rate": int(np.count_nonzero(arrays["completed"])) / total_sessions,
+        "avg_response_time": _sequential_sum(response_times) / len(response_times) if len(response_times) else 0,
+        "accuracy": int(np.count_nonzero(correct)) / len(correct) if len(correct) else 0,
+        "focus_patterns": _focus_patterns(arrays["start_hour"], focus_time),
+        "break_frequency": _break_frequency(arrays["break_type"], total_sessions),
+    }
@@ -0,0 +1,140 @@
+"""
+Focus Analytics Benchmarks
+Run with: python focus_benchmark.py
+"""
+
+import os
+import time
+import random
+import tempfile
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from focus_analytics import compute_focus_analytics
+from focus_store import FocusStore
+
+BREAK_TYPES = ["slow_response", "tab_switch", "idle", "manual"]
+INTERACTION_TYPES = ["quiz_answer", "flashcard", "reading"]
+
+
+def make_sessions(count: int, days: int = 7, seed: int = 7) -> List[Dict]:
+    """Synthetic sessions spread over the last `days` days"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    sessions = []
+    for k in range(count):
+        start = now - timedelta(seconds=rng.uniform(60, days * 86400 - 60))
+        stamp = start.isoformat()
+        sessions.append({
+            "session_id": f"bench_{k}",
+            "start_time": stamp,
+            "end_time": stamp,
+            "content_type": "text",
+            "content_title": "Benchmark",
+            "interactions": [
+                {"timestamp": stamp, "type": rng.choice(INTERACTION_TYPES),
+                 "response_time": rng.choice([None, 0.0, round(rng.uniform(0.5, 30), 3)]),
+                 "correct": rng.choice([None, True, False]), "focus_duration_before": rng.uniform(0, 600)}
+                for _ in range(rng.randint(0, 6))
+            ],
+            "focus_breaks": [
+                {"timestamp": stamp, "type": rng.choice(BREAK_TYPES), "duration": round(rng.uniform(1, 120), 3)}
+                for _ in range(rng.randint(0, 3))
+            ],
+            "total_focus_time": rng.uniform(0, 3600),
+            "completed": rng.random() < 0.7,
+        })
+    return sessions
+
+
+# The per-session loops FocusTracker used before focus_analytics
+def legacy_focus_analytics(recent_sessions: List[Dict]) -> Dict:
+    total_sessions = len(recent_sessions)
+    avg_focus_time = sum(s["total_focus_time"] for s in recent_sessions) / total_sessions
+    completion_rate = sum(1 for s in recent_sessions if s["completed"]) / total_sessions
+
+    hourly_focus = {}
+    for session in recent_sessions:
+        hour = datetime.fromisoformat(session["start_time"]).hour
+        if hour not in hourly_focus:
+            hourly_focus[hour] = []
+        hourly_focus[hour].append(session["total_focus_time"])
+    focus_patterns = sorted(
+        [{"hour": hour, "avg_focus_time": sum(times) / len(times), "session_count": len(times)}
+         for hour, times in hourly_focus.items()],
+        key=lambda x: x["avg_focus_time"], reverse=True
+    )
+
+    all_interactions = []
+    for session in recent_sessions:
+        all_interactions.extend(session["interactions"])
+    avg_response_time = 0
+    accuracy = 0
+    if all_interactions:
+        response_times = [i["response_time"] for i in all_interactions if i["response_time"]]
+        if response_times:
+            avg_response_time = sum(response_times) / len(response_times)
+        correct_responses = [i for i in all_interactions if i["correct"] is not None]
+        if correct_responses:
+            accuracy = sum(1 for i in correct_responses if i["correct"]) / len(correct_responses)
+
+    all_breaks = []
+    for session in recent_sessions:
+        all_breaks.extend(session["focus_breaks"])
+    if not all_breaks:
+        break_frequency = {"avg_breaks_per_session": 0, "most_common_break_type": "none"}
+    else:
+        break_types = {}
+        for break_event in all_breaks:
+            break_types[break_event["type"]] = break_types.get(break_event["type"], 0) + 1
+        break_frequency = {
+            "avg_breaks_per_session": len(all_breaks) / len(recent_sessions),
+            "most_common_break_type": max(break_types.items(), key=lambda x: x[1])[0],
+            "break_types": break_types,
+        }
+
+    return {
+        "total_sessions": total_sessions,
+        "avg_focus_time": avg_focus_time,
+        "completion_rate": completion_rate,
+        "avg_response_time": avg_response_time,
+        "accuracy": accuracy,
+        "focus_patterns": focus_patterns,
+        "break_frequency": break_frequency,
+    }
+
+
+def bench_analytics(counts=(1_000, 10_000, 100_000)):
+    print("\n🎯 Focus analytics over the last 7 days")
+    with tempfile.TemporaryDirectory() as data_dir:
+        for count in counts:
+            store = FocusStore(os.path.join(data_dir, f"focus_{count}.db"))
+            with store._lock:
+                store._conn.execute("BEGIN")
+                for session in make_sessions(count):
+                    store._insert_session("bench", session)
+                store._conn.execute("COMMIT")
+            since = datetime.now() - timedelta(days=7)
+
+            start = time.perf_counter()
+            sessions = store.sessions_since("bench", since)
+            load_dicts = time.perf_counter() - start
+            start = time.perf_counter()
+            legacy = legacy_focus_analytics(sessions)
+            legacy_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            arrays = store.session_arrays("bench", since)
+            load_arrays = time.perf_counter() - start
+            start = time.perf_counter()
+            vectorized = compute_focus_analytics(arrays)
+            vectorized_time = time.perf_counter() - start
+
+            assert vectorized == legacy, f"results differ for {count} sessions"
+            print(f"   {count:7d} sessions: loops {legacy_time * 1000:8.1f}ms (+{load_dicts * 1000:.0f}ms load) | "
+                  f"numpy {vectorized_time * 1000:6.1f}ms (+{load_arrays * 1000:.0f}ms load) | identical")
+
+
+if __name__ == "__main__":
+    print("=== Focus Analytics Benchmarks ===")
+    bench_analytics()
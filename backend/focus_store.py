@@ -0,0 +1,412 @@
+"""
+SQLite storage for focus sessions.
+
+Sessions, their interactions and their breaks live in three tables instead of
+one ever-growing {user}_focus_sessions.json. Sessions carry a numeric start
+timestamp with a (user_id, start_ts) index, so "the last N days" is an index
+range scan and older history is never read. Saving a session is one
+transaction of inserts rather than a rewrite of the user's whole history.
+
+Clients can also stream events into a session in batches (append_events):
+each batch is one transaction of bulk inserts, and per-session running
+totals in focus_session_stats are bumped in place, so a batch costs the same
+however long the session has been running. A batch sent with close=True
+finishes its sessions; events that arrive for a finished session id start
+a new session rather than reopening the old one.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from config import FOCUS_DB, FOCUS_TIME_THRESHOLD
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS focus_sessions (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    start_ts REAL NOT NULL,
+    start_hour INTEGER NOT NULL,
+    start_time TEXT NOT NULL,
+    end_time TEXT,
+    content_type TEXT,
+    content_title TEXT,
+    total_focus_time REAL NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_focus_sessions_start ON focus_sessions(user_id, start_ts);
+CREATE INDEX IF NOT EXISTS idx_focus_sessions_sid ON focus_sessions(user_id, session_id);
+CREATE TABLE IF NOT EXISTS focus_interactions (
+    session_ref INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    type TEXT NOT NULL,
+    response_time REAL,
+    correct INTEGER,
+    focus_duration_before REAL
+);
+CREATE INDEX IF NOT EXISTS idx_focus_interactions_session ON focus_interactions(session_ref);
+CREATE TABLE IF NOT EXISTS focus_breaks (
+    session_ref INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    type TEXT NOT NULL,
+    duration REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_focus_breaks_session ON focus_breaks(session_ref);
+CREATE TABLE IF NOT EXISTS focus_session_stats (
+    session_ref INTEGER PRIMARY KEY,
+    interactions INTEGER NOT NULL DEFAULT 0,
+    responses INTEGER NOT NULL DEFAULT 0,
+    response_time_total REAL NOT NULL DEFAULT 0,
+    answered INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    breaks INTEGER NOT NULL DEFAULT 0,
+    break_time REAL NOT NULL DEFAULT 0,
+    last_event_ts REAL NOT NULL
+);
+"""
+
+STATS_COLUMNS = ("interactions", "responses", "response_time_total", "answered", "correct", "breaks",
+                 "break_time", "last_event_ts")
+
+# Running totals are added to; last_event_ts only moves forward
+UPSERT_STATS = f"""
+INSERT INTO focus_session_stats(session_ref, {", ".join(STATS_COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(session_ref) DO UPDATE SET
+    {", ".join(f"{c} = {c} + excluded.{c}" for c in STATS_COLUMNS[:-1])},
+    last_event_ts = MAX(last_event_ts, excluded.last_event_ts)
+"""
+
+SESSION_COLUMNS = ("id, session_id, start_time, end_time, content_type, content_title, "
+                   "total_focus_time, completed")
+
+
+def _optional_bool(value) -> Optional[int]:
+    return None if value is None else int(bool(value))
+
+
+def _local_time(value) -> datetime:
+    """Event timestamps as naive local time, like the ones FocusTracker writes"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def _stats_row(ref: int, interactions: List[Dict], breaks: List[Dict], last_event_ts: float) -> Tuple:
+    """focus_session_stats increments for a set of events, in STATS_COLUMNS order"""
+    response_times = [i.get("response_time") for i in interactions if i.get("response_time")]
+    answers = [i.get("correct") for i in interactions if i.get("correct") is not None]
+    return (ref, len(interactions), len(response_times), float(sum(response_times)), len(answers),
+            sum(1 for answer in answers if answer), len(breaks), float(sum(b["duration"] for b in breaks)),
+            last_event_ts)
+
+
+def _slow_response_breaks(interactions: Iterable[Dict]) -> List[Dict]:
+    """The breaks FocusTracker.log_interaction infers from answers slower than FOCUS_TIME_THRESHOLD"""
+    return [
+        {"session_id": i.get("session_id"), "timestamp": i["timestamp"], "type": "slow_response",
+         "duration": float(i["response_time"])}
+        for i in interactions
+        if i.get("response_time") and i["response_time"] > FOCUS_TIME_THRESHOLD
+    ]
+
+
+class FocusStore:
+    """Focus sessions per user, indexed by start time"""
+
+    def __init__(self, db_path: str):
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._checked_legacy: Set[str] = set()
+        self._legacy_lock = threading.Lock()
+
+    def _insert_session(self, user_id: str, session: Dict) -> int:
+        start = datetime.fromisoformat(session["start_time"])
+        cursor = self._conn.execute(
+            """INSERT INTO focus_sessions(user_id, session_id, start_ts, start_hour, start_time, end_time,
+                                          content_type, content_title, total_focus_time, completed)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (user_id, session.get("session_id", ""), start.timestamp(), start.hour, session["start_time"],
+             session.get("end_time"), session.get("content_type"), session.get("content_title"),
+             float(session.get("total_focus_time", 0)), int(bool(session.get("completed")))),
+        )
+        ref = cursor.lastrowid
+        self._conn.executemany(
+            """INSERT INTO focus_interactions(session_ref, timestamp, type, response_time, correct,
+                                              focus_duration_before) VALUES (?, ?, ?, ?, ?, ?)""",
+            [(ref, i["timestamp"], i["type"], i.get("response_time"), _optional_bool(i.get("correct")),
+              i.get("focus_duration_before")) for i in session.get("interactions", [])],
+        )
+        self._conn.executemany(
+            "INSERT INTO focus_breaks(session_ref, timestamp, type, duration) VALUES (?, ?, ?, ?)",
+            [(ref, b["timestamp"], b["type"], float(b["duration"])) for b in session.get("focus_breaks", [])],
+        )
+        last_event = datetime.fromisoformat(session["end_time"]) if session.get("end_time") else start
+        self._conn.execute(UPSERT_STATS, _stats_row(ref, session.get("interactions", []),
+                                                    session.get("focus_breaks", []), last_event.timestamp()))
+        return ref
+
+    def add_session(self, user_id: str, session: Dict) -> int:
+        """Store a finished session with its interactions and breaks; returns its row id"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                ref = self._insert_session(user_id, session)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return ref
+
+    def _open_session(self, user_id: str, session_id: str, first_event: datetime,
+                      content_type: Optional[str], content_title: Optional[str]) -> int:
+        """Row id of the user's open session with this id, created if there is none or the last one is closed"""
+        row = self._conn.execute(
+            "SELECT id, start_ts, end_time FROM focus_sessions WHERE user_id = ? AND session_id = ? "
+            "ORDER BY id DESC LIMIT 1",
+            (user_id, session_id),
+        ).fetchone()
+        if row is None or row[2] is not None:
+            cursor = self._conn.execute(
+                """INSERT INTO focus_sessions(user_id, session_id, start_ts, start_hour, start_time,
+                                              content_type, content_title) VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (user_id, session_id, first_event.timestamp(), first_event.hour, first_event.isoformat(),
+                 content_type, content_title),
+            )
+            return cursor.lastrowid
+        ref, start_ts, _ = row
+        if first_event.timestamp() < start_ts:
+            # A late batch carried events from before the session's first one
+            self._conn.execute(
+                "UPDATE focus_sessions SET start_ts = ?, start_hour = ?, start_time = ? WHERE id = ?",
+                (first_event.timestamp(), first_event.hour, first_event.isoformat(), ref),
+            )
+        return ref
+
+    def append_events(self, user_id: str, interactions: List[Dict], breaks: List[Dict],
+                      content_type: Optional[str] = None, content_title: Optional[str] = None,
+                      close: bool = False) -> Dict[str, Dict]:
+        """Append a batch of streamed events (each carrying its session_id) in one transaction.
+
+        Answers slower than FOCUS_TIME_THRESHOLD also log a slow_response break,
+        as FocusTracker.log_interaction does. Unknown or already closed session
+        ids start a new open session at their first event. Open sessions get
+        total_focus_time from their running totals (first to last event, minus
+        breaks), so they show up in analytics while in progress. close=True
+        then ends the batch's sessions at their last event and marks them
+        completed. Returns the updated running totals per session id.
+        """
+        events: Dict[str, Tuple[List[Dict], List[Dict]]] = {}
+        breaks = list(breaks) + _slow_response_breaks(interactions)
+        for index, batch in ((0, interactions), (1, breaks)):
+            for event in batch:
+                event = dict(event, timestamp=_local_time(event["timestamp"]))
+                events.setdefault(event["session_id"], ([], []))[index].append(event)
+        if not events:
+            return {}
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                refs = {}
+                for session_id, (session_interactions, session_breaks) in events.items():
+                    stamps = [e["timestamp"] for e in session_interactions + session_breaks]
+                    refs[session_id] = self._open_session(user_id, session_id, min(stamps),
+                                                          content_type, content_title)
+                self._conn.executemany(
+                    """INSERT INTO focus_interactions(session_ref, timestamp, type, response_time, correct,
+                                                      focus_duration_before) VALUES (?, ?, ?, ?, ?, ?)""",
+                    [(refs[sid], i["timestamp"].isoformat(), i["type"], i.get("response_time"),
+                      _optional_bool(i.get("correct")), i.get("focus_duration_before"))
+                     for sid, (session_interactions, _) in events.items() for i in session_interactions],
+                )
+                self._conn.executemany(
+                    "INSERT INTO focus_breaks(session_ref, timestamp, type, duration) VALUES (?, ?, ?, ?)",
+                    [(refs[sid], b["timestamp"].isoformat(), b["type"], float(b["duration"]))
+                     for sid, (_, session_breaks) in events.items() for b in session_breaks],
+                )
+                self._conn.executemany(UPSERT_STATS, [
+                    _stats_row(refs[sid], session_interactions, session_breaks,
+                               max(e["timestamp"] for e in session_interactions + session_breaks).timestamp())
+                    for sid, (session_interactions, session_breaks) in events.items()
+                ])
+                self._conn.executemany(
+                    """UPDATE focus_sessions SET total_focus_time = (
+                           SELECT MAX(0, st.last_event_ts - focus_sessions.start_ts - st.break_time)
+                           FROM focus_session_stats st WHERE st.session_ref = focus_sessions.id)
+                       WHERE id = ? AND end_time IS NULL""",
+                    [(ref,) for ref in refs.values()],
+                )
+                if close:
+                    self._close_sessions(list(refs.values()))
+                totals = self._session_stats(refs)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return totals
+
+    def _close_sessions(self, refs: List[int]):
+        """End open sessions at their last event, keeping the focus time they have accumulated"""
+        last_events = self._conn.execute(
+            f"SELECT session_ref, last_event_ts FROM focus_session_stats "
+            f"WHERE session_ref IN ({', '.join('?' * len(refs))})",
+            refs,
+        ).fetchall()
+        self._conn.executemany(
+            "UPDATE focus_sessions SET end_time = ?, completed = 1 WHERE id = ? AND end_time IS NULL",
+            [(datetime.fromtimestamp(last_event_ts).isoformat(), ref) for ref, last_event_ts in last_events],
+        )
+
+    def _session_stats(self, refs: Dict[str, int]) -> Dict[str, Dict]:
+        by_ref = {ref: session_id for session_id, ref in refs.items()}
+        placeholders = ", ".join("?" * len(by_ref))
+        rows = self._conn.execute(
+            f"""SELECT st.session_ref, st.interactions, st.responses, st.response_time_total, st.answered,
+                       st.correct, st.breaks, st.break_time, s.total_focus_time, s.end_time IS NULL
+                FROM focus_session_stats st JOIN focus_sessions s ON s.id = st.session_ref
+                WHERE st.session_ref IN ({placeholders})""",
+            list(by_ref),
+        ).fetchall()
+        totals = {}
+        for ref, count, responses, response_total, answered, correct, breaks, break_time, focus_time, is_open in rows:
+            totals[by_ref[ref]] = {
+                "interactions": count,
+                "avg_response_time": response_total / responses if responses else 0,
+                "accuracy": correct / answered if answered else 0,
+                "breaks": breaks,
+                "break_time": break_time,
+                "total_focus_time": focus_time,
+                "open": bool(is_open),
+            }
+        return totals
+
+    def has_sessions(self, user_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM focus_sessions WHERE user_id = ? LIMIT 1", (user_id,)
+            ).fetchone() is not None
+
+    def sessions_since(self, user_id: str, since: datetime) -> List[Dict]:
+        """Sessions that started after since, in the order they were saved, shaped like the old JSON"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {SESSION_COLUMNS} FROM focus_sessions WHERE user_id = ? AND start_ts > ? ORDER BY id",
+                (user_id, since.timestamp()),
+            ).fetchall()
+            if not rows:
+                return []
+            interactions = self._conn.execute(
+                """SELECT i.session_ref, i.timestamp, i.type, i.response_time, i.correct, i.focus_duration_before
+                   FROM focus_interactions i JOIN focus_sessions s ON s.id = i.session_ref
+                   WHERE s.user_id = ? AND s.start_ts > ? ORDER BY i.session_ref, i.rowid""",
+                (user_id, since.timestamp()),
+            ).fetchall()
+            breaks = self._conn.execute(
+                """SELECT b.session_ref, b.timestamp, b.type, b.duration
+                   FROM focus_breaks b JOIN focus_sessions s ON s.id = b.session_ref
+                   WHERE s.user_id = ? AND s.start_ts > ? ORDER BY b.session_ref, b.rowid""",
+                (user_id, since.timestamp()),
+            ).fetchall()
+
+        sessions: Dict[int, Dict] = {}
+        for ref, session_id, start_time, end_time, content_type, content_title, focus_time, completed in rows:
+            sessions[ref] = {
+                "session_id": session_id, "start_time": start_time, "content_type": content_type,
+                "content_title": content_title, "interactions": [], "focus_breaks": [],
+                "total_focus_time": focus_time, "completed": bool(completed), "end_time": end_time,
+            }
+        for ref, timestamp, kind, response_time, correct, focus_before in interactions:
+            sessions[ref]["interactions"].append({
+                "timestamp": timestamp, "type": kind, "response_time": response_time,
+                "correct": None if correct is None else bool(correct), "focus_duration_before": focus_before,
+            })
+        for ref, timestamp, kind, duration in breaks:
+            sessions[ref]["focus_breaks"].append({"timestamp": timestamp, "type": kind, "duration": duration})
+        return list(sessions.values())
+
+    def session_arrays(self, user_id: str, since: datetime) -> Dict[str, np.ndarray]:
+        """The same window as sessions_since, as typed columns for focus_analytics"""
+        cutoff = since.timestamp()
+        with self._lock:
+            sessions = self._conn.execute(
+                "SELECT start_hour, total_focus_time, completed FROM focus_sessions "
+                "WHERE user_id = ? AND start_ts > ? ORDER BY id",
+                (user_id, cutoff),
+            ).fetchall()
+            interactions = self._conn.execute(
+                """SELECT i.response_time, i.correct
+                   FROM focus_interactions i JOIN focus_sessions s ON s.id = i.session_ref
+                   WHERE s.user_id = ? AND s.start_ts > ? ORDER BY i.session_ref, i.rowid""",
+                (user_id, cutoff),
+            ).fetchall()
+            break_types = self._conn.execute(
+                """SELECT b.type FROM focus_breaks b JOIN focus_sessions s ON s.id = b.session_ref
+                   WHERE s.user_id = ? AND s.start_ts > ? ORDER BY b.session_ref, b.rowid""",
+                (user_id, cutoff),
+            ).fetchall()
+
+        session_columns = np.array(sessions, dtype=np.float64).reshape(-1, 3)
+        # NULL response times / correctness become NaN
+        interaction_columns = np.array(interactions, dtype=np.float64).reshape(-1, 2)
+        return {
+            "start_hour": session_columns[:, 0].astype(np.int64),
+            "focus_time": session_columns[:, 1],
+            "completed": session_columns[:, 2].astype(bool),
+            "response_time": interaction_columns[:, 0],
+            "correct": interaction_columns[:, 1],
+            "break_type": np.array([row[0] for row in break_types], dtype=str),
+        }
+
+    def import_legacy_json(self, user_id: str, path: str) -> int:
+        """Load an old {user}_focus_sessions.json once and move it aside"""
+        if user_id in self._checked_legacy:
+            return 0
+        with self._legacy_lock:
+            if user_id in self._checked_legacy:
+                return 0
+            self._checked_legacy.add(user_id)
+            if not os.path.exists(path):
+                return 0
+            try:
+                with open(path, "r") as f:
+                    sessions = json.load(f)
+            except (OSError, ValueError):
+                return 0
+
+            with self._lock:
+                self._conn.execute("BEGIN")
+                try:
+                    for session in sessions:
+                        self._insert_session(user_id, session)
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            os.replace(path, path + ".migrated")
+            return len(sessions)
+
+
+_shared_store: Optional[FocusStore] = None
+_shared_store_lock = threading.Lock()
+
+
+def get_focus_store() -> FocusStore:
+    """Process-wide focus store at config.FOCUS_DB"""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = FocusStore(FOCUS_DB)
+        return _shared_store
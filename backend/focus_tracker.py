@@ -2,16 +2,24 @@ import time
 import json
 import os
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.express as px
 import streamlit as st
 
+from achievements import get_achievements
+from config import FOCUS_TIME_THRESHOLD
+from focus_analytics import compute_focus_analytics
+from focus_store import get_focus_store
+from render_service import get_render_service
+
 class FocusTracker:
    def __init__(self, user_id: str):
        self.user_id = user_id
        self.session_file = f"user_data/{user_id}_focus_sessions.json"
+       self.store = get_focus_store()
+       self.store.import_legacy_json(user_id, self.session_file)
        self.current_session = None
        self.focus_start_time = None
 
@@ -47,7 +55,7 @@ class FocusTracker:
        self.current_session["interactions"].append(interaction)
 
        # Detect focus break if response time is too long
-       if response_time and response_time > 10:  # 10 seconds threshold
+       if response_time and response_time > FOCUS_TIME_THRESHOLD:
            self.log_focus_break("slow_response", response_time)
 
    def log_focus_break(self, break_type: str, duration: float):
@@ -75,6 +83,11 @@ class FocusTracker:
 
        # Save session data
        self._save_session_data()
+       get_achievements().record(self.user_id, "focus_session", {
+           "focus_time": self.current_session["total_focus_time"],
+           "breaks": len(self.current_session["focus_breaks"]),
+           "completed": completed
+       })
        self.current_session = None
 
    def _calculate_total_focus_time(self) -> float:
@@ -92,33 +105,19 @@ class FocusTracker:
        return max(0, total_time - break_time)
 
    def _save_session_data(self):
-       """Save session data to file"""
-       sessions = []
-       if os.path.exists(self.session_file):
-           with open(self.session_file, 'r') as f:
-               sessions = json.load(f)
-
-       sessions.append(self.current_session)
-
-       with open(self.session_file, 'w') as f:
-           json.dump(sessions, f, indent=2)
+       """Save session data to the focus store"""
+       self.store.add_session(self.user_id, self.current_session)
 
    def get_focus_analytics(self, days: int = 7) -> Dict:
        """Get focus analytics for the specified number of days"""
-       if not os.path.exists(self.session_file):
+       if not self.store.has_sessions(self.user_id):
            return {"total_sessions": 0, "avg_focus_time": 0, "focus_patterns": []}
 
-       with open(self.session_file, 'r') as f:
-           sessions = json.load(f)
-
-       # Filter recent sessions
+       # Only the recent sessions are read (index range on start time), as typed columns
        cutoff_date = datetime.now() - timedelta(days=days)
-       recent_sessions = [
-           s for s in sessions
-           if datetime.fromisoformat(s["start_time"]) > cutoff_date
-       ]
+       arrays = self.store.session_arrays(self.user_id, cutoff_date)
 
-       if not recent_sessions:
+       if not len(arrays["focus_time"]):
            return {
                "total_sessions": 0,
                "avg_focus_time": 0,
@@ -133,81 +132,21 @@ class FocusTracker:
                }
            }
 
-       # Calculate analytics
-       total_sessions = len(recent_sessions)
-       avg_focus_time = sum(s["total_focus_time"] for s in recent_sessions) / total_sessions
-       completion_rate = sum(1 for s in recent_sessions if s["completed"]) / total_sessions
-
-       # Analyze focus patterns
-       focus_patterns = self._analyze_focus_patterns(recent_sessions)
-
-       # Response time analysis
-       all_interactions = []
-       for session in recent_sessions:
-           all_interactions.extend(session["interactions"])
-
-       avg_response_time = 0
-       accuracy = 0
-       if all_interactions:
-           response_times = [i["response_time"] for i in all_interactions if i["response_time"]]
-           if response_times:
-               avg_response_time = sum(response_times) / len(response_times)
-
-           correct_responses = [i for i in all_interactions if i["correct"] is not None]
-           if correct_responses:
-               accuracy = sum(1 for i in correct_responses if i["correct"]) / len(correct_responses)
-
-       return {
-           "total_sessions": total_sessions,
-           "avg_focus_time": avg_focus_time,
-           "completion_rate": completion_rate,
-           "avg_response_time": avg_response_time,
-           "accuracy": accuracy,
-           "focus_patterns": focus_patterns,
-           "break_frequency": self._analyze_break_frequency(recent_sessions)
-       }
+       return compute_focus_analytics(arrays)
 
-   def _analyze_focus_patterns(self, sessions: List[Dict]) -> List[Dict]:
-       """Analyze when user focuses best"""
-       hourly_focus = {}
-
-       for session in sessions:
-           hour = datetime.fromisoformat(session["start_time"]).hour
-           if hour not in hourly_focus:
-               hourly_focus[hour] = []
-           hourly_focus[hour].append(session["total_focus_time"])
-
-       patterns = []
-       for hour, times in hourly_focus.items():
-           patterns.append({
-               "hour": hour,
-               "avg_focus_time": sum(times) / len(times),
-               "session_count": len(times)
-           })
-
-       return sorted(patterns, key=lambda x: x["avg_focus_time"], reverse=True)
-
-   def _analyze_break_frequency(self, sessions: List[Dict]) -> Dict:
-       """Analyze break patterns"""
-       all_breaks = []
-       for session in sessions:
-           all_breaks.extend(session["focus_breaks"])
-
-       if not all_breaks:
-           return {"avg_breaks_per_session": 0, "most_common_break_type": "none"}
-
-       break_types = {}
-       for break_event in all_breaks:
-           break_type = break_event["type"]
-           break_types[break_type] = break_types.get(break_type, 0) + 1
-
-       most_common = max(break_types.items(), key=lambda x: x[1])[0]
-
-       return {
-           "avg_breaks_per_session": len(all_breaks) / len(sessions),
-           "most_common_break_type": most_common,
-           "break_types": break_types
-       }
+   def focus_chart_url(self, analytics: Dict) -> Optional[str]:
+       """Focus-by-hour chart rendered in the render pool; returns its /api/images URL"""
+       if not analytics["focus_patterns"]:
+           return None
+       patterns = sorted(
+           ({"hour": p["hour"], "avg_focus_time": p["avg_focus_time"]} for p in analytics["focus_patterns"]),
+           key=lambda p: p["hour"]
+       )
+       try:
+           return get_render_service().render_url("focus", (patterns,))
+       except Exception as e:
+           print(f"Error creating focus chart: {e}")
+           return None
 
    def create_focus_visualization(self, analytics: Dict) -> go.Figure:
        """Create focus analytics visualization"""
@@ -0,0 +1,171 @@
+"""
+Corpus-level IDF statistics for keyword extraction.
+
+Document frequencies are accumulated incrementally from every piece of
+content saved through /api/save/content and persisted in SQLite, where a
+save only upserts the terms of the new documents. At request time keywords
+are scored transform-only (term counts x stored IDF), so no vectorizer is
+fitted per call and short inputs get stable weights.
+
+The model's version only moves when the statistics are rebuilt (first ready,
+legacy import, pruning), not on every saved document, so caches keyed on it
+survive routine saves and accept the slow drift in between.
+"""
+
+import os
+import json
+import math
+import heapq
+import sqlite3
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from config import IDF_MODEL_DB, IDF_LEGACY_PATH, IDF_MIN_DOCUMENTS, IDF_MAX_TERMS, IDF_PRUNE_TERMS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT PRIMARY KEY,
+    doc_freq INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class CorpusIDFModel:
+    """Document frequencies over saved content, updated with partial_fit()"""
+
+    def __init__(self, db_path: str, min_documents: int = IDF_MIN_DOCUMENTS, max_terms: int = IDF_MAX_TERMS,
+                 prune_terms: int = IDF_PRUNE_TERMS, legacy_path: Optional[str] = None):
+        self.min_documents = min_documents
+        self.max_terms = max_terms
+        # Pruning drops well below max_terms, so it runs rarely and new terms get room to establish
+        self.prune_terms = min(prune_terms, max_terms)
+        # Same tokenization as the per-request TfidfVectorizer fallback
+        self._analyze = TfidfVectorizer(stop_words="english", ngram_range=(1, 2)).build_analyzer()
+        self._lock = threading.Lock()
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self.n_documents = 0
+        self.generation = 0
+        self.doc_freq: Dict[str, int] = {}
+        self._load()
+        if legacy_path:
+            self._import_legacy(legacy_path)
+
+    def _load(self):
+        meta = dict(self._conn.execute("SELECT key, value FROM meta").fetchall())
+        self.n_documents = meta.get("n_documents", 0)
+        self.generation = meta.get("generation", 0)
+        self.doc_freq = dict(self._conn.execute("SELECT term, doc_freq FROM terms").fetchall())
+
+    def _import_legacy(self, path: str):
+        """Load the old JSON model once (only into an empty database) and move it aside"""
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"IDF model load error, starting empty: {e}")
+            return
+        if not self.n_documents:
+            self.n_documents = int(data.get("n_documents", 0))
+            self.doc_freq = {k: int(v) for k, v in data.get("doc_freq", {}).items()}
+            self.generation += 1
+            self._save(self.doc_freq)
+        os.replace(path, path + ".migrated")
+
+    def _save(self, changed: Dict[str, int], removed: Iterable[str] = ()):
+        """Upsert the changed terms and the document count in one transaction"""
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany(
+                "INSERT INTO terms(term, doc_freq) VALUES (?, ?) "
+                "ON CONFLICT(term) DO UPDATE SET doc_freq = excluded.doc_freq",
+                changed.items(),
+            )
+            self._conn.executemany("DELETE FROM terms WHERE term = ?", [(term,) for term in removed])
+            self._conn.executemany(
+                "INSERT INTO meta(key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                [("n_documents", self.n_documents), ("generation", self.generation)],
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    @property
+    def ready(self) -> bool:
+        """True once enough documents were seen for the IDF to be meaningful"""
+        return self.n_documents >= self.min_documents
+
+    @property
+    def version(self) -> int:
+        """Changes when the statistics are rebuilt (becoming ready or pruned), not on every save; 0 while not ready"""
+        return self.generation if self.ready else 0
+
+    def partial_fit(self, documents: Iterable[str]) -> int:
+        """Add documents to the statistics and persist the terms they touched; returns documents added"""
+        added = 0
+        with self._lock:
+            was_ready = self.ready
+            changed: Dict[str, int] = {}
+            for text in documents:
+                if not text or not text.strip():
+                    continue
+                for term in set(self._analyze(text)):
+                    changed[term] = self.doc_freq[term] = self.doc_freq.get(term, 0) + 1
+                self.n_documents += 1
+                added += 1
+            if not added:
+                return 0
+            removed = self._prune() if len(self.doc_freq) > self.max_terms else []
+            for term in removed:
+                changed.pop(term, None)
+            if removed or (self.ready and not was_ready):
+                self.generation += 1
+            self._save(changed, removed)
+        return added
+
+    def _prune(self) -> List[str]:
+        """Keep the prune_terms most frequent terms; rare terms fall back to the max IDF. Returns the dropped terms"""
+        keep = dict(heapq.nlargest(self.prune_terms, self.doc_freq.items(), key=lambda item: item[1]))
+        removed = [term for term in self.doc_freq if term not in keep]
+        self.doc_freq = keep
+        return removed
+
+    def idf(self, term: str) -> float:
+        # Smoothed IDF, as TfidfVectorizer(smooth_idf=True) computes it
+        return math.log((1 + self.n_documents) / (1 + self.doc_freq.get(term, 0))) + 1
+
+    def top_keywords(self, text: str, top_n: int = 15) -> List[str]:
+        """Highest tf-idf terms of text under the corpus statistics (no fitting)"""
+        counts = Counter(self._analyze(text))
+        if not counts:
+            return []
+        scored = sorted(counts.items(), key=lambda item: (-item[1] * self.idf(item[0]), item[0]))
+        return [term for term, _ in scored[:top_n]]
+
+
+_shared_model: Optional[CorpusIDFModel] = None
+_shared_model_lock = threading.Lock()
+
+
+def get_idf_model() -> CorpusIDFModel:
+    """Process-wide model stored at config.IDF_MODEL_DB"""
+    global _shared_model
+    with _shared_model_lock:
+        if _shared_model is None:
+            _shared_model = CorpusIDFModel(IDF_MODEL_DB, legacy_path=IDF_LEGACY_PATH)
+        return _shared_model
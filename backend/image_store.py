@@ -0,0 +1,164 @@
+"""
+Content-addressed store for rendered images.
+
+PNG bytes are kept in an `images` table at config.IMAGE_CACHE_DB keyed by
+their sha256, so identical renders share one row and a digest always names
+the same bytes. API responses carry /api/images/{digest} URLs instead of
+inline base64, and the endpoint can mark every response immutable. The
+`renders` table remembers which digest a given render input produced, so
+repeated requests skip rendering altogether.
+
+Total image bytes are kept by triggers; past max_bytes the least recently
+used images are evicted (renders are deterministic, so an evicted image is
+simply rendered again under the same digest).
+"""
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional, Tuple
+
+from config import IMAGE_CACHE_DB, IMAGE_CACHE_MAX_BYTES
+
+IMAGE_URL_PREFIX = "/api/images"
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+TOUCH_INTERVAL = 3600  # seconds; last_access is only rewritten when older than this
+EVICTION_BATCH = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    digest TEXT PRIMARY KEY,
+    media_type TEXT NOT NULL,
+    data BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_images_last_access ON images(last_access);
+CREATE TABLE IF NOT EXISTS renders (
+    input_key TEXT PRIMARY KEY,
+    digest TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS totals (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    bytes INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO totals(id, bytes) VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS images_insert AFTER INSERT ON images BEGIN
+    UPDATE totals SET bytes = bytes + NEW.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS images_delete AFTER DELETE ON images BEGIN
+    UPDATE totals SET bytes = bytes - OLD.size WHERE id = 0;
+    DELETE FROM renders WHERE digest = OLD.digest;
+END;
+"""
+
+
+class ImageStore:
+    """Rendered images in SQLite, addressed by the sha256 of their bytes"""
+
+    def __init__(self, db_path: str, max_bytes: Optional[int] = IMAGE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def url(digest: str) -> str:
+        return f"{IMAGE_URL_PREFIX}/{digest}"
+
+    def put(self, data: bytes, media_type: str = "image/png") -> str:
+        """Store data (once) and return its digest"""
+        digest = hashlib.sha256(data).hexdigest()
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO images(digest, media_type, data, size, created, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, media_type, sqlite3.Binary(data), len(data), now, now),
+            )
+            if cursor.rowcount:
+                self._evict(keep=digest)
+            else:
+                self._touch(digest, now)
+        return digest
+
+    def _touch(self, digest: str, now: float):
+        self._conn.execute(
+            "UPDATE images SET last_access = ? WHERE digest = ? AND last_access < ?",
+            (now, digest, now - TOUCH_INTERVAL),
+        )
+
+    def _evict(self, keep: str) -> int:
+        """Drop least recently used images until the store fits max_bytes; keep is never evicted"""
+        if self.max_bytes is None:
+            return 0
+        evicted = 0
+        used = self._conn.execute("SELECT bytes FROM totals WHERE id = 0").fetchone()[0]
+        while used > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT digest, size FROM images WHERE digest != ? ORDER BY last_access LIMIT ?",
+                (keep, EVICTION_BATCH),
+            ).fetchall()
+            if not rows:
+                break
+            for digest, size in rows:
+                if used <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM images WHERE digest = ?", (digest,))
+                used -= size
+                evicted += 1
+        return evicted
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT bytes FROM totals WHERE id = 0").fetchone()[0]
+
+    def put_url(self, data: bytes, media_type: str = "image/png") -> Optional[str]:
+        """URL for data, or None when there is nothing to store (e.g. a failed render)"""
+        return self.url(self.put(data, media_type)) if data else None
+
+    def get(self, digest: str) -> Optional[Tuple[bytes, str]]:
+        """(data, media_type) for a digest, or None"""
+        if not DIGEST_RE.match(digest):
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT data, media_type FROM images WHERE digest = ?", (digest,)).fetchone()
+            if row:
+                self._touch(digest, time.time())
+        return (bytes(row[0]), row[1]) if row else None
+
+    def lookup(self, input_key: str) -> Optional[str]:
+        """Digest previously rendered for input_key, if it is still stored"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT r.digest FROM renders r JOIN images i ON i.digest = r.digest WHERE r.input_key = ?",
+                (input_key,),
+            ).fetchone()
+            if row:
+                self._touch(row[0], time.time())
+        return row[0] if row else None
+
+    def remember(self, input_key: str, digest: str):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO renders(input_key, digest) VALUES (?, ?)", (input_key, digest))
+
+
+_shared_store: Optional[ImageStore] = None
+_shared_store_lock = threading.Lock()
+
+
+def get_image_store() -> ImageStore:
+    """Process-wide store in config.IMAGE_CACHE_DB"""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = ImageStore(IMAGE_CACHE_DB)
+        return _shared_store
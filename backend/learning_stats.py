@@ -0,0 +1,230 @@
+"""
+Running learning-session aggregates.
+
+SessionManager keeps its session and mood history in JSON, but analytics no
+longer re-read and re-count it. end_session and mood_checkin each add to one
+daily bucket per user (session counts and sums, mood counts, activity
+counts), and a window query sums the buckets for the days it covers, so it
+costs O(days) however many events a user has. The last few finished sessions
+are kept in a small per-user ring for the "recent sessions" list.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+from config import LEARNING_STATS_DB
+
+RECENT_SESSIONS = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_sessions (
+    user_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    sessions INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    completed_time REAL NOT NULL DEFAULT 0,
+    understanding_total REAL NOT NULL DEFAULT 0,
+    understanding_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day)
+);
+CREATE TABLE IF NOT EXISTS daily_counts (
+    user_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    day TEXT NOT NULL,
+    name TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, kind, day, name)
+);
+CREATE TABLE IF NOT EXISTS recent_sessions (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    start_ts REAL NOT NULL,
+    session TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_recent_sessions_user ON recent_sessions(user_id, id);
+CREATE TABLE IF NOT EXISTS imported (
+    user_id TEXT PRIMARY KEY
+);
+"""
+
+UPSERT_SESSIONS = """
+INSERT INTO daily_sessions(user_id, day, sessions, completed, completed_time, understanding_total,
+                           understanding_count) VALUES (?, ?, 1, ?, ?, ?, ?)
+ON CONFLICT(user_id, day) DO UPDATE SET
+    sessions = sessions + 1,
+    completed = completed + excluded.completed,
+    completed_time = completed_time + excluded.completed_time,
+    understanding_total = understanding_total + excluded.understanding_total,
+    understanding_count = understanding_count + excluded.understanding_count
+"""
+
+UPSERT_COUNT = """
+INSERT INTO daily_counts(user_id, kind, day, name, count) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(user_id, kind, day, name) DO UPDATE SET count = count + excluded.count
+"""
+
+
+def _day(timestamp: str) -> str:
+    return datetime.fromisoformat(timestamp).date().isoformat()
+
+
+def _first_day(days: int) -> str:
+    """Oldest bucket in a `days` window; the whole boundary day is included"""
+    return (datetime.now() - timedelta(days=days)).date().isoformat()
+
+
+class LearningStats:
+    """Per-user daily buckets of session, mood and activity totals"""
+
+    def __init__(self, db_path: str):
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._checked_legacy: Set[str] = set()
+        self._legacy_lock = threading.Lock()
+
+    def _add_session(self, user_id: str, session: Dict):
+        completed = bool(session.get("completed"))
+        understanding = session.get("understanding_level") if completed else None
+        day = _day(session["start_time"])
+        self._conn.execute(UPSERT_SESSIONS, (
+            user_id, day, int(completed), float(session.get("total_time", 0)) if completed else 0.0,
+            float(understanding or 0), int(bool(understanding)),
+        ))
+        activity_counts: Dict[str, int] = {}
+        for activity in session.get("activities", []):
+            activity_counts[activity["type"]] = activity_counts.get(activity["type"], 0) + 1
+        self._conn.executemany(UPSERT_COUNT, [
+            (user_id, "activity", day, name, count) for name, count in activity_counts.items()
+        ])
+
+    def _add_moods(self, user_id: str, moods: Iterable[Dict]):
+        self._conn.executemany(UPSERT_COUNT, [
+            (user_id, "mood", _day(mood["timestamp"]), mood["mood_name"], 1) for mood in moods
+        ])
+
+    def _remember_sessions(self, user_id: str, sessions: List[Dict]):
+        """Push sessions onto the user's recent ring and drop all but the newest RECENT_SESSIONS"""
+        self._conn.executemany(
+            "INSERT INTO recent_sessions(user_id, start_ts, session) VALUES (?, ?, ?)",
+            [(user_id, datetime.fromisoformat(s["start_time"]).timestamp(), json.dumps(s)) for s in sessions],
+        )
+        self._conn.execute(
+            """DELETE FROM recent_sessions WHERE user_id = ? AND id NOT IN (
+                   SELECT id FROM recent_sessions WHERE user_id = ? ORDER BY id DESC LIMIT ?)""",
+            (user_id, user_id, RECENT_SESSIONS),
+        )
+
+    def _write(self, apply):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                apply()
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def record_session(self, user_id: str, session: Dict):
+        """Add a finished session to its start day's bucket and the recent ring"""
+        def apply():
+            self._add_session(user_id, session)
+            self._remember_sessions(user_id, [session])
+
+        self._write(apply)
+
+    def record_mood(self, user_id: str, mood: Dict):
+        self._write(lambda: self._add_moods(user_id, [mood]))
+
+    def window(self, user_id: str, days: int = 30) -> Dict:
+        """Session, mood and activity totals over the last `days` days, summed from daily buckets"""
+        first_day = _first_day(days)
+        with self._lock:
+            sessions, completed, completed_time, understanding_total, understanding_count = self._conn.execute(
+                """SELECT COALESCE(SUM(sessions), 0), COALESCE(SUM(completed), 0), COALESCE(SUM(completed_time), 0),
+                          COALESCE(SUM(understanding_total), 0), COALESCE(SUM(understanding_count), 0)
+                   FROM daily_sessions WHERE user_id = ? AND day >= ?""",
+                (user_id, first_day),
+            ).fetchone()
+            counts = {kind: dict(self._conn.execute(
+                """SELECT name, SUM(count) FROM daily_counts WHERE user_id = ? AND kind = ? AND day >= ?
+                   GROUP BY name ORDER BY MIN(rowid)""",
+                (user_id, kind, first_day),
+            ).fetchall()) for kind in ("mood", "activity")}
+
+        return {
+            "total_sessions": sessions,
+            "total_time": completed_time,
+            "avg_session_time": completed_time / completed if completed else 0,
+            "completion_rate": completed / sessions if sessions else 0,
+            "avg_understanding": understanding_total / understanding_count if understanding_count else 0,
+            "mood_trends": counts["mood"],
+            "activity_breakdown": counts["activity"],
+        }
+
+    def recent_sessions(self, user_id: str, days: int = 30) -> List[Dict]:
+        """The newest sessions from the ring that started within the window, oldest first"""
+        cutoff = (datetime.now() - timedelta(days=days)).timestamp()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session FROM recent_sessions WHERE user_id = ? AND start_ts > ? ORDER BY id",
+                (user_id, cutoff),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def import_legacy(self, user_id: str, session_file: str, mood_file: str) -> bool:
+        """Fold a user's existing JSON history into the buckets, once per user"""
+        if user_id in self._checked_legacy:
+            return False
+        with self._legacy_lock:
+            if user_id in self._checked_legacy:
+                return False
+            self._checked_legacy.add(user_id)
+            sessions = self._read_json(session_file)
+            moods = self._read_json(mood_file)
+
+            imported = []
+
+            def apply():
+                if self._conn.execute("SELECT 1 FROM imported WHERE user_id = ?", (user_id,)).fetchone():
+                    return
+                self._conn.execute("INSERT INTO imported(user_id) VALUES (?)", (user_id,))
+                for session in sessions:
+                    self._add_session(user_id, session)
+                self._add_moods(user_id, moods)
+                self._remember_sessions(user_id, sessions[-RECENT_SESSIONS:])
+                imported.append(True)
+
+            self._write(apply)
+            return bool(imported)
+
+    @staticmethod
+    def _read_json(path: str) -> List[Dict]:
+        if not os.path.exists(path):
+            return []
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+
+_shared_stats: Optional[LearningStats] = None
+_shared_stats_lock = threading.Lock()
+
+
+def get_learning_stats() -> LearningStats:
+    """Process-wide learning stats at config.LEARNING_STATS_DB"""
+    global _shared_stats
+    with _shared_stats_lock:
+        if _shared_stats is None:
+            _shared_stats = LearningStats(LEARNING_STATS_DB)
+        return _shared_stats
@@ -0,0 +1,207 @@
+"""
+HTTP delivery for generated media (audio, uploads, rendered images) and
+cached JSON views.
+
+Content-addressed files (named after a hex digest) never change once written,
+so they are served with a year-long immutable Cache-Control. Every response
+carries a strong ETag, honours If-None-Match, supports single byte ranges for
+seeking, and prefers a precompressed sibling (.br / .gz) when the client
+accepts it and no range was requested.
+"""
+
+import os
+import re
+import gzip
+import shutil
+import hashlib
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+HASHED_NAME_RE = re.compile(r"^[0-9a-f]{32,64}\.[A-Za-z0-9]+$")
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+CHUNK_SIZE = 64 * 1024
+
+# (Content-Encoding, file suffix) in order of preference
+PRECOMPRESSED_VARIANTS = [("br", ".br"), ("gzip", ".gz")]
+
+MEDIA_TYPES = {
+    ".mp3": "audio/mpeg",
+    ".wav": "audio/wav",
+    ".webm": "audio/webm",
+    ".png": "image/png",
+    ".txt": "text/plain; charset=utf-8",
+}
+
+
+def _etag(path: str, stat: os.stat_result) -> str:
+    digest = hashlib.sha1(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison is what If-None-Match asks for
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return etag in candidates
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """(start, end) inclusive for a single 'bytes=' range, None if it can't be satisfied.
+    Raises ValueError for syntax we don't handle (e.g. multiple ranges)."""
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        raise ValueError(header)
+    if size == 0:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        raise ValueError(header)
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return None
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        raise ValueError(header)
+    if start >= size:
+        return None
+    end = int(last) if last else size - 1
+    return start, min(end, size - 1)
+
+
+def _iter_file(path: str, start: int, length: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _precompressed_variant(path: str, stat: os.stat_result, accept_encoding: str):
+    """A fresh .br/.gz sibling the client accepts, as (encoding, path, stat)"""
+    accepted = {part.split(";")[0].strip() for part in accept_encoding.split(",")}
+    for encoding, suffix in PRECOMPRESSED_VARIANTS:
+        if encoding not in accepted:
+            continue
+        variant = path + suffix
+        try:
+            variant_stat = os.stat(variant)
+        except OSError:
+            continue
+        # Ignore siblings older than the file itself - they describe previous content
+        if variant_stat.st_mtime_ns >= stat.st_mtime_ns:
+            return encoding, variant, variant_stat
+    return None
+
+
+def precompress(path: str, min_saving: float = 0.1) -> Optional[str]:
+    """Write path + '.gz' if it saves at least min_saving of the size"""
+    gz_path = path + ".gz"
+    try:
+        with open(path, "rb") as src, gzip.open(gz_path + ".part", "wb", compresslevel=9) as dst:
+            shutil.copyfileobj(src, dst)
+        if os.path.getsize(gz_path + ".part") > os.path.getsize(path) * (1 - min_saving):
+            os.remove(gz_path + ".part")
+            return None
+        os.replace(gz_path + ".part", gz_path)
+        return gz_path
+    except OSError as e:
+        print(f"Precompression error for {path}: {e}")
+        return None
+
+
+def media_response(request: Request, directory: str, filename: str) -> Response:
+    """Serve directory/filename with caching validators and byte-range support"""
+    root = os.path.realpath(directory)
+    path = os.path.realpath(os.path.join(root, filename))
+    if os.path.dirname(path) != root or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Not found")
+
+    stat = os.stat(path)
+    ext = os.path.splitext(filename)[1].lower()
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if HASHED_NAME_RE.match(filename) else REVALIDATE_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+    media_type = MEDIA_TYPES.get(ext, "application/octet-stream")
+    etag = _etag(path, stat)
+    range_header = request.headers.get("range")
+
+    if range_header is None:
+        variant = _precompressed_variant(path, stat, request.headers.get("accept-encoding", ""))
+        if variant:
+            encoding, path, stat = variant
+            etag = etag[:-1] + f'-{encoding}"'
+            headers["Content-Encoding"] = encoding
+    headers["ETag"] = etag
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    size = stat.st_size
+    byte_range = None
+    if range_header is not None and request.headers.get("if-range", etag) == etag:
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            pass  # unsupported range syntax (e.g. multiple ranges): send the whole file
+        else:
+            if byte_range is None:
+                headers["Content-Range"] = f"bytes */{size}"
+                return Response(status_code=416, headers=headers)
+
+    if request.method == "HEAD":
+        headers["Content-Length"] = str(size)
+        return Response(status_code=200, headers=headers, media_type=media_type)
+
+    if byte_range is not None:
+        start, end = byte_range
+        length = end - start + 1
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(length)
+        return StreamingResponse(_iter_file(path, start, length), status_code=206,
+                                 headers=headers, media_type=media_type)
+
+    headers["Content-Length"] = str(size)
+    return StreamingResponse(_iter_file(path, 0, size), status_code=200,
+                             headers=headers, media_type=media_type)
+
+
+def blob_response(request: Request, data: bytes, media_type: str, digest: str) -> Response:
+    """Serve in-memory bytes whose digest names their content (so they never change)"""
+    etag = f'"{digest}"'
+    headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL, "ETag": etag}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if request.method == "HEAD":
+        headers["Content-Length"] = str(len(data))
+        return Response(status_code=200, headers=headers, media_type=media_type)
+    return Response(content=data, status_code=200, headers=headers, media_type=media_type)
+
+
+def view_response(request: Request, payload_of: Callable[[], Tuple[Dict, str]], etag: Optional[str] = None) -> Response:
+    """JSON for a cached view, or 304 when the client already holds etag.
+    payload_of returns (payload, etag) and is only called when the body is needed."""
+    headers = {"Cache-Control": REVALIDATE_CACHE_CONTROL}
+    if etag and _etag_matches(request.headers.get("if-none-match"), etag):
+        headers["ETag"] = etag
+        return Response(status_code=304, headers=headers)
+    payload, etag = payload_of()
+    headers["ETag"] = etag
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(payload, headers=headers)
@@ -1,6 +1,6 @@
 import openai
 import re
-from typing import Dict, List
+from typing import Dict, List, Iterator
 from config import AZURE_OPENAI_API_KEY, ENDPOINT_URL, DEPLOYMENT_NAME
 
 
@@ -13,7 +13,7 @@ class NeuroSummarizer:
         )
         self.model = DEPLOYMENT_NAME
 
-    def _call_openai(self, system_prompt: str, user_content: str) -> str:
+    def _call_openai(self, system_prompt: str, user_content: str, max_tokens: int = 1000) -> str:
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
@@ -22,13 +22,32 @@ class NeuroSummarizer:
                     {"role": "user", "content": user_content}
                 ],
                 temperature=0.7,
-                max_tokens=1000
+                max_tokens=max_tokens
             )
             return response.choices[0].message.content.strip()
         except Exception as e:
             # No streamlit, just raise
             raise RuntimeError(f"OpenAI API Error: {str(e)}")
 
+    def _stream_openai(self, system_prompt: str, user_content: str, max_tokens: int = 1000) -> Iterator[str]:
+        """Like _call_openai, but yields the response text as it is generated"""
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_content}
+                ],
+                temperature=0.7,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            raise RuntimeError(f"OpenAI API Error: {str(e)}")
+
     def basic_summary(self, content: str) -> str:
         system_prompt = """You are a neuro-friendly learning assistant. Create a clear, concise summary that:
         - Uses simple, direct language
@@ -0,0 +1,253 @@
+"""
+Feedback images drawn directly with PIL.ImageDraw.
+
+A lighter alternative to the matplotlib figures in visual_feedback_manager:
+no figure/axes objects and no tight-bbox pass. Fonts are loaded once per
+thread and each background (a mood's colour plus decorations, a chart's
+title and axes) is drawn once and copied per render, so an image costs its
+variable parts and a PNG encode.
+Every render works on its own Image, which keeps concurrent requests apart.
+"""
+
+import io
+import math
+import threading
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from PIL import Image, ImageDraw, ImageFont
+
+CARD_SIZE = (600, 400)
+PROGRESS_SIZE = (800, 300)
+FOCUS_SIZE = (800, 400)
+FONT_FILES = {True: ["DejaVuSans-Bold.ttf", "Arial Bold.ttf", "arialbd.ttf"],
+              False: ["DejaVuSans.ttf", "Arial.ttf", "arial.ttf"]}
+
+PROGRESS_COLOR = (76, 175, 80, 204)  # #4CAF50 at alpha 0.8
+TRACK_COLOR = (224, 224, 224, 77)  # #E0E0E0 at alpha 0.3
+FOCUS_BAR_COLOR = "#2196F3"
+
+
+def mood_palette(mood: str) -> Tuple[str, str]:
+    """(background, text) colours for a card mood; shared with the matplotlib renderer"""
+    if mood in ["excellent", "legendary", "fire"]:
+        return "#FFD700", "#333"  # Gold
+    if mood in ["good", "building", "focused"]:
+        return "#4CAF50", "white"  # Green
+    if mood in ["encouraging", "growing", "starting"]:
+        return "#2196F3", "white"  # Blue
+    return "#9C27B0", "white"  # Purple
+
+
+# -------------------------
+# Fonts
+# -------------------------
+_fonts = threading.local()
+
+
+def _load_font(size: int, bold: bool):
+    for name in FONT_FILES[bold]:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:  # Pillow < 10.1 has a single bitmap size
+        return ImageFont.load_default()
+
+
+def get_font(size: int, bold: bool = True):
+    """Font for this thread; FreeType faces are not shared between threads"""
+    cache: Dict = getattr(_fonts, "cache", None)
+    if cache is None:
+        cache = _fonts.cache = {}
+    key = (size, bold)
+    font = cache.get(key)
+    if font is None:
+        font = cache[key] = _load_font(size, bold)
+    return font
+
+
+# -------------------------
+# Pre-drawn backgrounds
+# -------------------------
+def _to_px(x: float, y: float, size: Tuple[int, int]) -> Tuple[float, float]:
+    """Map the 0-10 data coordinates used by the matplotlib cards onto pixels (y up)"""
+    width, height = size
+    return x * width / 10, height - y * height / 10
+
+
+def _star(cx: float, cy: float, radius: float) -> List[Tuple[float, float]]:
+    points = []
+    for i in range(10):
+        r = radius if i % 2 == 0 else radius * 0.4
+        angle = -math.pi / 2 + i * math.pi / 5
+        points.append((cx + r * math.cos(angle), cy + r * math.sin(angle)))
+    return points
+
+
+def _draw_decorations(overlay: Image.Image, mood: str):
+    """Same decorations as the matplotlib cards, drawn on a transparent overlay"""
+    draw = ImageDraw.Draw(overlay)
+    size = overlay.size
+    sx, sy = size[0] / 10, size[1] / 10
+
+    if mood in ["excellent", "legendary"]:
+        for x, y in [(2, 8), (8, 8), (1, 2), (9, 2), (5, 9)]:
+            draw.polygon(_star(*_to_px(x, y, size), radius=14), fill=(255, 255, 0, 255))
+
+    elif mood in ["fire", "building"]:
+        for i in range(3):
+            cx, cy = _to_px(2 + i * 3, 1, size)
+            rx, ry = 0.25 * sx, 0.75 * sy
+            draw.ellipse([cx - rx, cy - ry, cx + rx, cy + ry], fill=(255, 165, 0, 179))
+
+    elif mood == "focused":
+        cx, cy = _to_px(5, 2, size)
+        for radius, fill in [(1.5, (255, 0, 0, 77)), (1.0, (255, 255, 255, 179)), (0.5, (255, 0, 0, 128))]:
+            rx, ry = radius * sx, radius * sy
+            # Each ring composites over the ones below it
+            ring = Image.new("RGBA", size, (0, 0, 0, 0))
+            ImageDraw.Draw(ring).ellipse([cx - rx, cy - ry, cx + rx, cy + ry], fill=fill)
+            overlay.alpha_composite(ring)
+
+
+@lru_cache(maxsize=32)
+def _card_background(mood: str, size: Tuple[int, int] = CARD_SIZE) -> Image.Image:
+    """Background and decorations for a mood; callers must copy() before drawing"""
+    bg_color, _ = mood_palette(mood)
+    background = Image.new("RGBA", size, bg_color)
+    overlay = Image.new("RGBA", size, (0, 0, 0, 0))
+    _draw_decorations(overlay, mood)
+    background.alpha_composite(overlay)
+    return background
+
+
+@lru_cache(maxsize=4)
+def _progress_background(size: Tuple[int, int] = PROGRESS_SIZE) -> Image.Image:
+    """Title, empty track and axis label; callers must copy() before drawing"""
+    width, height = size
+    background = Image.new("RGBA", size, "white")
+    draw = ImageDraw.Draw(background)
+    draw.text((width / 2, 40), "Learning Progress", font=get_font(28), fill="black", anchor="mm")
+    track = Image.new("RGBA", size, (0, 0, 0, 0))
+    ImageDraw.Draw(track).rectangle(_track_box(size), fill=TRACK_COLOR)
+    background.alpha_composite(track)
+    draw.line([(40, height - 70), (width - 40, height - 70)], fill="black", width=1)
+    draw.text((width / 2, height - 35), "Progress", font=get_font(16, bold=False), fill="black", anchor="mm")
+    return background
+
+
+def _track_box(size: Tuple[int, int]) -> List[float]:
+    width, height = size
+    return [40, 90, width - 40, height - 90]
+
+
+# -------------------------
+# Rendering
+# -------------------------
+def _wrap(draw: ImageDraw.ImageDraw, text: str, font, max_width: float) -> List[str]:
+    lines: List[str] = []
+    current = ""
+    for word in text.split():
+        candidate = f"{current} {word}".strip()
+        if current and draw.textlength(candidate, font=font) > max_width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+    return lines
+
+
+def _encode(image: Image.Image) -> bytes:
+    buffer = io.BytesIO()
+    image.convert("RGB").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def render_meme_card(category: str, text: str, mood: str) -> bytes:
+    """PNG bytes of a feedback card (also used for badges)"""
+    _, text_color = mood_palette(mood)
+    image = _card_background(mood).copy()
+    width, height = image.size
+    font = get_font(20)
+
+    measure = ImageDraw.Draw(image)
+    lines = _wrap(measure, text, font, width * 0.75)
+    spacing = 6
+    box = measure.multiline_textbbox((width / 2, height / 2), "\n".join(lines), font=font,
+                                     anchor="mm", align="center", spacing=spacing)
+    pad = 12
+    # Translucent rounded box behind the text, as in the matplotlib cards
+    panel = Image.new("RGBA", image.size, (0, 0, 0, 0))
+    ImageDraw.Draw(panel).rounded_rectangle(
+        [box[0] - pad, box[1] - pad, box[2] + pad, box[3] + pad], radius=pad, fill=(255, 255, 255, 204)
+    )
+    image.alpha_composite(panel)
+    ImageDraw.Draw(image).multiline_text((width / 2, height / 2), "\n".join(lines), font=font,
+                                         fill=text_color, anchor="mm", align="center", spacing=spacing)
+    return _encode(image)
+
+
+def render_progress_bar(progress: float) -> bytes:
+    """PNG bytes of a horizontal progress bar for a 0-1 fraction"""
+    progress = max(0.0, min(1.0, progress))
+    image = _progress_background().copy()
+    x0, y0, x1, y1 = _track_box(image.size)
+
+    if progress > 0:
+        bar = Image.new("RGBA", image.size, (0, 0, 0, 0))
+        ImageDraw.Draw(bar).rectangle([x0, y0, x0 + (x1 - x0) * progress, y1], fill=PROGRESS_COLOR)
+        image.alpha_composite(bar)
+    ImageDraw.Draw(image).text(((x0 + x1) / 2, (y0 + y1) / 2), f"{progress:.1%}", font=get_font(32),
+                               fill="white", anchor="mm")
+    return _encode(image)
+
+
+@lru_cache(maxsize=4)
+def _focus_background(size: Tuple[int, int] = FOCUS_SIZE) -> Image.Image:
+    """Title, axes and hour ticks; callers must copy() before drawing"""
+    width, height = size
+    left, top, right, bottom = _plot_box(size)
+    background = Image.new("RGBA", size, "white")
+    draw = ImageDraw.Draw(background)
+    draw.text((width / 2, 25), "Focus Patterns by Hour", font=get_font(20), fill="black", anchor="mm")
+    draw.line([(left, top), (left, bottom), (right, bottom)], fill="black", width=1)
+    tick_font = get_font(12, bold=False)
+    slot = (right - left) / 24
+    for hour in range(0, 24, 2):
+        x = left + (hour + 0.5) * slot
+        draw.line([(x, bottom), (x, bottom + 4)], fill="black")
+        draw.text((x, bottom + 14), str(hour), font=tick_font, fill="black", anchor="mm")
+    draw.text(((left + right) / 2, height - 12), "Hour of Day", font=get_font(14, bold=False), fill="black",
+              anchor="mm")
+    return background
+
+
+def _plot_box(size: Tuple[int, int]) -> Tuple[float, float, float, float]:
+    width, height = size
+    return 70, 50, width - 20, height - 50
+
+
+def render_focus_chart(patterns: List[Dict]) -> bytes:
+    """PNG bytes of average focus time per hour of day (bars at each pattern's hour)"""
+    image = _focus_background().copy()
+    left, top, right, bottom = _plot_box(image.size)
+    draw = ImageDraw.Draw(image)
+    slot = (right - left) / 24
+    peak = max((p["avg_focus_time"] for p in patterns), default=0)
+    tick_font = get_font(12, bold=False)
+
+    if peak > 0:
+        for pattern in patterns:
+            x = left + pattern["hour"] * slot
+            bar_top = bottom - (bottom - top) * pattern["avg_focus_time"] / peak
+            draw.rectangle([x + slot * 0.1, bar_top, x + slot * 0.9, bottom], fill=FOCUS_BAR_COLOR)
+    for fraction in (0.5, 1.0):
+        y = bottom - (bottom - top) * fraction
+        draw.line([(left - 4, y), (left, y)], fill="black")
+        draw.text((left - 8, y), f"{peak * fraction:.0f}s", font=tick_font, fill="black", anchor="rm")
+    return _encode(image)
@@ -0,0 +1,297 @@
+"""
+Precomputed quiz questions per saved document.
+
+When content is saved, a background builder asks the LLM for a larger pool
+of questions per difficulty, validates every item and stores the survivors
+keyed by (content hash, difficulty). Starting a quiz then samples from the
+bank - a local SQLite lookup - instead of waiting on generation. Builds are
+claimed in SQLite; a build that never finished (crash, restart) is reclaimed
+once it goes stale, and failed builds are retried after a backoff.
+"""
+
+import os
+import re
+import json
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from config import (QUIZ_BANK_DB, QUIZ_BANK_SIZE, QUIZ_BANK_WORKERS, QUIZ_BANK_BUILD_TIMEOUT,
+                    QUIZ_BANK_RETRY_SECONDS, QUIZ_QUESTION_COUNT, FLASHCARD_DIFFICULTY_LEVELS)
+from utils_fold.hash_utils import content_hash
+
+QUIZ_CONTENT_CHARS = 2000  # how much of the document the LLM sees
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quiz_questions (
+    content_hash TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    question TEXT NOT NULL,
+    PRIMARY KEY (content_hash, difficulty, position)
+);
+CREATE TABLE IF NOT EXISTS quiz_banks (
+    content_hash TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    status TEXT NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0,
+    updated REAL NOT NULL,
+    PRIMARY KEY (content_hash, difficulty)
+);
+"""
+
+
+def quiz_prompt(count: int, difficulty: str, ndjson: bool = False) -> str:
+    """System prompt asking for count questions as a JSON array (or one JSON object per line)"""
+    output_format = (
+        "Return one JSON object per line (newline-delimited JSON): no array, no code fences, no other text."
+        if ndjson else "Return only valid JSON array of questions."
+    )
+    return f"""Generate {count} quiz questions from the provided content.
+            Difficulty level: {difficulty}
+
+            Format each question as JSON with this structure:
+            {{
+                "question": "The question text",
+                "options": ["A", "B", "C", "D"],
+                "correct_answer": 0,
+                "explanation": "Why this answer is correct",
+                "type": "multiple_choice"
+            }}
+
+            Question types based on difficulty:
+            - Easy: Direct recall, definitions
+            - Medium: Understanding, application
+            - Hard: Analysis, synthesis, evaluation
+
+            Make questions neuro-friendly:
+            - Clear, concise language
+            - Avoid trick questions
+            - Include context when needed
+            - Focus on understanding over memorization
+
+            {output_format}"""
+
+
+def validate_question(item) -> Optional[Dict]:
+    """Normalized question dict, or None if the item can't be used in a quiz"""
+    if not isinstance(item, dict):
+        return None
+    question = item.get("question")
+    options = item.get("options")
+    answer = item.get("correct_answer")
+    if not isinstance(question, str) or not question.strip():
+        return None
+    if not isinstance(options, list) or not 2 <= len(options) <= 6:
+        return None
+    if not all(isinstance(o, (str, int, float)) and str(o).strip() for o in options):
+        return None
+    if isinstance(answer, str) and answer.strip().isdigit():
+        answer = int(answer)
+    if isinstance(answer, bool) or not isinstance(answer, int) or not 0 <= answer < len(options):
+        return None
+    return {
+        "question": question.strip(),
+        "options": [str(o).strip() for o in options],
+        "correct_answer": answer,
+        "explanation": str(item.get("explanation", "")).strip(),
+        "type": str(item.get("type") or "multiple_choice"),
+    }
+
+
+def parse_question_array(response: str) -> List[Dict]:
+    """Valid questions from an LLM response holding a JSON array (possibly wrapped in prose)"""
+    start, end = response.find("["), response.rfind("]")
+    if start == -1 or end <= start:
+        return []
+    try:
+        items = json.loads(response[start:end + 1])
+    except ValueError:
+        return []
+    if not isinstance(items, list):
+        return []
+    return [q for q in (validate_question(item) for item in items) if q]
+
+
+TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+
+
+def iter_json_lines(deltas: Iterable[str]) -> Iterator[str]:
+    """Reassemble streamed text deltas into complete, non-empty lines"""
+    buffer = ""
+    for delta in deltas:
+        buffer += delta
+        while "\n" in buffer:
+            line, buffer = buffer.split("\n", 1)
+            if line.strip():
+                yield line.strip()
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def repair_question(line: str) -> Optional[Dict]:
+    """Parse one streamed line into a valid question, fixing common model slips"""
+    text = line.strip()
+    if text.startswith("```") or text in ("[", "]"):
+        return None
+    candidates = [text]
+    text = text.lstrip("[").rstrip("]").rstrip(",").strip()
+    candidates += [text, TRAILING_COMMA_RE.sub(r"\1", text)]
+    if text.startswith("{") and not text.endswith("}"):
+        candidates.append(TRAILING_COMMA_RE.sub(r"\1", text + "}"))
+    # Curly quotes used as JSON delimiters; tried last so quotes inside valid strings survive
+    candidates += [c.replace("\u201c", '"').replace("\u201d", '"') for c in list(candidates)]
+    for candidate in candidates:
+        try:
+            question = validate_question(json.loads(candidate))
+        except ValueError:
+            continue
+        if question:
+            return question
+    return None
+
+
+class QuizBank:
+    """SQLite store of validated questions per (content hash, difficulty)"""
+
+    def __init__(self, db_path: str):
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def status(self, key: str, difficulty: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status FROM quiz_banks WHERE content_hash = ? AND difficulty = ?", (key, difficulty)
+            ).fetchone()
+        return row[0] if row else None
+
+    def claim(self, key: str, difficulty: str, min_size: int, now: Optional[float] = None) -> bool:
+        """
+        Mark (key, difficulty) as building if it needs a build: no bank yet, a
+        bank smaller than min_size, a build older than QUIZ_BANK_BUILD_TIMEOUT
+        or a failure older than QUIZ_BANK_RETRY_SECONDS. True if this caller
+        should build it; the check and the claim are one statement.
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                """INSERT INTO quiz_banks(content_hash, difficulty, status, size, updated)
+                   VALUES (?, ?, 'building', 0, ?)
+                   ON CONFLICT(content_hash, difficulty) DO UPDATE SET status = 'building', updated = excluded.updated
+                   WHERE (status = 'ready' AND size < ?)
+                      OR (status = 'building' AND updated < ?)
+                      OR (status = 'failed' AND updated < ?)""",
+                (key, difficulty, now, min_size, now - QUIZ_BANK_BUILD_TIMEOUT, now - QUIZ_BANK_RETRY_SECONDS),
+            )
+            return cursor.rowcount > 0
+
+    def set_status(self, key: str, difficulty: str, status: str, size: int = 0):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO quiz_banks(content_hash, difficulty, status, size, updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, difficulty, status, size, time.time()),
+            )
+
+    def store(self, key: str, difficulty: str, questions: List[Dict]):
+        """Replace the bank for (key, difficulty) with questions"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "DELETE FROM quiz_questions WHERE content_hash = ? AND difficulty = ?", (key, difficulty)
+            )
+            self._conn.executemany(
+                "INSERT INTO quiz_questions(content_hash, difficulty, position, question) VALUES (?, ?, ?, ?)",
+                [(key, difficulty, i, json.dumps(q)) for i, q in enumerate(questions)],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO quiz_banks(content_hash, difficulty, status, size, updated) "
+                "VALUES (?, ?, 'ready', ?, ?)",
+                (key, difficulty, len(questions), time.time()),
+            )
+            self._conn.execute("COMMIT")
+
+    def sample(self, key: str, difficulty: str, count: int,
+               rng: Optional[random.Random] = None) -> Optional[List[Dict]]:
+        """count random questions from the bank, or None if it can't supply that many"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT question FROM quiz_questions WHERE content_hash = ? AND difficulty = ?", (key, difficulty)
+            ).fetchall()
+        if len(rows) < count:
+            return None
+        return [json.loads(row[0]) for row in (rng or random).sample(rows, count)]
+
+
+class QuizBankBuilder:
+    """Fills the quiz bank in background threads"""
+
+    def __init__(self, bank: QuizBank, bank_size: int = QUIZ_BANK_SIZE, max_workers: int = QUIZ_BANK_WORKERS,
+                 min_questions: int = QUIZ_QUESTION_COUNT):
+        self.bank = bank
+        self.bank_size = bank_size
+        self.min_questions = min_questions  # a bank must fill at least one quiz
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="quiz-bank")
+        self._summarizer = None
+        self._lock = threading.Lock()
+
+    def _get_summarizer(self):
+        with self._lock:
+            if self._summarizer is None:
+                from neuro_summarizer import NeuroSummarizer
+                self._summarizer = NeuroSummarizer()
+            return self._summarizer
+
+    def schedule(self, content: str, difficulties: Optional[List[str]] = None) -> str:
+        """Queue bank builds for content; returns its content hash"""
+        key = content_hash(content)
+        for difficulty in difficulties or FLASHCARD_DIFFICULTY_LEVELS:
+            if not self.bank.claim(key, difficulty, self.min_questions):
+                continue
+            self._executor.submit(self._build, key, content, difficulty)
+        return key
+
+    def _build(self, key: str, content: str, difficulty: str):
+        try:
+            response = self._get_summarizer()._call_openai(
+                quiz_prompt(self.bank_size, difficulty), content[:QUIZ_CONTENT_CHARS], max_tokens=3000
+            )
+            questions = parse_question_array(response)
+            if len(questions) < self.min_questions:
+                raise ValueError(f"{len(questions)} valid questions in response, need {self.min_questions}")
+            self.bank.store(key, difficulty, questions)
+        except Exception as e:
+            print(f"Quiz bank build failed for {key[:12]} ({difficulty}): {e}")
+            self.bank.set_status(key, difficulty, "failed")
+
+
+_shared_bank: Optional[QuizBank] = None
+_shared_builder: Optional[QuizBankBuilder] = None
+_shared_lock = threading.Lock()
+
+
+def get_quiz_bank() -> QuizBank:
+    """Process-wide bank stored at config.QUIZ_BANK_DB"""
+    global _shared_bank
+    with _shared_lock:
+        if _shared_bank is None:
+            _shared_bank = QuizBank(QUIZ_BANK_DB)
+        return _shared_bank
+
+
+def get_quiz_bank_builder() -> QuizBankBuilder:
+    global _shared_builder
+    bank = get_quiz_bank()
+    with _shared_lock:
+        if _shared_builder is None:
+            _shared_builder = QuizBankBuilder(bank)
+        return _shared_builder
@@ -2,61 +2,112 @@ import random
 import json
 import os
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Iterator
 import streamlit as st
 from config import QUIZ_QUESTION_COUNT
 from neuro_summarizer import NeuroSummarizer
 from visual_feedback_manager import VisualFeedbackManager
+from quiz_bank import (get_quiz_bank, get_quiz_bank_builder, quiz_prompt, parse_question_array,
+                       iter_json_lines, repair_question, QUIZ_CONTENT_CHARS)
+from utils_fold.hash_utils import content_hash
+from answer_log import get_answer_log, append_jsonl, tail_jsonl, migrate_json_list_to_jsonl
+from view_cache import get_view_cache
 
 class EnhancedGamifiedQuizSystem:
     def __init__(self, user_id: str):
         self.user_id = user_id
-        self.quiz_history_file = f"user_data/{user_id}_quiz_history.json"
+        self.quiz_history_file = f"user_data/{user_id}_quiz_history.jsonl"
+        self.answer_log_file = f"user_data/{user_id}_quiz_answers.log"
         self.streak_file = f"user_data/{user_id}_streaks.json"
         self.summarizer = NeuroSummarizer()
         self.visual_feedback = VisualFeedbackManager(user_id)
+        migrate_json_list_to_jsonl(f"user_data/{user_id}_quiz_history.json", self.quiz_history_file)
 
     def generate_quiz_questions(self, content: str, difficulty: str = "Medium") -> List[Dict]:
-        """Generate quiz questions from content"""
+        """Generate quiz questions from content, sampling the precomputed bank when it is ready"""
+        key = content_hash(content)
+        banked = get_quiz_bank().sample(key, difficulty, QUIZ_QUESTION_COUNT)
+        if banked:
+            return banked
+        # Not banked yet: build it in the background for next time, generate this quiz live
+        get_quiz_bank_builder().schedule(content, [difficulty])
+
         try:
-            system_prompt = f"""Generate {QUIZ_QUESTION_COUNT} quiz questions from the provided content. 
-            Difficulty level: {difficulty}
-
-            Format each question as JSON with this structure:
-            {{
-                "question": "The question text",
-                "options": ["A", "B", "C", "D"],
-                "correct_answer": 0,
-                "explanation": "Why this answer is correct",
-                "type": "multiple_choice"
-            }}
-
-            Question types based on difficulty:
-            - Easy: Direct recall, definitions
-            - Medium: Understanding, application
-            - Hard: Analysis, synthesis, evaluation
-
-            Make questions neuro-friendly:
-            - Clear, concise language
-            - Avoid trick questions
-            - Include context when needed
-            - Focus on understanding over memorization
-
-            Return only valid JSON array of questions."""
-
-            response = self.summarizer._call_openai(system_prompt, content[:2000])
-
-            # Try to parse JSON response
-            if response.startswith('[') and response.endswith(']'):
-                questions = json.loads(response)
+            system_prompt = quiz_prompt(QUIZ_QUESTION_COUNT, difficulty)
+
+            response = self.summarizer._call_openai(system_prompt, content[:QUIZ_CONTENT_CHARS])
+
+            # Keep only well-formed questions
+            questions = parse_question_array(response)
+            if questions:
                 return questions[:QUIZ_QUESTION_COUNT]
-            else:
-                return self._generate_basic_questions(content)
+            return self._generate_basic_questions(content)
 
         except Exception as e:
             st.warning(f"Using basic question generation: {str(e)}")
             return self._generate_basic_questions(content)
 
+    def stream_quiz_questions(self, content: str, difficulty: str = "Medium",
+                              max_regenerations: int = 2) -> Iterator[Dict]:
+        """
+        Yield quiz questions one at a time as the model produces them.
+
+        The model is asked for newline-delimited JSON, and each line is parsed
+        as soon as it completes. Malformed lines are repaired where possible.
+        Otherwise a single replacement question is requested, and the basic
+        generator fills whatever is still missing at the end.
+        """
+        banked = get_quiz_bank().sample(content_hash(content), difficulty, QUIZ_QUESTION_COUNT)
+        if banked:
+            yield from banked
+            return
+        get_quiz_bank_builder().schedule(content, [difficulty])
+
+        produced: List[Dict] = []
+        seen = set()
+
+        def _accept(question) -> bool:
+            if question and question["question"] not in seen and len(produced) < QUIZ_QUESTION_COUNT:
+                seen.add(question["question"])
+                produced.append(question)
+                return True
+            return False
+
+        excerpt = content[:QUIZ_CONTENT_CHARS]
+        malformed = 0
+        try:
+            deltas = self.summarizer._stream_openai(quiz_prompt(QUIZ_QUESTION_COUNT, difficulty, ndjson=True), excerpt)
+            for line in iter_json_lines(deltas):
+                question = repair_question(line)
+                if question is None:
+                    if line.startswith("{"):
+                        malformed += 1
+                    continue
+                if _accept(question):
+                    yield question
+                if len(produced) >= QUIZ_QUESTION_COUNT:
+                    break
+        except Exception as e:
+            print(f"Quiz streaming failed, falling back: {e}")
+
+        # Regenerate missing items one by one
+        attempts = 0
+        while len(produced) < QUIZ_QUESTION_COUNT and attempts < max(malformed, 1) * max_regenerations:
+            attempts += 1
+            try:
+                response = self.summarizer._call_openai(quiz_prompt(1, difficulty), excerpt)
+            except Exception:
+                break
+            for question in parse_question_array(response):
+                if _accept(question):
+                    yield question
+
+        for question in self._generate_basic_questions(content):
+            if len(produced) >= QUIZ_QUESTION_COUNT:
+                break
+            if _accept(question):
+                yield question
+
     def _generate_basic_questions(self, content: str) -> List[Dict]:
         """Generate basic questions when AI is not available"""
         # Simple pattern-based question generation
@@ -90,8 +141,8 @@ class EnhancedGamifiedQuizSystem:
 
         return questions
 
-    def create_quiz_session(self, questions: List[Dict], content_title: str) -> str:
-        """Create a new quiz session"""
+    def create_quiz_session(self, questions: List[Dict], content_title: str, generating: bool = False) -> str:
+        """Create a new quiz session; generating=True while questions are still being streamed in"""
         session_id = f"quiz_{self.user_id}_{int(datetime.now().timestamp())}"
 
         session_data = {
@@ -102,7 +153,8 @@ class EnhancedGamifiedQuizSystem:
             "current_question": 0,
             "score": 0,
             "responses": [],
-            "completed": False
+            "completed": False,
+            "generating": generating
         }
 
         # Store in session state
@@ -125,6 +177,8 @@ class EnhancedGamifiedQuizSystem:
 
         current_q_index = session["current_question"]
         if current_q_index >= len(session["questions"]):
+            if session.get("generating"):
+                return {"error": "Next question is still being generated"}
             return {"error": "Quiz completed"}
 
         question = session["questions"][current_q_index]
@@ -153,30 +207,16 @@ class EnhancedGamifiedQuizSystem:
         }
 
         session["responses"].append(response_data)
+        get_answer_log(self.answer_log_file).append(question.get("question", ""), is_correct, response_time)
 
         if is_correct:
             session["score"] += 1
 
         session["current_question"] += 1
 
-        # Check if quiz is completed
-        if session["current_question"] >= len(session["questions"]):
-            session["completed"] = True
-            session["end_time"] = datetime.now().isoformat()
-            self._save_quiz_results(session)
-
-            # Generate completion feedback
-            final_performance = {
-                "score": session["score"],
-                "total": len(session["questions"]),
-                "completion_time": response_time
-            }
-            completion_feedback = self.visual_feedback.get_contextual_feedback(
-                "quiz_result", final_performance
-            )
-            session["completion_feedback"] = completion_feedback
-
-            self._update_streak(session["score"], len(session["questions"]))
+        # Check if quiz is completed (a streamed quiz may still be receiving questions)
+        if session["current_question"] >= len(session["questions"]) and not session.get("generating"):
+            self._complete_session(session, response_time)
 
         # Update session state
         st.session_state[f"quiz_{session_id}"] = session
@@ -191,13 +231,45 @@ class EnhancedGamifiedQuizSystem:
             "completion_feedback": session.get("completion_feedback")
         }
 
-    def _save_quiz_results(self, session: Dict):
-        """Save completed quiz results"""
-        history = []
-        if os.path.exists(self.quiz_history_file):
-            with open(self.quiz_history_file, 'r') as f:
-                history = json.load(f)
+    def _complete_session(self, session: Dict, response_time: float):
+        session["completed"] = True
+        session["end_time"] = datetime.now().isoformat()
+        self._save_quiz_results(session)
 
+        # Generate completion feedback
+        final_performance = {
+            "score": session["score"],
+            "total": len(session["questions"]),
+            "completion_time": response_time
+        }
+        completion_feedback = self.visual_feedback.get_contextual_feedback(
+            "quiz_result", final_performance
+        )
+        session["completion_feedback"] = completion_feedback
+
+        self._update_streak(session["score"], len(session["questions"]))
+        # Streak and performance dashboards are rebuilt on their next read
+        get_view_cache().invalidate(self.user_id)
+
+    def add_streamed_question(self, session_id: str, question: Dict) -> int:
+        """Append a question to a session that is still generating; returns its index"""
+        session = self.get_quiz_session(session_id)
+        session["questions"].append(question)
+        st.session_state[f"quiz_{session_id}"] = session
+        return len(session["questions"]) - 1
+
+    def finish_streamed_session(self, session_id: str):
+        """Mark generation done, completing the quiz if every question was already answered"""
+        session = self.get_quiz_session(session_id)
+        session["generating"] = False
+        if session["questions"] and session["current_question"] >= len(session["questions"]) \
+                and not session["completed"]:
+            last = session["responses"][-1]["response_time"] if session["responses"] else 0
+            self._complete_session(session, last)
+        st.session_state[f"quiz_{session_id}"] = session
+
+    def _save_quiz_results(self, session: Dict):
+        """Append completed quiz results to the JSONL history"""
         quiz_result = {
             "session_id": session["session_id"],
             "content_title": session["content_title"],
@@ -210,10 +282,7 @@ class EnhancedGamifiedQuizSystem:
             "has_visual_feedback": True
         }
 
-        history.append(quiz_result)
-
-        with open(self.quiz_history_file, 'w') as f:
-            json.dump(history, f, indent=2)
+        append_jsonl(self.quiz_history_file, quiz_result)
 
     def _update_streak(self, score: int, total: int):
         """Update user's quiz streak with visual feedback"""
@@ -275,19 +344,19 @@ class EnhancedGamifiedQuizSystem:
 
         # Add visual motivation based on streak
         if streak_data["current_streak"] >= 7:
-            motivation_visual = self.visual_feedback.create_meme_image(
+            motivation_visual = self.visual_feedback.meme_image_url(
                 "learning_streak",
                 f"🔥 {streak_data['current_streak']}-day streak!",
                 "achievement"
             )
         elif streak_data["current_streak"] >= 3:
-            motivation_visual = self.visual_feedback.create_meme_image(
+            motivation_visual = self.visual_feedback.meme_image_url(
                 "learning_streak",
                 f"Building momentum: {streak_data['current_streak']} days!",
                 "confident"
             )
         else:
-            motivation_visual = self.visual_feedback.create_meme_image(
+            motivation_visual = self.visual_feedback.meme_image_url(
                 "study_motivation",
                 "Ready to start your streak?",
                 "learning"
@@ -298,11 +367,7 @@ class EnhancedGamifiedQuizSystem:
 
     def get_quiz_history(self, limit: int = 10) -> List[Dict]:
         """Get recent quiz history"""
-        if os.path.exists(self.quiz_history_file):
-            with open(self.quiz_history_file, 'r') as f:
-                history = json.load(f)
-                return history[-limit:]
-        return []
+        return tail_jsonl(self.quiz_history_file, limit)
 
     def get_performance_analytics(self) -> Dict:
         """Get performance analytics with visual insights"""
@@ -314,7 +379,7 @@ class EnhancedGamifiedQuizSystem:
                 "avg_response_time": 0,
                 "improvement_trend": "No data",
                 "total_quizzes": 0,
-                "progress_visual": self.visual_feedback.create_meme_image(
+                "progress_visual": self.visual_feedback.meme_image_url(
                     "study_motivation", "Start your learning journey!", "learning"
                 )
             }
@@ -336,7 +401,7 @@ class EnhancedGamifiedQuizSystem:
             "mastered_concepts": int(avg_accuracy * 20),
             "accuracy": avg_accuracy
         }
-        progress_visual = self.visual_feedback.create_progress_visualization(progress_data)
+        progress_visual = self.visual_feedback.progress_visualization_url(progress_data)
 
         return {
             "avg_accuracy": avg_accuracy,
@@ -0,0 +1,57 @@
+"""
+Feedback Image Renderer Benchmarks
+Run with: python render_benchmark.py
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from feedback_catalog import CATALOG_ENTRIES
+from visual_feedback_manager import RENDERERS
+
+
+def bench_cards(rounds: int = 3):
+    print("\n🖼️  Meme/badge cards (all catalog entries)")
+    for name, renderers in RENDERERS.items():
+        render_card = renderers["meme"]
+        render_card(*CATALOG_ENTRIES[0])  # warm fonts and backgrounds
+        start = time.perf_counter()
+        total_bytes = 0
+        for _ in range(rounds):
+            for category, text, mood in CATALOG_ENTRIES:
+                total_bytes += len(render_card(category, text, mood))
+        count = rounds * len(CATALOG_ENTRIES)
+        elapsed = time.perf_counter() - start
+        print(f"   {name:10s} {elapsed / count * 1000:7.2f} ms/card, {total_bytes // count // 1024} KiB avg")
+
+
+def bench_progress(steps: int = 50):
+    print("\n📊 Progress bars")
+    for name, renderers in RENDERERS.items():
+        render_progress = renderers["progress"]
+        render_progress(0.0)
+        start = time.perf_counter()
+        for i in range(steps):
+            render_progress(i / steps)
+        elapsed = time.perf_counter() - start
+        print(f"   {name:10s} {elapsed / steps * 1000:7.2f} ms/bar")
+
+
+def bench_concurrent(workers: int = 8, per_worker: int = 10):
+    print(f"\n🧵 Concurrent cards ({workers} threads)")
+    jobs = [CATALOG_ENTRIES[i % len(CATALOG_ENTRIES)] for i in range(workers * per_worker)]
+    for name, renderers in RENDERERS.items():
+        render_card = renderers["meme"]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(lambda job: render_card(*job), jobs))
+        elapsed = time.perf_counter() - start
+        assert all(png.startswith(b"\x89PNG") for png in results)
+        print(f"   {name:10s} {elapsed * 1000:8.1f} ms for {len(jobs)} cards")
+
+
+if __name__ == "__main__":
+    print("=== Feedback Renderer Benchmarks ===")
+    bench_cards()
+    bench_progress()
+    bench_concurrent()
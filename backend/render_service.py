@@ -0,0 +1,264 @@
+"""
+Process pool for rendering charts, progress bars and feedback cards.
+
+Rendering is CPU-bound and holds the GIL for the whole draw, so doing it in
+the API process makes a burst of dashboard requests slow down every other
+endpoint. Renders are sent to worker processes instead: callers wait a
+bounded time for an idle worker, and once a worker picks a job up the render
+gets its own time limit (a worker that misses it is replaced; a request that
+never got a worker just fails, leaving the pool alone). Results are memoized
+by a hash of the render inputs in the image store, so the same chart is only
+ever drawn once. Identical renders that arrive while one is in flight wait for
+it rather than drawing it again.
+"""
+
+import json
+import time
+import queue
+import atexit
+import threading
+import multiprocessing as mp
+from typing import Dict, List, Optional
+
+from config import FEEDBACK_RENDERER, RENDER_WORKER_COUNT, RENDER_JOB_TIMEOUT, RENDER_QUEUE_TIMEOUT
+from image_store import ImageStore, get_image_store
+from utils_fold.hash_utils import content_hash
+from utils_fold.process_utils import start_pool_worker, in_pool_worker
+
+
+def _worker_main(conn):
+    """Worker process: import the renderers once and serve jobs sent over conn"""
+    try:
+        from visual_feedback_manager import render_png
+        conn.send(("ready", None))
+    except Exception as e:
+        conn.send(("error", f"Render worker setup error: {e}"))
+        return
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        kind = message[0]
+        if kind == "stop":
+            break
+        if kind == "ping":
+            conn.send(("pong", None))
+        elif kind == "render":
+            _, image_kind, args, renderer = message
+            try:
+                conn.send(("done", render_png(image_kind, args, renderer)))
+            except Exception as e:
+                conn.send(("error", str(e)))
+
+
+class _Worker:
+    """Parent-side handle for one render process"""
+
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        start_pool_worker(self.process)
+        child_conn.close()
+
+    def wait_ready(self, timeout: float) -> bool:
+        reply = self._receive(timeout)
+        if reply and reply[0] == "ready":
+            return True
+        if reply:
+            print(reply[1])
+        return False
+
+    def request(self, message: tuple, timeout: float) -> Optional[tuple]:
+        """Send a message and wait for the reply; None means timeout or a dead worker"""
+        try:
+            self.conn.send(message)
+        except (BrokenPipeError, OSError):
+            return None
+        return self._receive(timeout)
+
+    def _receive(self, timeout: float) -> Optional[tuple]:
+        try:
+            if self.conn.poll(max(timeout, 0)):
+                return self.conn.recv()
+        except (EOFError, OSError):
+            pass
+        return None
+
+    def kill(self):
+        try:
+            self.conn.send(("stop",))
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=1)
+        self.conn.close()
+
+
+def render_key(kind: str, args: tuple, renderer: str) -> str:
+    """Memoization key for a render: everything that determines its pixels"""
+    return content_hash("render", kind, renderer, json.dumps(args, sort_keys=True, default=str))
+
+
+class RenderService:
+    """Renders images in worker processes and stores them in the image store"""
+
+    def __init__(self, store: ImageStore, num_workers: int = RENDER_WORKER_COUNT,
+                 job_timeout: float = RENDER_JOB_TIMEOUT, queue_timeout: float = RENDER_QUEUE_TIMEOUT,
+                 startup_timeout: float = 30, use_processes: bool = True):
+        self.store = store
+        self.num_workers = max(1, num_workers)
+        self.job_timeout = job_timeout
+        self.queue_timeout = queue_timeout
+        self.startup_timeout = startup_timeout
+        self.use_processes = use_processes
+        self._ctx = mp.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: List[_Worker] = []
+        self._inflight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._starting = threading.Event()
+        self._closed = threading.Event()
+
+    # -------------------------
+    # Pool lifecycle
+    # -------------------------
+    def start(self) -> threading.Thread:
+        """Start the workers in the background; renders queue until the first one is ready"""
+        self._starting.set()
+        thread = threading.Thread(target=self._start_workers, daemon=True, name="render-pool-start")
+        thread.start()
+        return thread
+
+    def _start_workers(self):
+        try:
+            # Start every process first so their imports overlap
+            starting = [_Worker(self._ctx) for _ in range(self.num_workers)]
+            for worker in starting:
+                if worker.wait_ready(self.startup_timeout) and not self._closed.is_set():
+                    with self._lock:
+                        self._workers.append(worker)
+                    self._idle.put(worker)
+                else:
+                    worker.kill()
+            if not self._workers:
+                print("Render pool: no worker started, rendering in-process")
+        finally:
+            self._starting.clear()
+
+    @property
+    def pooled(self) -> bool:
+        """True when renders go to worker processes (or will, once startup finishes)"""
+        return self.use_processes and not self._closed.is_set() and bool(self._workers or self._starting.is_set())
+
+    def _replace(self, worker: _Worker):
+        """Kill a worker that hung or died and start a fresh one in its place"""
+        worker.kill()
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        if self._closed.is_set():
+            return
+
+        fresh = _Worker(self._ctx)
+        if not fresh.wait_ready(self.startup_timeout):
+            fresh.kill()
+            print("Render pool: could not restart worker")
+            return
+        with self._lock:
+            self._workers.append(fresh)
+        self._idle.put(fresh)
+
+    def shutdown(self):
+        self._closed.set()
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.kill()
+
+    # -------------------------
+    # Rendering
+    # -------------------------
+    def _render(self, kind: str, args: tuple, renderer: str, queue_timeout: float) -> bytes:
+        if not self.pooled:
+            from visual_feedback_manager import render_png
+            return render_png(kind, args, renderer)
+
+        try:
+            # Requests queue here until a worker is free; giving up costs no worker
+            worker = self._idle.get(timeout=max(queue_timeout, 0))
+        except queue.Empty:
+            print(f"Render pool: no worker became available for '{kind}' in time")
+            return b""
+
+        # The render budget starts now, whatever time was spent queueing
+        reply = worker.request(("render", kind, args, renderer), self.job_timeout)
+        if reply is None:
+            print(f"Render pool: '{kind}' render timed out, restarting worker")
+            threading.Thread(target=self._replace, args=(worker,), daemon=True).start()
+            return b""
+
+        self._idle.put(worker)
+        if reply[0] == "error":
+            print(f"Render pool job error: {reply[1]}")
+            return b""
+        return reply[1]
+
+    def render_url(self, kind: str, args: tuple, renderer: Optional[str] = None,
+                   timeout: Optional[float] = None) -> Optional[str]:
+        """
+        /api/images URL for kind rendered from args; None if the render failed or
+        timed out. timeout bounds the wait for a free worker (queue_timeout by
+        default); the render itself then has job_timeout.
+        """
+        renderer = renderer or FEEDBACK_RENDERER
+        key = render_key(kind, args, renderer)
+        digest = self.store.lookup(key)
+        if digest:
+            return self.store.url(digest)
+
+        queue_timeout = self.queue_timeout if timeout is None else timeout
+        deadline = time.monotonic() + queue_timeout + self.job_timeout
+        with self._lock:
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = self._inflight[key] = threading.Event()
+        if not owner:
+            event.wait(max(deadline - time.monotonic(), 0))
+            digest = self.store.lookup(key)
+            return self.store.url(digest) if digest else None
+
+        try:
+            png = self._render(kind, args, renderer, queue_timeout)
+            if not png:
+                return None
+            digest = self.store.put(png)
+            self.store.remember(key, digest)
+            return self.store.url(digest)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+
+_shared_service: Optional[RenderService] = None
+_shared_service_lock = threading.Lock()
+
+
+def get_render_service() -> RenderService:
+    """Process-wide render service; its worker pool starts on first use"""
+    global _shared_service
+    with _shared_service_lock:
+        if _shared_service is None:
+            # Spawned workers re-import the parent's main module; never nest pools
+            in_child = in_pool_worker()
+            _shared_service = RenderService(get_image_store(), use_processes=not in_child)
+            if not in_child:
+                _shared_service.start()
+                atexit.register(_shared_service.shutdown)
+        return _shared_service
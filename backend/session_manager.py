@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import streamlit as st
 from config import MOOD_OPTIONS, DEFAULT_USER_ID
+from learning_stats import get_learning_stats
 
 
 class SessionManager:
@@ -12,6 +13,8 @@ class SessionManager:
         self.user_id = user_id
         self.session_file = f"user_data/{user_id}_sessions.json"
         self.mood_file = f"user_data/{user_id}_mood_history.json"
+        self.stats = get_learning_stats()
+        self.stats.import_legacy(user_id, self.session_file, self.mood_file)
         self.current_session = None
 
     def start_new_session(self, content_type: str, content_title: str) -> str:
@@ -66,6 +69,7 @@ class SessionManager:
 
         # Save to mood history
         self._save_mood_history(mood_data)
+        self.stats.record_mood(self.user_id, mood_data)
 
         return True
 
@@ -101,6 +105,7 @@ class SessionManager:
 
         # Save session
         self._save_session()
+        self.stats.record_session(self.user_id, self.current_session)
         self.current_session = None
 
     def _save_session(self):
@@ -151,10 +156,8 @@ class SessionManager:
 
     def get_learning_analytics(self) -> Dict:
         """Get comprehensive learning analytics"""
-        sessions = self.get_session_history(30)
-        moods = self.get_mood_history(30)
-
-        if not sessions:
+        analytics = self.stats.window(self.user_id, 30)
+        if not analytics["total_sessions"]:
             return {
                 "total_sessions": 0,
                 "total_time": 0,
@@ -165,40 +168,8 @@ class SessionManager:
                 "activity_breakdown": {}
             }
 
-        # Calculate session analytics
-        total_sessions = len(sessions)
-        completed_sessions = [s for s in sessions if s["completed"]]
-        total_time = sum(s["total_time"] for s in completed_sessions)
-        avg_session_time = total_time / len(completed_sessions) if completed_sessions else 0
-        completion_rate = len(completed_sessions) / total_sessions if total_sessions > 0 else 0
-
-        # Understanding level analysis
-        understanding_levels = [s["understanding_level"] for s in completed_sessions if s["understanding_level"]]
-        avg_understanding = sum(understanding_levels) / len(understanding_levels) if understanding_levels else 0
-
-        # Mood analysis
-        mood_counts = {}
-        for mood in moods:
-            mood_name = mood["mood_name"]
-            mood_counts[mood_name] = mood_counts.get(mood_name, 0) + 1
-
-        # Activity breakdown
-        activity_counts = {}
-        for session in sessions:
-            for activity in session["activities"]:
-                activity_type = activity["type"]
-                activity_counts[activity_type] = activity_counts.get(activity_type, 0) + 1
-
-        return {
-            "total_sessions": total_sessions,
-            "total_time": total_time,
-            "avg_session_time": avg_session_time,
-            "completion_rate": completion_rate,
-            "avg_understanding": avg_understanding,
-            "mood_trends": mood_counts,
-            "activity_breakdown": activity_counts,
-            "recent_sessions": sessions[-5:] if sessions else []
-        }
+        analytics["recent_sessions"] = self.stats.recent_sessions(self.user_id, 30)
+        return analytics
 
     def get_streak_data(self) -> Dict:
         """Calculate learning streaks"""
@@ -253,7 +224,7 @@ class SessionManager:
 
     def suggest_next_activity(self) -> str:
         """Suggest next learning activity based on history"""
-        analytics = self.get_learning_analytics()
+        analytics = self.stats.window(self.user_id, 30)
 
         if analytics["total_sessions"] == 0:
             return "🌟 Start your learning journey by uploading some content!"
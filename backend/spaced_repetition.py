@@ -0,0 +1,215 @@
+"""
+SM-2 spaced-repetition scheduler for flashcards.
+
+Per-card state (ease, interval, repetitions, due time) lives in one SQLite
+table with a (user_id, due) index, so "next N due cards" is an index range
+scan - O(log n + N) - no matter how many cards a user has collected. Card
+totals are kept in a per-user counter rather than counted per request.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from config import SRS_DB
+from utils_fold.hash_utils import content_hash
+
+DAY_SECONDS = 24 * 3600
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cards (
+    user_id TEXT NOT NULL,
+    card_id TEXT NOT NULL,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    type TEXT,
+    difficulty TEXT,
+    ease REAL NOT NULL DEFAULT 2.5,
+    interval_days REAL NOT NULL DEFAULT 0,
+    repetitions INTEGER NOT NULL DEFAULT 0,
+    lapses INTEGER NOT NULL DEFAULT 0,
+    due REAL NOT NULL,
+    last_review REAL,
+    PRIMARY KEY (user_id, card_id)
+);
+CREATE INDEX IF NOT EXISTS idx_cards_due ON cards(user_id, due);
+CREATE TABLE IF NOT EXISTS card_totals (
+    user_id TEXT PRIMARY KEY,
+    cards INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+ADD_TO_TOTAL = """
+INSERT INTO card_totals(user_id, cards) VALUES (?, ?)
+ON CONFLICT(user_id) DO UPDATE SET cards = cards + excluded.cards
+"""
+
+CARD_COLUMNS = "card_id, question, answer, type, difficulty, ease, interval_days, repetitions, lapses, due, last_review"
+
+
+def card_id_for(flashcard: Dict) -> str:
+    """Stable id for a card, derived from its question and answer"""
+    return content_hash(flashcard.get("question", ""), flashcard.get("answer", ""))[:32]
+
+
+def quality_from_answer(correct: bool, response_time: float) -> int:
+    """Map a flashcard answer onto SM-2's 0-5 recall quality"""
+    if not correct:
+        return 1
+    if response_time < 5:
+        return 5
+    if response_time < 15:
+        return 4
+    return 3
+
+
+def sm2(ease: float, interval_days: float, repetitions: int, quality: int):
+    """One SM-2 step; returns (ease, interval_days, repetitions)"""
+    if quality < 3:
+        repetitions, interval_days = 0, 1
+    else:
+        if repetitions == 0:
+            interval_days = 1
+        elif repetitions == 1:
+            interval_days = 6
+        else:
+            interval_days = round(interval_days * ease)
+        repetitions += 1
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return ease, interval_days, repetitions
+
+
+class SpacedRepetitionScheduler:
+    """Stores SM-2 state per (user, card) and serves due cards in due order"""
+
+    def __init__(self, db_path: str):
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        has_totals = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'card_totals'"
+        ).fetchone()
+        self._conn.executescript(SCHEMA)
+        if not has_totals:
+            # Databases from before the counters existed: count once
+            self._conn.execute("INSERT OR IGNORE INTO card_totals(user_id, cards) "
+                               "SELECT user_id, COUNT(*) FROM cards GROUP BY user_id")
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _row_to_card(row) -> Dict:
+        return dict(zip([c.strip() for c in CARD_COLUMNS.split(",")], row))
+
+    def add_cards(self, user_id: str, flashcards: List[Dict], now: Optional[float] = None) -> int:
+        """Enroll cards (due immediately); cards already scheduled keep their state"""
+        if now is None:
+            now = time.time()
+        rows = [
+            (user_id, card_id_for(c), c.get("question", ""), c.get("answer", ""),
+             c.get("type", ""), c.get("difficulty", ""), INITIAL_EASE, now)
+            for c in flashcards
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            cursor = self._conn.executemany(
+                """INSERT OR IGNORE INTO cards(user_id, card_id, question, answer, type, difficulty, ease, due)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                rows,
+            )
+            added = max(cursor.rowcount, 0)
+            if added:
+                self._conn.execute(ADD_TO_TOTAL, (user_id, added))
+            self._conn.execute("COMMIT")
+            return added
+
+    def review(self, user_id: str, flashcard: Dict, quality: int, now: Optional[float] = None) -> Dict:
+        """Apply one review with SM-2 quality 0-5 and return the card's new state"""
+        if now is None:
+            now = time.time()
+        quality = max(0, min(5, int(quality)))
+        card_id = flashcard.get("card_id") or card_id_for(flashcard)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                row = self._conn.execute(
+                    "SELECT ease, interval_days, repetitions, lapses FROM cards "
+                    "WHERE user_id = ? AND card_id = ?",
+                    (user_id, card_id),
+                ).fetchone()
+                if row is None:
+                    ease, interval_days, repetitions, lapses = INITIAL_EASE, 0, 0, 0
+                    self._conn.execute(ADD_TO_TOTAL, (user_id, 1))
+                else:
+                    ease, interval_days, repetitions, lapses = row
+
+                ease, interval_days, repetitions = sm2(ease, interval_days, repetitions, quality)
+                if quality < 3:
+                    lapses += 1
+                due = now + interval_days * DAY_SECONDS
+
+                self._conn.execute(
+                    """INSERT INTO cards(user_id, card_id, question, answer, type, difficulty,
+                                         ease, interval_days, repetitions, lapses, due, last_review)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT(user_id, card_id) DO UPDATE SET
+                           ease = excluded.ease, interval_days = excluded.interval_days,
+                           repetitions = excluded.repetitions, lapses = excluded.lapses,
+                           due = excluded.due, last_review = excluded.last_review""",
+                    (user_id, card_id, flashcard.get("question", ""), flashcard.get("answer", ""),
+                     flashcard.get("type", ""), flashcard.get("difficulty", ""),
+                     ease, interval_days, repetitions, lapses, due, now),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return {"card_id": card_id, "ease": ease, "interval_days": interval_days,
+                "repetitions": repetitions, "lapses": lapses, "due": due}
+
+    def record_answer(self, user_id: str, flashcard: Dict, correct: bool, response_time: float) -> Dict:
+        return self.review(user_id, flashcard, quality_from_answer(correct, response_time))
+
+    def due_cards(self, user_id: str, limit: int = 20, now: Optional[float] = None) -> List[Dict]:
+        """The next cards due for review, most overdue first"""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {CARD_COLUMNS} FROM cards WHERE user_id = ? AND due <= ? ORDER BY due LIMIT ?",
+                (user_id, now, limit),
+            ).fetchall()
+        return [self._row_to_card(row) for row in rows]
+
+    def stats(self, user_id: str, now: Optional[float] = None) -> Dict:
+        """Card total (from the counter) and due counts (index range scans only)"""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT cards FROM card_totals WHERE user_id = ?", (user_id,)).fetchone()
+            total = row[0] if row else 0
+            due = self._conn.execute(
+                "SELECT COUNT(*) FROM cards WHERE user_id = ? AND due <= ?", (user_id, now)
+            ).fetchone()[0]
+            next_row = self._conn.execute(
+                "SELECT due FROM cards WHERE user_id = ? AND due > ? ORDER BY due LIMIT 1", (user_id, now)
+            ).fetchone()
+        return {"total_cards": total, "due_now": due, "next_due": next_row[0] if next_row else None}
+
+
+_shared_scheduler: Optional[SpacedRepetitionScheduler] = None
+_shared_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> SpacedRepetitionScheduler:
+    """Process-wide scheduler stored at config.SRS_DB"""
+    global _shared_scheduler
+    with _shared_scheduler_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = SpacedRepetitionScheduler(SRS_DB)
+        return _shared_scheduler
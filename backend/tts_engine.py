@@ -1,36 +1,39 @@
-import pyttsx3
 import os
 import tempfile
 import base64
-from typing import Dict, Optional
+from typing import Dict, Optional, List
 from gtts import gTTS
 import soundfile as sf
 import numpy as np
+from audio_cache import AudioCache
+from tts_worker_pool import TTSWorkerPool, get_shared_pool
+from tts_streaming import ProgressiveTTS, ProgressiveSynthesisJob
+from config import AUDIO_DIR, TTS_RATE, TTS_WORKER_COUNT, TTS_JOB_TIMEOUT
+
+GTTS_LANG = "en"
 
 
 class NeuroTTSEngine:
-    def _init_(self):
-        self.tts_engine = None
+    def __init__(self):
+        self.worker_pool: Optional[TTSWorkerPool] = None
+        self.voice_id = "default"
+        self.cache = AudioCache(AUDIO_DIR)
         self.setup_engine()
+        # gTTS segments are network-bound, so allow a few more threads than local workers
+        self.progressive = ProgressiveTTS(self, self.cache, max_workers=max(TTS_WORKER_COUNT, 4))
 
     def setup_engine(self):
-        """Initialize TTS engine"""
+        """Attach to the local TTS worker pool (one pyttsx3 engine per process)"""
         try:
-            self.tts_engine = pyttsx3.init()
-            # Set voice properties for neuro-friendly speech
-            self.tts_engine.setProperty('rate', 120)  # Slower speech
-            self.tts_engine.setProperty('volume', 0.8)
-
-            # Try to set a pleasant voice
-            voices = self.tts_engine.getProperty('voices')
-            if voices:
-                for voice in voices:
-                    if 'female' in voice.name.lower() or 'zira' in voice.name.lower():
-                        self.tts_engine.setProperty('voice', voice.id)
-                        break
+            pool = get_shared_pool(TTS_WORKER_COUNT, TTS_RATE, TTS_JOB_TIMEOUT)
+            if pool is not None and pool.available:
+                self.worker_pool = pool
+                self.voice_id = pool.voice_id
+            else:
+                print("TTS Engine setup error: no local TTS workers started, using gTTS")
         except Exception as e:
             print(f"TTS Engine setup error: {e}")
-            self.tts_engine = None
+            self.worker_pool = None
 
     def create_summary_audio(self, summaries: Dict, summary_type: str) -> Optional[str]:
         """Create audio for summary content"""
@@ -40,40 +43,76 @@ class NeuroTTSEngine:
         text = summaries[summary_type]
         return self.text_to_speech(text, f"summary_{summary_type}")
 
+    def _engine_order(self) -> List[str]:
+        """Engines to try, preferred first"""
+        if self.worker_pool is not None and self.worker_pool.available:
+            return ["pyttsx3", "gtts"]
+        return ["gtts"]
+
+    def _cache_key(self, text: str, engine: str) -> str:
+        if engine == "pyttsx3":
+            return AudioCache.make_key(text, self.voice_id, TTS_RATE, engine)
+        return AudioCache.make_key(text, GTTS_LANG, "slow", engine)
+
     def text_to_speech(self, text: str, filename: str = "output") -> Optional[str]:
-        """Convert text to speech and return audio file path"""
-        try:
-            # Create audio directory if it doesn't exist
-            os.makedirs("audio", exist_ok=True)
+        """Convert text to speech and return audio file path.
 
-            # Use gTTS as fallback if pyttsx3 fails
-            if self.tts_engine is None:
-                return self._create_gtts_audio(text, filename)
+        Files are named after hash(text, voice, rate, engine), so a replay of the
+        same text is a cache lookup and concurrent requests never share a file.
+        ``filename`` only labels the request in logs.
+        """
+        for engine in self._engine_order():
+            cached = self.cache.get(self._cache_key(text, engine))
+            if cached:
+                return cached
 
-            # Use pyttsx3 for local TTS
-            audio_path = f"audio/{filename}.wav"
-            self.tts_engine.save_to_file(text, audio_path)
-            self.tts_engine.runAndWait()
+        try:
+            # Use gTTS as fallback if the local workers are unavailable
+            if "pyttsx3" not in self._engine_order():
+                return self._create_gtts_audio(text, filename)
 
-            if os.path.exists(audio_path):
-                return audio_path
+            # Use a pyttsx3 worker process for local TTS
+            key = self._cache_key(text, "pyttsx3")
+            tmp_path = self.cache.temp_path(key, ".wav")
+            if self.worker_pool.synthesize(text, tmp_path):
+                return self.cache.put(key, tmp_path, ".wav")
             else:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
                 return self._create_gtts_audio(text, filename)
 
         except Exception as e:
-            print(f"TTS Error: {e}")
+            print(f"TTS Error ({filename}): {e}")
             return self._create_gtts_audio(text, filename)
 
     def _create_gtts_audio(self, text: str, filename: str) -> Optional[str]:
         """Create audio using Google TTS as fallback"""
+        key = self._cache_key(text, "gtts")
+        tmp_path = self.cache.temp_path(key, ".mp3")
         try:
-            tts = gTTS(text=text, lang='en', slow=True)  # Slower for neuro-friendly
-            audio_path = f"audio/{filename}.mp3"
-            tts.save(audio_path)
-            return audio_path
+            tts = gTTS(text=text, lang=GTTS_LANG, slow=True)  # Slower for neuro-friendly
+            tts.save(tmp_path)
+            return self.cache.put(key, tmp_path, ".mp3")
         except Exception as e:
-            print(f"gTTS Error: {e}")
+            print(f"gTTS Error ({filename}): {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+
+    def start_progressive_audio(self, text: str) -> Optional[Dict]:
+        """Split text into sentence segments, synthesize them in parallel and
+        return the segment list immediately so playback can start on segment 0"""
+        if not text or not text.strip():
             return None
+        job = self.progressive.start(text)
+        return self.progressive.describe(job)
+
+    def get_progressive_job(self, job_id: str) -> Optional[ProgressiveSynthesisJob]:
+        return self.progressive.get(job_id)
+
+    def create_audio_file(self, text: str) -> Optional[str]:
+        """Create audio for arbitrary text"""
+        return self.text_to_speech(text, "audio")
 
     def create_focus_session_audio(self, content: str, session_type: str) -> Optional[str]:
         """Create audio for focus sessions"""
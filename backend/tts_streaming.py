@@ -0,0 +1,250 @@
+"""
+Sentence-parallel synthesis with progressive delivery for long summaries.
+
+Text is split at sentence boundaries, every segment is synthesized (and
+cached) on its own, and clients can start playing segment 0 while the rest
+are still rendering - either by walking the segment list or by reading the
+chunked stream. Once every segment is ready they are joined into a single
+cached file for later replays.
+"""
+
+import os
+import re
+import struct
+import wave
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, List, Optional, Iterator
+
+from audio_cache import AudioCache
+from utils_fold.hash_utils import content_hash
+
+SENTENCE_BOUNDARY_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+FIRST_SEGMENT_MAX_CHARS = 120  # keep segment 0 short so playback starts quickly
+SEGMENT_MAX_CHARS = 400
+STREAM_CHUNK_SIZE = 64 * 1024
+MAX_TRACKED_JOBS = 64
+
+MEDIA_TYPES = {".mp3": "audio/mpeg", ".wav": "audio/wav"}
+
+
+def split_into_segments(text: str, first_max_chars: int = FIRST_SEGMENT_MAX_CHARS,
+                        max_chars: int = SEGMENT_MAX_CHARS) -> List[str]:
+    """Split text at sentence boundaries into segments of bounded length"""
+    sentences = [s.strip() for s in SENTENCE_BOUNDARY_RE.split(text) if s and s.strip()]
+    segments: List[str] = []
+    current = ""
+
+    for sentence in sentences:
+        limit = first_max_chars if not segments else max_chars
+        if current and len(current) + len(sentence) + 1 > limit:
+            segments.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+
+    if current:
+        segments.append(current)
+    return segments
+
+
+def _streaming_wav_header(channels: int, sample_width: int, frame_rate: int) -> bytes:
+    """RIFF header with maximal sizes, for a wav stream whose length is unknown"""
+    unknown = 0xFFFFFFFF
+    byte_rate = frame_rate * channels * sample_width
+    return (
+        b"RIFF" + struct.pack("<I", unknown) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, channels, frame_rate,
+                                byte_rate, channels * sample_width, sample_width * 8)
+        + b"data" + struct.pack("<I", unknown)
+    )
+
+
+class ProgressiveSynthesisJob:
+    """Segments of one text being synthesized in parallel"""
+
+    def __init__(self, job_id: str, text: str, segments: List[str], futures: List[Future], cache: AudioCache):
+        self.job_id = job_id
+        self.cache = cache
+        self.text = text
+        self.segments = segments
+        self.futures = futures
+        self.assembled_path: Optional[str] = None
+
+    def segment_path(self, index: int, timeout: Optional[float] = None) -> Optional[str]:
+        """Wait for one segment and return its audio file (None if synthesis failed)"""
+        return self.futures[index].result(timeout=timeout)
+
+    def ready_count(self) -> int:
+        return sum(1 for f in self.futures if f.done())
+
+    def is_done(self) -> bool:
+        return all(f.done() for f in self.futures)
+
+    def media_type(self, timeout: Optional[float] = None) -> str:
+        first = self.segment_path(0, timeout) if self.futures else None
+        ext = os.path.splitext(first)[1] if first else ".mp3"
+        return MEDIA_TYPES.get(ext, "application/octet-stream")
+
+    def iter_stream(self, timeout: Optional[float] = None) -> Iterator[bytes]:
+        """Yield one continuous audio stream, segment by segment, as they finish"""
+        stream_ext = None
+        for index in range(len(self.futures)):
+            path = self.segment_path(index, timeout)
+            if not path:
+                print(f"Progressive TTS {self.job_id}: segment {index} failed, skipping")
+                continue
+
+            ext = os.path.splitext(path)[1]
+            first = stream_ext is None
+            if first:
+                stream_ext = ext
+            elif ext != stream_ext:
+                # A segment fell back to another engine; it can't be spliced into this stream
+                print(f"Progressive TTS {self.job_id}: segment {index} is {ext}, stream is {stream_ext}")
+                continue
+
+            self.cache.pin(path)
+            try:
+                if ext == ".wav":
+                    with wave.open(path, "rb") as wav:
+                        yield from self._wav_chunks(wav, first)
+                else:
+                    with open(path, "rb") as f:
+                        while True:
+                            chunk = f.read(STREAM_CHUNK_SIZE)
+                            if not chunk:
+                                break
+                            yield chunk
+            finally:
+                self.cache.unpin(path)
+
+    @staticmethod
+    def _wav_chunks(wav: wave.Wave_read, first: bool) -> Iterator[bytes]:
+        if first:
+            yield _streaming_wav_header(wav.getnchannels(), wav.getsampwidth(), wav.getframerate())
+        frames_per_chunk = max(1, STREAM_CHUNK_SIZE // (wav.getnchannels() * wav.getsampwidth()))
+        while True:
+            frames = wav.readframes(frames_per_chunk)
+            if not frames:
+                break
+            yield frames
+
+
+class ProgressiveTTS:
+    """Runs sentence-parallel synthesis jobs on top of a NeuroTTSEngine"""
+
+    def __init__(self, tts_engine, cache: AudioCache, max_workers: int):
+        self.tts_engine = tts_engine
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts-segment")
+        self._jobs: "OrderedDict[str, ProgressiveSynthesisJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _assembled_key(self, text: str) -> str:
+        return AudioCache.make_key(text, self.tts_engine.voice_id, "segments", "assembled")
+
+    def cached_full_audio(self, text: str) -> Optional[str]:
+        """Previously assembled audio for the whole text, if any"""
+        return self.cache.get(self._assembled_key(text))
+
+    def start(self, text: str) -> ProgressiveSynthesisJob:
+        """Start (or reuse) a job for text; segment 0 is always submitted first"""
+        job_id = content_hash(text, self.tts_engine.voice_id)[:32]
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._jobs.move_to_end(job_id)
+                return job
+
+            segments = split_into_segments(text)
+            futures = [
+                self._executor.submit(self.tts_engine.text_to_speech, segment, f"segment_{i}")
+                for i, segment in enumerate(segments)
+            ]
+            job = ProgressiveSynthesisJob(job_id, text, segments, futures, self.cache)
+            job.assembled_path = self.cached_full_audio(text)
+            self._jobs[job_id] = job
+            while len(self._jobs) > MAX_TRACKED_JOBS:
+                self._jobs.popitem(last=False)
+
+        if job.assembled_path is None and futures:
+            self._assemble_when_done(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[ProgressiveSynthesisJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _assemble_when_done(self, job: ProgressiveSynthesisJob):
+        """Assemble from the callback of whichever segment finishes last"""
+        remaining = [len(job.futures)]
+        lock = threading.Lock()
+
+        def _segment_done(_future):
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self._assemble(job)
+
+        for future in job.futures:
+            future.add_done_callback(_segment_done)
+
+    def _assemble(self, job: ProgressiveSynthesisJob):
+        """Join finished segments into one cached file"""
+        paths = [f.result() if not f.exception() else None for f in job.futures]
+        if not all(paths):
+            return
+        exts = {os.path.splitext(p)[1] for p in paths}
+        if len(exts) != 1:
+            return  # mixed engines - segment playback still works
+        ext = exts.pop()
+
+        key = self._assembled_key(job.text)
+        tmp_path = self.cache.temp_path(key, ext)
+        try:
+            if ext == ".wav":
+                self._join_wav(paths, tmp_path)
+            else:
+                # MPEG audio frames are self-delimiting, so files can be concatenated
+                with open(tmp_path, "wb") as out:
+                    for path in paths:
+                        with open(path, "rb") as f:
+                            while True:
+                                chunk = f.read(STREAM_CHUNK_SIZE)
+                                if not chunk:
+                                    break
+                                out.write(chunk)
+            job.assembled_path = self.cache.put(key, tmp_path, ext)
+        except Exception as e:
+            print(f"Progressive TTS assembly error for {job.job_id}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def _join_wav(paths: List[str], out_path: str):
+        with wave.open(paths[0], "rb") as first:
+            params = first.getparams()
+        with wave.open(out_path, "wb") as out:
+            out.setparams(params)
+            for path in paths:
+                with wave.open(path, "rb") as wav:
+                    if wav.getparams()[:3] != params[:3]:
+                        raise ValueError(f"incompatible wav format in {path}")
+                    out.writeframes(wav.readframes(wav.getnframes()))
+
+    def describe(self, job: ProgressiveSynthesisJob) -> Dict:
+        """JSON-friendly segment list for a job"""
+        return {
+            "job_id": job.job_id,
+            "segments": [
+                {"index": i, "text": segment, "url": f"/api/tts/segments/{job.job_id}/{i}", "ready": f.done()}
+                for i, (segment, f) in enumerate(zip(job.segments, job.futures))
+            ],
+            "ready_segments": job.ready_count(),
+            "total_segments": len(job.segments),
+            "stream_url": f"/api/tts/stream/{job.job_id}",
+            "audio_file": f"/audio/{os.path.basename(job.assembled_path)}" if job.assembled_path else None,
+        }
@@ -0,0 +1,247 @@
+"""
+Process pool for local (pyttsx3) speech synthesis.
+
+pyttsx3's runAndWait blocks and its engine is not thread-safe, so each worker
+process owns exactly one engine. Callers wait on a queue of idle workers,
+every job has a timeout, and a monitor thread pings idle workers and replaces
+any that died or hung.
+"""
+
+import os
+import queue
+import atexit
+import threading
+import multiprocessing as mp
+from typing import Optional, List
+
+from utils_fold.process_utils import start_pool_worker, in_pool_worker
+
+
+def _worker_main(conn, rate: int, volume: float):
+    """Worker process: own one pyttsx3 engine and serve jobs sent over conn"""
+    try:
+        import pyttsx3
+
+        engine = pyttsx3.init()
+        engine.setProperty('rate', rate)
+        engine.setProperty('volume', volume)
+
+        voice_id = "default"
+        voices = engine.getProperty('voices')
+        if voices:
+            for voice in voices:
+                if 'female' in voice.name.lower() or 'zira' in voice.name.lower():
+                    engine.setProperty('voice', voice.id)
+                    voice_id = voice.id
+                    break
+        conn.send(("ready", voice_id))
+    except Exception as e:
+        conn.send(("error", f"TTS worker setup error: {e}"))
+        return
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        kind = message[0]
+        if kind == "stop":
+            break
+        if kind == "ping":
+            conn.send(("pong", None))
+        elif kind == "synthesize":
+            _, text, path = message
+            try:
+                engine.save_to_file(text, path)
+                engine.runAndWait()
+                conn.send(("done", os.path.exists(path) and os.path.getsize(path) > 0))
+            except Exception as e:
+                conn.send(("error", str(e)))
+
+
+class _Worker:
+    """Parent-side handle for one worker process"""
+
+    def __init__(self, ctx, rate: int, volume: float):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, rate, volume), daemon=True)
+        start_pool_worker(self.process)
+        child_conn.close()
+        self.voice_id = None
+
+    def wait_ready(self, timeout: float) -> bool:
+        reply = self._receive(timeout)
+        if reply and reply[0] == "ready":
+            self.voice_id = reply[1]
+            return True
+        if reply:
+            print(reply[1])
+        return False
+
+    def request(self, message: tuple, timeout: float) -> Optional[tuple]:
+        """Send a message and wait for the reply; None means timeout or a dead worker"""
+        try:
+            self.conn.send(message)
+        except (BrokenPipeError, OSError):
+            return None
+        return self._receive(timeout)
+
+    def _receive(self, timeout: float) -> Optional[tuple]:
+        try:
+            if self.conn.poll(timeout):
+                return self.conn.recv()
+        except (EOFError, OSError):
+            pass
+        return None
+
+    def is_alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self):
+        try:
+            self.conn.send(("stop",))
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=1)
+        self.conn.close()
+
+
+class TTSWorkerPool:
+    """Fixed-size pool of pyttsx3 worker processes"""
+
+    def __init__(self, num_workers: int, rate: int, volume: float = 0.8,
+                 job_timeout: float = 60, startup_timeout: float = 15,
+                 health_check_interval: float = 30):
+        self.rate = rate
+        self.volume = volume
+        self.job_timeout = job_timeout
+        self.startup_timeout = startup_timeout
+        self.voice_id = "default"
+        self._ctx = mp.get_context("spawn")
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers: List[_Worker] = []
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+
+        # Start every process first so their (slow) engine setup overlaps
+        starting = [_Worker(self._ctx, rate, volume) for _ in range(max(1, num_workers))]
+        for worker in starting:
+            if worker.wait_ready(startup_timeout):
+                self._workers.append(worker)
+                self._idle.put(worker)
+            else:
+                worker.kill()
+
+        if self._workers:
+            self.voice_id = self._workers[0].voice_id
+            self._monitor = threading.Thread(
+                target=self._monitor_loop, args=(health_check_interval,), daemon=True
+            )
+            self._monitor.start()
+
+    @property
+    def available(self) -> bool:
+        return bool(self._workers) and not self._closed.is_set()
+
+    @property
+    def size(self) -> int:
+        return len(self._workers)
+
+    def synthesize(self, text: str, path: str, timeout: Optional[float] = None) -> bool:
+        """Render text to a wav file at path; False if no worker could do it in time"""
+        if not self.available:
+            return False
+        timeout = timeout or self.job_timeout
+
+        try:
+            # Jobs queue here until a worker is free
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            print("TTS pool: no worker became available in time")
+            return False
+
+        reply = worker.request(("synthesize", text, path), timeout)
+        if reply is None:
+            # Hung or crashed mid-job; its engine state can't be trusted any more
+            print("TTS pool: job timed out, restarting worker")
+            # Restart off the request thread so the caller can fall back straight away
+            threading.Thread(target=self._replace, args=(worker,), daemon=True).start()
+            return False
+
+        self._idle.put(worker)
+        if reply[0] == "error":
+            print(f"TTS pool job error: {reply[1]}")
+            return False
+        return bool(reply[1])
+
+    def health_check(self, timeout: float = 5) -> int:
+        """Ping every idle worker and replace unresponsive ones; returns healthy count"""
+        checked = []
+        while True:
+            try:
+                checked.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+        healthy = 0
+        for worker in checked:
+            if worker.is_alive() and worker.request(("ping",), timeout) is not None:
+                self._idle.put(worker)
+                healthy += 1
+            else:
+                print("TTS pool: worker failed health check, restarting")
+                if self._replace(worker):
+                    healthy += 1
+        return healthy
+
+    def _replace(self, worker: _Worker) -> bool:
+        """Kill a worker and start a fresh one in its place"""
+        worker.kill()
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+        if self._closed.is_set():
+            return False
+
+        fresh = _Worker(self._ctx, self.rate, self.volume)
+        if not fresh.wait_ready(self.startup_timeout):
+            fresh.kill()
+            print("TTS pool: could not restart worker")
+            return False
+
+        with self._lock:
+            self._workers.append(fresh)
+        self._idle.put(fresh)
+        return True
+
+    def _monitor_loop(self, interval: float):
+        while not self._closed.wait(interval):
+            self.health_check()
+
+    def shutdown(self):
+        self._closed.set()
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.kill()
+
+
+_shared_pool: Optional[TTSWorkerPool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_shared_pool(num_workers: int, rate: int, job_timeout: float) -> Optional[TTSWorkerPool]:
+    """Process-wide pool so every NeuroTTSEngine reuses the same workers"""
+    global _shared_pool
+    if in_pool_worker():
+        # Spawned workers re-import the parent's main module; never nest pools
+        return None
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = TTSWorkerPool(num_workers, rate, job_timeout=job_timeout)
+            atexit.register(_shared_pool.shutdown)
+        return _shared_pool
@@ -0,0 +1,10 @@
+import hashlib
+
+
+def content_hash(*parts) -> str:
+    """Return a stable sha256 hex digest for the given parts"""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\x1f")  # unit separator so ("ab", "c") != ("a", "bc")
+    return h.hexdigest()
@@ -0,0 +1,29 @@
+import os
+import threading
+
+# Set in the environment of every pool worker process we start
+POOL_WORKER_ENV = "EDUVOICE_POOL_WORKER"
+
+_start_lock = threading.Lock()
+
+
+def start_pool_worker(process):
+    """Start a spawn-context worker process marked as a pool worker"""
+    # Spawned children inherit the environment at start(); the lock keeps
+    # concurrent pool startups from unsetting each other's marker
+    with _start_lock:
+        os.environ[POOL_WORKER_ENV] = "1"
+        try:
+            process.start()
+        finally:
+            os.environ.pop(POOL_WORKER_ENV, None)
+
+
+def in_pool_worker() -> bool:
+    """True inside a process started by start_pool_worker.
+
+    Spawned workers re-import the parent's main module, which must not start
+    pools of its own there. Other multiprocessing children, such as the
+    server process uvicorn spawns for --reload or --workers, are not marked.
+    """
+    return os.environ.get(POOL_WORKER_ENV) == "1"
@@ -0,0 +1,117 @@
+"""
+Per-user materialized views for dashboard payloads.
+
+Streak and performance payloads only change when a quiz completes, so each
+is built once and stored with an ETag until the quiz-completion path bumps
+the user's generation. A view is only served while its generation is
+current, and a build that raced with an invalidation is never stored, so a
+stale payload can't outlive the write that replaced it. Everything is in
+SQLite, which keeps views and invalidations consistent across server
+workers.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+from config import VIEW_CACHE_DB
+from utils_fold.hash_utils import content_hash
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS views (
+    user_id TEXT NOT NULL,
+    view TEXT NOT NULL,
+    generation INTEGER NOT NULL,
+    etag TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (user_id, view)
+);
+CREATE TABLE IF NOT EXISTS generations (
+    user_id TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL
+);
+"""
+
+CURRENT_GENERATION = "COALESCE((SELECT generation FROM generations WHERE user_id = ?), 0)"
+
+
+def payload_etag(body: str) -> str:
+    return f'"{content_hash(body)[:32]}"'
+
+
+class ViewCache:
+    """Built payloads per (user, view), valid until the user's next invalidation"""
+
+    def __init__(self, db_path: str):
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def _generation(self, user_id: str) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT {CURRENT_GENERATION}", (user_id,)).fetchone()[0]
+
+    def etag(self, user_id: str, view: str) -> Optional[str]:
+        """ETag of the current view, without loading its payload"""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT etag FROM views WHERE user_id = ? AND view = ? AND generation = {CURRENT_GENERATION}",
+                (user_id, view, user_id),
+            ).fetchone()
+        return row[0] if row else None
+
+    def get(self, user_id: str, view: str) -> Optional[Tuple[Dict, str]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT payload, etag FROM views "
+                f"WHERE user_id = ? AND view = ? AND generation = {CURRENT_GENERATION}",
+                (user_id, view, user_id),
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def get_or_build(self, user_id: str, view: str, build: Callable[[], Dict]) -> Tuple[Dict, str]:
+        """(payload, etag) for the view, calling build only when there is no current copy"""
+        cached = self.get(user_id, view)
+        if cached:
+            return cached
+
+        generation = self._generation(user_id)
+        payload = build()
+        body = json.dumps(payload, sort_keys=True, default=str)
+        etag = payload_etag(body)
+        with self._lock:
+            # Skipped if the user was invalidated while we were building
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO views(user_id, view, generation, etag, payload) "
+                f"SELECT ?, ?, ?, ?, ? WHERE {CURRENT_GENERATION} = ?",
+                (user_id, view, generation, etag, body, user_id, generation),
+            )
+        return json.loads(body), etag
+
+    def invalidate(self, user_id: str):
+        """Drop every view of user_id; call after any write the views depend on"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO generations(user_id, generation) VALUES (?, 1) "
+                "ON CONFLICT(user_id) DO UPDATE SET generation = generation + 1",
+                (user_id,),
+            )
+
+
+_shared_cache: Optional[ViewCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_view_cache() -> ViewCache:
+    """Process-wide view cache stored at config.VIEW_CACHE_DB"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ViewCache(VIEW_CACHE_DB)
+        return _shared_cache
@@ -7,16 +7,21 @@ from typing import Dict, List, Optional
 from PIL import Image, ImageDraw, ImageFont
 import io
 import numpy as np
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.figure import Figure
 from matplotlib.patches import FancyBboxPatch
 import seaborn as sns
 
+from config import FEEDBACK_RENDERER
+from achievements import BADGES, get_achievements
+from feedback_catalog import get_feedback_catalog
+from render_service import get_render_service
+from pillow_renderer import mood_palette, render_meme_card, render_progress_bar, render_focus_chart
+
 
 class VisualFeedbackManager:
     def __init__(self, user_id: str):
         self.user_id = user_id
-        self.badges_file = f"user_data/{user_id}_badges.json"
         self.achievements_file = f"user_data/{user_id}_achievements.json"
         self.colors = {
             "success": "#4CAF50",
@@ -66,12 +71,10 @@ class VisualFeedbackManager:
             message = "💡 Learning opportunity! Review and try again."
             mood = "encouraging"
 
-        image = self.create_meme_image("quiz_feedback", message, mood)
-
         return {
             "message": message,
-            "image": image,
-            "badge": self._check_for_badge_unlock("quiz", performance_data),
+            **get_feedback_catalog().get("quiz_feedback", message, mood),
+            "badge": self._record_event("quiz_answer", performance_data),
             "color": "success" if correct else "info"
         }
 
@@ -92,12 +95,10 @@ class VisualFeedbackManager:
             message = "🌟 Great start! Every day counts!"
             mood = "starting"
 
-        image = self.create_meme_image("streak", message, mood)
-
         return {
             "message": message,
-            "image": image,
-            "badge": self._check_for_badge_unlock("streak", performance_data),
+            **get_feedback_catalog().get("streak", message, mood),
+            "badge": self._record_event("streak", performance_data),
             "color": "achievement"
         }
 
@@ -116,136 +117,45 @@ class VisualFeedbackManager:
             message = "🌱 Great start! Focus grows with practice!"
             mood = "growing"
 
-        image = self.create_meme_image("focus_session", message, mood)
-
         return {
             "message": message,
-            "image": image,
-            "badge": self._check_for_badge_unlock("focus", performance_data),
+            **get_feedback_catalog().get("focus_session", message, mood),
+            "badge": None,  # focus badges are awarded when FocusTracker.end_session records the session
             "color": "success"
         }
 
-    def create_meme_image(self, category: str, text: str, mood: str) -> str:
-        """Create motivational meme image"""
+    def create_meme_image(self, category: str, text: str, mood: str, renderer: Optional[str] = None) -> str:
+        """Create motivational meme image (base64 PNG); renderer is "pillow" or "matplotlib"""
         try:
-            # Create a colorful background
-            fig, ax = plt.subplots(figsize=(6, 4))
-
-            # Choose colors based on mood
-            if mood in ["excellent", "legendary", "fire"]:
-                bg_color = "#FFD700"  # Gold
-                text_color = "#333"
-            elif mood in ["good", "building", "focused"]:
-                bg_color = "#4CAF50"  # Green
-                text_color = "white"
-            elif mood in ["encouraging", "growing", "starting"]:
-                bg_color = "#2196F3"  # Blue
-                text_color = "white"
-            else:
-                bg_color = "#9C27B0"  # Purple
-                text_color = "white"
-
-            # Create background
-            ax.set_facecolor(bg_color)
-            ax.set_xlim(0, 10)
-            ax.set_ylim(0, 10)
-
-            # Add decorative elements
-            self._add_decorative_elements(ax, mood)
-
-            # Add text
-            ax.text(5, 5, text, ha='center', va='center',
-                    fontsize=12, fontweight='bold', color=text_color,
-                    wrap=True, bbox=dict(boxstyle="round,pad=0.3",
-                                         facecolor="white", alpha=0.8))
-
-            # Remove axes
-            ax.set_xticks([])
-            ax.set_yticks([])
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            ax.spines['bottom'].set_visible(False)
-            ax.spines['left'].set_visible(False)
-
-            # Convert to base64
-            buffer = io.BytesIO()
-            plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            plt.close()
-
-            return image_base64
-
+            return base64.b64encode(render_meme_png(category, text, mood, renderer)).decode()
         except Exception as e:
             print(f"Error creating meme image: {e}")
             return ""
 
-    def _add_decorative_elements(self, ax, mood: str):
-        """Add decorative elements based on mood"""
-        if mood in ["excellent", "legendary"]:
-            # Add stars
-            star_positions = [(2, 8), (8, 8), (1, 2), (9, 2), (5, 9)]
-            for x, y in star_positions:
-                ax.plot(x, y, marker='*', markersize=20, color='yellow')
-
-        elif mood in ["fire", "building"]:
-            # Add flame-like shapes
-            for i in range(3):
-                x = 2 + i * 3
-                flame = patches.Ellipse((x, 1), 0.5, 1.5, color='orange', alpha=0.7)
-                ax.add_patch(flame)
-
-        elif mood == "focused":
-            # Add target/bullseye
-            circle1 = patches.Circle((5, 2), 1.5, color='red', alpha=0.3)
-            circle2 = patches.Circle((5, 2), 1.0, color='white', alpha=0.7)
-            circle3 = patches.Circle((5, 2), 0.5, color='red', alpha=0.5)
-            ax.add_patch(circle1)
-            ax.add_patch(circle2)
-            ax.add_patch(circle3)
-
-    def create_progress_visualization(self, progress_data: Dict) -> str:
-        """Create progress visualization"""
+    def create_progress_visualization(self, progress_data: Dict, renderer: Optional[str] = None) -> str:
+        """Create progress visualization (base64 PNG)"""
         try:
-            fig, ax = plt.subplots(figsize=(8, 6))
-
-            # Create progress bar
-            total = progress_data.get("total_concepts", 100)
-            completed = progress_data.get("mastered_concepts", 0)
-            progress = completed / total if total > 0 else 0
-
-            # Progress bar
-            bar_width = 0.6
-            ax.barh(0, progress, bar_width, color='#4CAF50', alpha=0.8)
-            ax.barh(0, 1 - progress, bar_width, left=progress, color='#E0E0E0', alpha=0.3)
-
-            # Add percentage text
-            ax.text(0.5, 0, f'{progress:.1%}', ha='center', va='center',
-                    fontsize=16, fontweight='bold', color='white')
-
-            # Styling
-            ax.set_xlim(0, 1)
-            ax.set_ylim(-0.5, 0.5)
-            ax.set_title('Learning Progress', fontsize=18, fontweight='bold', pad=20)
-            ax.set_xlabel('Progress', fontsize=12)
-            ax.set_yticks([])
-            ax.spines['top'].set_visible(False)
-            ax.spines['right'].set_visible(False)
-            ax.spines['left'].set_visible(False)
-
-            # Convert to base64
-            buffer = io.BytesIO()
-            plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-            buffer.seek(0)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode()
-            plt.close()
-
-            return image_base64
-
+            return base64.b64encode(render_progress_png(progress_data, renderer)).decode()
         except Exception as e:
             print(f"Error creating progress visualization: {e}")
             return ""
 
+    def meme_image_url(self, category: str, text: str, mood: str, renderer: Optional[str] = None) -> Optional[str]:
+        """Render a meme card (in the render pool, memoized) and return its /api/images URL"""
+        try:
+            return get_render_service().render_url("meme", (category, text, mood), renderer)
+        except Exception as e:
+            print(f"Error creating meme image: {e}")
+            return None
+
+    def progress_visualization_url(self, progress_data: Dict, renderer: Optional[str] = None) -> Optional[str]:
+        """Render the progress bar (in the render pool, memoized) and return its /api/images URL"""
+        try:
+            return get_render_service().render_url("progress", (progress_fraction(progress_data),), renderer)
+        except Exception as e:
+            print(f"Error creating progress visualization: {e}")
+            return None
+
     def get_daily_motivation_visual(self) -> Dict:
         """Get daily motivational visual"""
         motivational_messages = [
@@ -263,73 +173,165 @@ class VisualFeedbackManager:
         day_of_year = datetime.now().timetuple().tm_yday
         message = motivational_messages[day_of_year % len(motivational_messages)]
 
-        image = self.create_meme_image("daily_motivation", message, "motivation")
-
         return {
             "text": message,
-            "image": image
+            **get_feedback_catalog().get("daily_motivation", message, "motivation")
         }
 
-    def _check_for_badge_unlock(self, category: str, performance_data: Dict) -> Optional[Dict]:
-        """Check if user unlocked a new badge"""
-        # Simple badge system
-        badges = self._load_badges()
-
-        if category == "quiz" and performance_data.get("correct", False):
-            quiz_count = badges.get("quiz_correct", 0) + 1
-            badges["quiz_correct"] = quiz_count
-
-            if quiz_count == 10:
-                badge = {
-                    "title": "Quiz Master",
-                    "description": "Answered 10 questions correctly!",
-                    "image": self.create_meme_image("badge", "Quiz Master Unlocked!", "achievement"),
-                    "points": 50
-                }
-                self._save_badges(badges)
-                return badge
-
-        elif category == "streak":
-            streak_days = performance_data.get("streak_days", 0)
-            if streak_days == 7:
-                badge = {
-                    "title": "Week Warrior",
-                    "description": "Maintained a 7-day learning streak!",
-                    "image": self.create_meme_image("badge", "Week Warrior!", "achievement"),
-                    "points": 100
-                }
-                return badge
-
-        return None
-
-    def _load_badges(self) -> Dict:
-        """Load user badges"""
-        if os.path.exists(self.badges_file):
-            with open(self.badges_file, 'r') as f:
-                return json.load(f)
-        return {}
-
-    def _save_badges(self, badges: Dict):
-        """Save user badges"""
-        with open(self.badges_file, 'w') as f:
-            json.dump(badges, f, indent=2)
+    def _record_event(self, event: str, performance_data: Dict) -> Optional[Dict]:
+        """Feed an event to the achievements engine; returns a newly unlocked badge, if any"""
+        try:
+            unlocked = get_achievements().record(self.user_id, event, performance_data)
+        except Exception as e:
+            print(f"Error recording achievement event: {e}")
+            return None
+        if not unlocked:
+            return None
+        badge = max(unlocked, key=lambda b: b["points"])
+        card = BADGES[badge["badge_id"]]["card"]
+        return {**badge, **get_feedback_catalog().get("badge", card, "achievement")}
 
     def get_user_achievements(self) -> Dict:
         """Get user achievements summary"""
-        badges = self._load_badges()
-
-        # Calculate recent badges (last 5)
-        recent_badges = []
-        total_points = 0
-
-        # This is a simplified version - you'd want to store more detailed badge history
-        for badge_type, count in badges.items():
-            if badge_type == "quiz_correct" and count >= 10:
-                recent_badges.append({"title": "Quiz Master", "points": 50})
-                total_points += 50
-
-        return {
-            "total_badges": len(recent_badges),
-            "total_points": total_points,
-            "recent_badges": recent_badges
-        }
\ No newline at end of file
+        return get_achievements().summary(self.user_id)
+
+
+def render_feedback_png(category: str, text: str, mood: str) -> bytes:
+    """PNG bytes of a feedback card, for the pre-rendered catalog"""
+    try:
+        return render_meme_png(category, text, mood)
+    except Exception as e:
+        print(f"Error rendering feedback card: {e}")
+        return b""
+
+
+# -------------------------
+# Renderers
+# -------------------------
+def _figure_png(fig: Figure) -> bytes:
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
+    return buffer.getvalue()
+
+
+def _add_decorative_elements(ax, mood: str):
+    """Add decorative elements based on mood"""
+    if mood in ["excellent", "legendary"]:
+        # Add stars
+        star_positions = [(2, 8), (8, 8), (1, 2), (9, 2), (5, 9)]
+        for x, y in star_positions:
+            ax.plot(x, y, marker='*', markersize=20, color='yellow')
+
+    elif mood in ["fire", "building"]:
+        # Add flame-like shapes
+        for i in range(3):
+            x = 2 + i * 3
+            flame = patches.Ellipse((x, 1), 0.5, 1.5, color='orange', alpha=0.7)
+            ax.add_patch(flame)
+
+    elif mood == "focused":
+        # Add target/bullseye
+        circle1 = patches.Circle((5, 2), 1.5, color='red', alpha=0.3)
+        circle2 = patches.Circle((5, 2), 1.0, color='white', alpha=0.7)
+        circle3 = patches.Circle((5, 2), 0.5, color='red', alpha=0.5)
+        ax.add_patch(circle1)
+        ax.add_patch(circle2)
+        ax.add_patch(circle3)
+
+
+def render_meme_matplotlib(category: str, text: str, mood: str) -> bytes:
+    """Meme card as a matplotlib figure; uses Figure directly so no pyplot global state is touched"""
+    bg_color, text_color = mood_palette(mood)
+    fig = Figure(figsize=(6, 4))
+    ax = fig.subplots()
+
+    # Create background
+    ax.set_facecolor(bg_color)
+    ax.set_xlim(0, 10)
+    ax.set_ylim(0, 10)
+    _add_decorative_elements(ax, mood)
+
+    ax.text(5, 5, text, ha='center', va='center',
+            fontsize=12, fontweight='bold', color=text_color,
+            wrap=True, bbox=dict(boxstyle="round,pad=0.3",
+                                 facecolor="white", alpha=0.8))
+
+    # Remove axes
+    ax.set_xticks([])
+    ax.set_yticks([])
+    for side in ['top', 'right', 'bottom', 'left']:
+        ax.spines[side].set_visible(False)
+    return _figure_png(fig)
+
+
+def render_progress_matplotlib(progress: float) -> bytes:
+    """Progress bar as a matplotlib figure"""
+    fig = Figure(figsize=(8, 6))
+    ax = fig.subplots()
+
+    bar_width = 0.6
+    ax.barh(0, progress, bar_width, color='#4CAF50', alpha=0.8)
+    ax.barh(0, 1 - progress, bar_width, left=progress, color='#E0E0E0', alpha=0.3)
+    ax.text(0.5, 0, f'{progress:.1%}', ha='center', va='center',
+            fontsize=16, fontweight='bold', color='white')
+
+    ax.set_xlim(0, 1)
+    ax.set_ylim(-0.5, 0.5)
+    ax.set_title('Learning Progress', fontsize=18, fontweight='bold', pad=20)
+    ax.set_xlabel('Progress', fontsize=12)
+    ax.set_yticks([])
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_visible(False)
+    return _figure_png(fig)
+
+
+def render_focus_matplotlib(patterns: List[Dict]) -> bytes:
+    """Average focus time per hour of day as a matplotlib bar chart"""
+    fig = Figure(figsize=(8, 4))
+    ax = fig.subplots()
+    ax.bar([p["hour"] for p in patterns], [p["avg_focus_time"] for p in patterns], color='#2196F3')
+    ax.set_xlim(-0.5, 23.5)
+    ax.set_xticks(range(0, 24, 2))
+    ax.set_title('Focus Patterns by Hour', fontsize=14, fontweight='bold')
+    ax.set_xlabel('Hour of Day')
+    ax.set_ylabel('Focus Time (seconds)')
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    return _figure_png(fig)
+
+
+# renderer name -> image kind -> render function
+RENDERERS = {
+    "pillow": {"meme": render_meme_card, "progress": render_progress_bar, "focus": render_focus_chart},
+    "matplotlib": {"meme": render_meme_matplotlib, "progress": render_progress_matplotlib,
+                   "focus": render_focus_matplotlib},
+}
+
+
+def resolve_renderer(name: Optional[str]) -> str:
+    name = name or FEEDBACK_RENDERER
+    if name not in RENDERERS:
+        raise ValueError(f"Unknown renderer '{name}', expected one of {sorted(RENDERERS)}")
+    return name
+
+
+def render_png(kind: str, args: tuple, renderer: Optional[str] = None) -> bytes:
+    """PNG bytes for one image kind ("meme", "progress" or "focus") rendered from args"""
+    return RENDERERS[resolve_renderer(renderer)][kind](*args)
+
+
+def progress_fraction(progress_data: Dict) -> float:
+    total = progress_data.get("total_concepts", 100)
+    completed = progress_data.get("mastered_concepts", 0)
+    return completed / total if total > 0 else 0
+
+
+def render_meme_png(category: str, text: str, mood: str, renderer: Optional[str] = None) -> bytes:
+    """PNG bytes of a meme/badge card; renderer defaults to config.FEEDBACK_RENDERER"""
+    return render_png("meme", (category, text, mood), renderer)
+
+
+def render_progress_png(progress_data: Dict, renderer: Optional[str] = None) -> bytes:
+    """PNG bytes of the mastered/total concepts progress bar"""
+    return render_png("progress", (progress_fraction(progress_data),), renderer)
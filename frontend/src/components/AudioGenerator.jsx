@@ -34,7 +34,8 @@ const AudioGenerator = ({ text, voiceType }) => {
       // console.log(response.data.audio_file);
 
       if (response.data) {
-        const newUrl = `${BASE_URL}${response.data.audio_file}?t=${Date.now()}`;
+        // audio_file is content-addressed, so the browser cache can be trusted
+        const newUrl = `${BASE_URL}${response.data.audio_file}`;
         setAudioUrl(newUrl);
         console.log("Audio URL:", newUrl);
       }